@@ -0,0 +1,169 @@
+# src grahastra/backend/astrologerchatbot/intent.py
+"""
+In-process question intent classifier.
+
+A multinomial naive Bayes model (a linear model over word and word-pair
+counts). It is trained from a small seed lexicon per label plus the questions
+in AstroQuery history that the remote LLM has already labelled. Seed phrases
+make it useful from the first request; history adapts it to how users
+actually phrase things. Only remote labels are learned from, so the model
+never trains on its own guesses.
+
+`classify(question)` returns (label, confidence), where confidence is the top
+label's posterior probability. The chat view calls the remote classifier only
+when confidence is below the INTENT_CONFIDENCE setting. Each process trains
+its model lazily and retrains it every RETRAIN_SECONDS.
+"""
+
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+LABELS = (
+    "marriage_timing", "married_life", "career", "health", "children",
+    "foreign_travel", "wealth", "education", "spiritual", "general_astrology",
+)
+DEFAULT_LABEL = "general_astrology"
+DEFAULT_CONFIDENCE = 0.75
+HISTORY_LIMIT = 5000
+RETRAIN_SECONDS = 3600
+SEED_WEIGHT = 3     # a seed phrase counts as this many labelled questions
+SMOOTHING = 0.1
+
+SEED_PHRASES: Dict[str, Tuple[str, ...]] = {
+    "marriage_timing": ("when will i get married", "marriage timing", "when will i marry", "age of marriage",
+                        "delay in marriage", "wedding date", "when will i meet my life partner",
+                        "love or arranged marriage", "will i get married soon", "soulmate",
+                        "will my marriage happen this year"),
+    "married_life": ("married life", "my husband", "my wife", "relationship with spouse", "divorce",
+                     "separation from spouse", "in laws", "marital problems", "fights with husband",
+                     "problems in my marriage"),
+    "career": ("career", "job", "promotion", "business", "profession", "government job", "job change",
+               "interview", "work", "boss at office", "new job", "employment"),
+    "health": ("health", "disease", "illness", "surgery", "hospital", "recovery", "mental health",
+               "anxiety and stress", "accident", "chronic pain"),
+    "children": ("children", "child", "baby", "pregnancy", "conceive", "son", "daughter", "kids",
+                 "progeny", "fertility"),
+    "foreign_travel": ("abroad", "foreign travel", "settle abroad", "visa", "overseas", "foreign country",
+                       "immigration", "relocate to another country", "go to usa", "go to canada"),
+    "wealth": ("money", "wealth", "finance", "financial problems", "property", "investment", "debt",
+               "loan", "income", "become rich", "buy a house"),
+    "education": ("education", "studies", "exam", "degree", "college", "university admission",
+                  "higher studies", "entrance exam", "phd", "marks"),
+    "spiritual": ("spiritual", "moksha", "meditation", "god", "karma", "past life", "dharma", "mantra",
+                  "spiritual path", "temple"),
+    "general_astrology": ("my chart", "horoscope", "future", "overall life", "lagna", "dasha", "sade sati",
+                          "planets", "yoga in my chart", "lucky gemstone", "remedies", "rahu ketu"),
+}
+
+STOPWORDS = frozenset(
+    "a an and are am be can could do does for from get got have how i if in is it me my of on or "
+    "please the there this to was what when where which who why will with would you your".split()
+)
+_WORD = re.compile(r"[a-z]+")
+
+
+def stem(word: str) -> str:
+    """Light suffix stripping so "marry", "married" and "marries" share a feature."""
+    if word.endswith(("ies", "ied")) and len(word) > 4:
+        word = word[:-3] + "i"
+    elif word.endswith("ing") and len(word) > 5:
+        word = word[:-3]
+    elif word.endswith("ed") and len(word) > 4:
+        word = word[:-2]
+    elif word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+        word = word[:-1]
+    if word.endswith("y") and len(word) > 3:
+        word = word[:-1] + "i"
+    return word
+
+
+def features(text: str) -> List[str]:
+    """Content words plus adjacent word pairs ("get married" keeps the pair even though "get" is dropped)."""
+    words = [stem(w) if w not in STOPWORDS else w for w in _WORD.findall(text.lower())]
+    content = [w for w in words if w not in STOPWORDS]
+    pairs = [f"{a}_{b}" for a, b in zip(words, words[1:]) if not (a in STOPWORDS and b in STOPWORDS)]
+    return content + pairs
+
+
+class IntentClassifier:
+    def __init__(self):
+        self.log_prior: Dict[str, float] = {}
+        self.log_likelihood: Dict[str, Dict[str, float]] = {}
+        self.log_unseen: Dict[str, float] = {}
+        self.vocabulary: frozenset = frozenset()
+
+    def fit(self, examples: Iterable[Tuple[str, str, float]]) -> "IntentClassifier":
+        """`examples` are (text, label, weight)."""
+        label_weight: Dict[str, float] = Counter()
+        counts: Dict[str, Counter] = defaultdict(Counter)
+        for text, label, weight in examples:
+            label_weight[label] += weight
+            for feature in features(text):
+                counts[label][feature] += weight
+        self.vocabulary = frozenset(f for c in counts.values() for f in c)
+        total = sum(label_weight.values())
+        v = len(self.vocabulary)
+        for label in LABELS:
+            n = sum(counts[label].values())
+            denominator = math.log(n + SMOOTHING * v)
+            self.log_prior[label] = math.log((label_weight[label] + 1.0) / (total + len(LABELS)))
+            self.log_likelihood[label] = {f: math.log(c + SMOOTHING) - denominator for f, c in counts[label].items()}
+            self.log_unseen[label] = math.log(SMOOTHING) - denominator
+        return self
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        known = [f for f in features(text) if f in self.vocabulary]
+        if not known:
+            return DEFAULT_LABEL, 0.0
+        scores = {}
+        for label in LABELS:
+            table, unseen = self.log_likelihood[label], self.log_unseen[label]
+            scores[label] = self.log_prior[label] + sum(table.get(f, unseen) for f in known)
+        best = max(scores, key=scores.get)
+        top = scores[best]
+        confidence = 1.0 / sum(math.exp(s - top) for s in scores.values())
+        return best, confidence
+
+
+def seed_examples() -> List[Tuple[str, str, float]]:
+    return [(phrase, label, SEED_WEIGHT) for label, phrases in SEED_PHRASES.items() for phrase in phrases]
+
+
+def history_examples(limit: int = HISTORY_LIMIT) -> List[Tuple[str, str, float]]:
+    from .models import AstroQuery
+
+    rows = (AstroQuery.objects.filter(intent_source=AstroQuery.REMOTE, question_type__in=LABELS)
+            .order_by("-id").values_list("question", "question_type")[:limit])
+    return [(question, label, 1.0) for question, label in rows]
+
+
+def train(limit: int = HISTORY_LIMIT) -> IntentClassifier:
+    return IntentClassifier().fit(seed_examples() + history_examples(limit))
+
+
+_model: Optional[IntentClassifier] = None
+_trained_at = 0.0
+_lock = threading.Lock()
+
+
+def get_model() -> IntentClassifier:
+    global _model, _trained_at
+    if _model is None or time.monotonic() - _trained_at > RETRAIN_SECONDS:
+        with _lock:
+            if _model is None or time.monotonic() - _trained_at > RETRAIN_SECONDS:
+                _model, _trained_at = train(), time.monotonic()
+    return _model
+
+
+def confidence_threshold() -> float:
+    return getattr(settings, "INTENT_CONFIDENCE", DEFAULT_CONFIDENCE)
+
+
+def classify(question: str) -> Tuple[str, float]:
+    return get_model().predict(question)
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from astrologerchatbot import intent
+
+
+class Command(BaseCommand):
+    help = ("Cross-validate the local intent classifier against remote-labelled AstroQuery history: "
+            "for each confidence threshold, the share of questions answered locally and their accuracy.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--folds", type=int, default=5)
+        parser.add_argument("--limit", type=int, default=intent.HISTORY_LIMIT)
+        parser.add_argument("--thresholds", default="0.5,0.6,0.7,0.75,0.8,0.9,0.95")
+
+    def handle(self, *args, **options):
+        history = intent.history_examples(options["limit"])
+        folds = options["folds"]
+        if len(history) < folds:
+            raise CommandError(f"Need at least {folds} remote-labelled questions, found {len(history)}")
+        thresholds = [float(t) for t in options["thresholds"].split(",")]
+
+        predictions = []  # (confidence, correct)
+        for k in range(folds):
+            train = [ex for i, ex in enumerate(history) if i % folds != k]
+            model = intent.IntentClassifier().fit(intent.seed_examples() + train)
+            for text, label, _weight in history[k::folds]:
+                predicted, confidence = model.predict(text)
+                predictions.append((confidence, predicted == label))
+
+        current = intent.confidence_threshold()
+        self.stdout.write(f"{len(history)} questions, {folds} folds")
+        self.stdout.write(f"{'threshold':>9s} {'local':>7s} {'accuracy':>9s}")
+        for threshold in thresholds:
+            local = [correct for confidence, correct in predictions if confidence >= threshold]
+            accuracy = f"{sum(local) / len(local):.1%}" if local else "-"
+            marker = "  <- INTENT_CONFIDENCE" if threshold == current else ""
+            self.stdout.write(f"{threshold:9.2f} {len(local) / len(predictions):7.1%} {accuracy:>9s}{marker}")
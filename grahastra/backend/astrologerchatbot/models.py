@@ -1,12 +1,17 @@
 from django.db import models
-from django.db import models
 from django.contrib.auth import get_user_model
 
 
 User = get_user_model()
 
 class AstroQuery(models.Model):
+    LOCAL, REMOTE = "local", "remote"
+    INTENT_SOURCE_CHOICES = [(LOCAL, "Local classifier"), (REMOTE, "Remote LLM")]
+
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     question = models.TextField()
     answer = models.TextField()
+    # One of astrologerchatbot.intent.LABELS; remote labels also train the local classifier
+    question_type = models.CharField(max_length=30, blank=True)
+    intent_source = models.CharField(max_length=10, choices=INTENT_SOURCE_CHOICES, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
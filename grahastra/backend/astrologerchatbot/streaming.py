@@ -0,0 +1,131 @@
+# src grahastra/backend/astrologerchatbot/streaming.py
+"""
+Streaming variant of AskAstrologyView for ASGI deployments (grahastra/asgi.py).
+
+The answer is streamed from Together over a pooled httpx.AsyncClient and
+forwarded to the browser as Server-Sent Events while it is generated:
+
+    event: meta   {"question_type": ...}
+    event: token  {"text": ...}          (many)
+    event: done   {"answer": ...}        (cleaned full answer, after it is saved)
+    event: error  {"error": ...}
+
+Waiting on the LLM holds no thread, so slow completions do not use up the
+worker pool. The chart work before the call is synchronous and runs in a
+thread (sync_to_async). The AstroQuery is saved only when the stream
+completes; a client that disconnects mid-answer leaves no history row.
+"""
+
+import asyncio
+import json
+import logging
+import weakref
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_POST
+
+from authentication.models import Profile
+from . import intent
+from .models import AstroQuery
+from .views import TOGETHER_URL, AskAstrologyView
+
+logger = logging.getLogger(__name__)
+
+TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+# One client (and connection pool) per event loop: uvicorn runs a single loop per worker,
+# while the dev server runs each async view on a fresh loop
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _clients[loop] = httpx.AsyncClient(timeout=TIMEOUT, limits=LIMITS)
+    return client
+
+
+async def complete(helper, prompt, temperature):
+    """Whole completion text (used for the remote intent fallback)."""
+    headers, payload = helper.completion_request(prompt, temperature)
+    response = await get_client().post(TOGETHER_URL, headers=headers, json=payload)
+    response.raise_for_status()
+    return helper.extract_text(response.json())
+
+
+async def stream_completion(helper, prompt, temperature):
+    """Yield completion text fragments as Together streams them."""
+    headers, payload = helper.completion_request(prompt, temperature)
+    payload["stream_tokens"] = True
+    async with get_client().stream("POST", TOGETHER_URL, headers=headers, json=payload) as response:
+        if response.status_code != 200:
+            body = await response.aread()
+            raise Exception(f"API request failed with {response.status_code}: {body[:500]!r}")
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            chunk = json.loads(data)
+            choices = chunk.get("choices") or [{}]
+            text = choices[0].get("text") or chunk.get("token", {}).get("text", "")
+            if text:
+                yield text
+
+
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@require_POST
+async def ask_astrology_stream(request):
+    # request.user, not auser(): the social-auth backends have no async get_user
+    user = await sync_to_async(lambda: request.user if request.user.is_authenticated else None)()
+    if user is None:
+        return JsonResponse({"error": "Authentication required."}, status=401)
+
+    question = request.POST.get("question", "").strip()
+    if not question:
+        return JsonResponse({"error": "Please ask a question."}, status=400)
+
+    profile = await Profile.objects.filter(user=user).afirst()
+    if not profile:
+        return JsonResponse({"error": "User profile not found."}, status=400)
+
+    helper = AskAstrologyView()
+    try:
+        prompt_args, question_type, confidence = await sync_to_async(helper.prepare)(user, profile, question)
+        intent_source = AstroQuery.LOCAL
+        if confidence < intent.confidence_threshold():
+            question_type = helper.parse_intent(await complete(helper, helper.intent_prompt(question), 0.0))
+            intent_source = AstroQuery.REMOTE
+    except Exception as e:
+        logger.exception("Unexpected error during astrology processing.")
+        return JsonResponse({"error": f"Internal error: {str(e)}"}, status=500)
+    full_prompt = helper.build_prompt(question_type=question_type, **prompt_args)
+
+    async def events():
+        yield sse("meta", {"question_type": question_type})
+        parts = []
+        try:
+            async for text in stream_completion(helper, full_prompt, 0.4):
+                parts.append(text)
+                yield sse("token", {"text": text})
+        except Exception:
+            logger.exception("Streaming answer failed.")
+            yield sse("error", {"error": helper.fallback_message()})
+            return
+        answer = helper.clean_answer("".join(parts)) or helper.fallback_message()
+        await AstroQuery.objects.acreate(user=user, question=question, answer=answer,
+                                         question_type=question_type, intent_source=intent_source)
+        yield sse("done", {"answer": answer})
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # let nginx pass events through unbuffered
+    return response
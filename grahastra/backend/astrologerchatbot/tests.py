@@ -1,3 +1,116 @@
-from django.test import TestCase
+import datetime
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from authentication.models import Profile
+from . import intent
+from .models import AstroQuery
+from .views import AskAstrologyView
+
+
+class FeatureTests(SimpleTestCase):
+    def test_stem(self):
+        for word in ("marry", "married", "marries"):
+            self.assertEqual(intent.stem(word), "marri")
+        self.assertEqual(intent.stem("working"), "work")
+        self.assertEqual(intent.stem("studies"), "studi")
+        self.assertEqual(intent.stem("class"), "class")
+        self.assertEqual(intent.stem("job"), "job")
+
+    def test_features(self):
+        # Stopwords are dropped as words but still pair with a content word
+        self.assertEqual(intent.features("When will I get married?"), ["marri", "get_marri"])
+        self.assertEqual(intent.features("Govt JOB, promotion!"), ["govt", "job", "promotion", "govt_job", "job_promotion"])
+        self.assertEqual(intent.features("what is the"), [])
+
+
+class ClassifierTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.model = intent.IntentClassifier().fit(intent.seed_examples())
+
+    def test_seed_model_labels(self):
+        for question, label in (
+            ("When will I get married?", "marriage_timing"),
+            ("I keep fighting with my husband", "married_life"),
+            ("Will I get a promotion at my job this year?", "career"),
+            ("Is there any health issue like surgery?", "health"),
+            ("Can I settle abroad in Canada?", "foreign_travel"),
+            ("How can I clear my debt and loan?", "wealth"),
+            ("I want to study in a university abroad", "education"),
+            ("Should I do meditation for moksha?", "spiritual"),
+        ):
+            predicted, confidence = self.model.predict(question)
+            self.assertEqual(predicted, label, question)
+            self.assertGreater(confidence, intent.DEFAULT_CONFIDENCE, question)
+
+    def test_unknown_words(self):
+        for question in ("", "what is the", "zorblax quuxify"):
+            self.assertEqual(self.model.predict(question), (intent.DEFAULT_LABEL, 0.0))
+
+    def test_mixed_question_is_unsure(self):
+        _label, confidence = self.model.predict("Will my son do well in his exams?")
+        self.assertLess(confidence, intent.DEFAULT_CONFIDENCE)
+
+    def test_confidence_threshold_setting(self):
+        self.assertEqual(intent.confidence_threshold(), intent.DEFAULT_CONFIDENCE)
+        with self.settings(INTENT_CONFIDENCE=0.4):
+            self.assertEqual(intent.confidence_threshold(), 0.4)
+
+
+class HistoryTrainingTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email="devi@example.com", password="x")
+
+    def ask(self, question, label, source, times=1):
+        AstroQuery.objects.bulk_create(
+            AstroQuery(user=self.user, question=question, answer="", question_type=label, intent_source=source)
+            for _ in range(times)
+        )
+
+    def test_only_remote_labels_are_learned(self):
+        self.ask("what do my tarot cards say", "spiritual", AstroQuery.REMOTE, times=2)
+        self.ask("tarot reading for my job", "career", AstroQuery.LOCAL, times=5)
+        self.ask("tarot reading", "not_a_label", AstroQuery.REMOTE, times=5)
+
+        self.assertEqual(intent.history_examples(),
+                         [("what do my tarot cards say", "spiritual", 1.0)] * 2)
+        self.assertEqual(intent.train().predict("tarot")[0], "spiritual")
+
+
+@override_settings(INTENT_CONFIDENCE=0.75)
+class IntentRoutingTests(TestCase):
+    """The view asks the remote LLM for the label only below the confidence threshold."""
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(email="devi@example.com", password="x")
+        Profile.objects.create(user=user, birth_date=datetime.date(1992, 3, 4), birth_time=datetime.time(8, 15),
+                               latitude=8.5241, longitude=76.9366)
+        self.client.force_login(user)
+        for name, value in (("build_prompt", "prompt"), ("send_to_ai", {}), ("extract_answer", "answer")):
+            patcher = mock.patch.object(AskAstrologyView, name, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(AskAstrologyView, "classify_remote", return_value="children")
+        self.classify_remote = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, local_label, confidence):
+        with mock.patch.object(AskAstrologyView, "prepare", return_value=({}, local_label, confidence)):
+            response = self.client.post(reverse("ask_astrology"), {"question": "Will my son do well?"})
+        self.assertEqual(response.status_code, 200)
+        return AstroQuery.objects.latest("id")
+
+    def test_confident_local_label_is_kept(self):
+        query = self.post("education", 0.9)
+        self.classify_remote.assert_not_called()
+        self.assertEqual((query.question_type, query.intent_source), ("education", AstroQuery.LOCAL))
+
+    def test_unsure_local_label_goes_remote(self):
+        query = self.post("education", 0.49)
+        self.classify_remote.assert_called_once()
+        self.assertEqual((query.question_type, query.intent_source), ("children", AstroQuery.REMOTE))
@@ -1,10 +1,12 @@
 from django.urls import path
 from . import views
 from .views import clear_astro_chats
+from .streaming import ask_astrology_stream
 
 urlpatterns = [
     
     path('ask_astrology/',views.AskAstrologyView.as_view(), name='ask_astrology'),
+    path('ask_astrology/stream/', ask_astrology_stream, name='ask_astrology_stream'),
     path("clear_chats/", clear_astro_chats, name="clear_astro_chats"),
 
 ]
\ No newline at end of file
@@ -2,11 +2,17 @@ from django.views import View
 from django.http import JsonResponse
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.shortcuts import render, redirect
+from . import intent
 from .models import AstroQuery
-from core.astrology_utils import get_planet_positions, get_birth_chart_data, calculate_lagna, get_nakshatra, get_rasi_lord, get_nakshatra_lord
+from core.astrology_utils import (
+    BATCH_BODIES, RASHIS, NAKSHATRAS, Chart, ChartContext, get_rasi_lord, get_nakshatra_lord,
+    get_sign_name, house_from_moon, analyze_saturn_transit, analyze_jupiter_transit,
+    DashaTimeline, DASHA_LEVELS, utc_to_jd
+)
+from core.transits import get_transit_snapshot
+from core.timing import stage
 from decouple import config
-from datetime import datetime, timedelta, date
-import swisseph as swe
+from datetime import datetime, date
 import requests
 import logging
 from django.contrib.auth.decorators import login_required
@@ -37,79 +43,126 @@ class AskAstrologyView(LoginRequiredMixin, View):
             return JsonResponse({"error": "User profile not found."}, status=400)
 
         try:
-            # Chart setup
-            birth_dt = datetime.combine(profile.birth_date, profile.birth_time)
-            dt_utc = birth_dt - timedelta(hours=5, minutes=30)
-            jd = swe.julday(dt_utc.year, dt_utc.month, dt_utc.day, dt_utc.hour + dt_utc.minute / 60.0)
-            asc_deg, lagna_sign = calculate_lagna(jd, profile.latitude, profile.longitude)
-            positions = get_planet_positions(
-                profile.birth_date.strftime('%Y-%m-%d'),
-                profile.birth_time.strftime('%H:%M'),
-                profile.latitude,
-                profile.longitude
-            )
-            chart_data = get_birth_chart_data(positions, profile.nakshatra, asc_deg)
-            planet_lines = self.get_planet_description(positions, chart_data)
-            yoga_lines = chart_data.get("Yogas", [])
-            prev_qna = AstroQuery.objects.filter(user=user).order_by("-created_at")[:3]
-            prev_summary = "\n".join([f"Q: {q.question}\nA: {q.answer}" for q in reversed(prev_qna)])
-            age = (date.today() - profile.birth_date).days // 365
-
-            # Step 1: Ask AI to classify question type
-            intent_prompt = f"""
-You are an expert Vedic astrologer. A user has asked this question:
-
-"{question}"
-
-What is the intent behind this question? Return ONLY the category label.
-
-Use one of the following labels:
-- marriage_timing
-- married_life
-- career
-- health
-- children
-- foreign_travel
-- wealth
-- education
-- spiritual
-- general_astrology
-
-Only return the label. Do not explain.
-""".strip()
-
-            intent_response = self.send_to_ai(intent_prompt, temperature=0.0)
-            question_type = self.extract_text(intent_response).lower().strip()
+            prompt_args, question_type, confidence = self.prepare(user, profile, question)
+            intent_source = AstroQuery.LOCAL
+            if confidence < intent.confidence_threshold():
+                question_type = self.classify_remote(question)
+                intent_source = AstroQuery.REMOTE
 
             # Step 2: Now send full prompt for astrology answer
-            full_prompt = self.build_prompt(
-                chart_data, planet_lines, yoga_lines, question, question_type, prev_summary, age
-            )
-            response = self.send_to_ai(full_prompt, temperature=0.4)
+            full_prompt = self.build_prompt(question_type=question_type, **prompt_args)
+            with stage("llm_answer"):
+                response = self.send_to_ai(full_prompt, temperature=0.4)
             answer = self.extract_answer(response)
 
-            AstroQuery.objects.create(user=user, question=question, answer=answer)
+            AstroQuery.objects.create(user=user, question=question, answer=answer,
+                                      question_type=question_type, intent_source=intent_source)
             return JsonResponse({"question": question, "answer": answer})
 
         except Exception as e:
             logger.exception("Unexpected error during astrology processing.")
             return JsonResponse({"error": f"Internal error: {str(e)}"}, status=500)
 
-    def get_planet_description(self, positions, chart_data):
+    def prepare(self, user, profile, question):
+        """Chart context for the answer prompt plus the local intent guess.
+
+        Returns (build_prompt kwargs without question_type, question_type, confidence);
+        shared with the streaming endpoint (astrologerchatbot.streaming).
+        """
+        # Chart setup
+        ctx = ChartContext.from_datetime(
+            datetime.combine(profile.birth_date, profile.birth_time),
+            profile.latitude,
+            profile.longitude
+        )
+        with stage("chart"):
+            chart = Chart.from_context(ctx)
+            planet_lines = self.get_planet_description(chart)
+        with stage("yogas"):
+            yoga_lines = chart.yogas()
+        with stage("transits"):
+            snapshot = get_transit_snapshot()
+            transit_lines = self.get_transit_description(snapshot, chart.longitude("Moon"))
+        with stage("dasha"):
+            dasha_timeline = DashaTimeline(ctx.jd, ctx.bodies["Moon"].longitude)
+            transit_lines += self.get_dasha_description(dasha_timeline, snapshot.at)
+        prev_qna = AstroQuery.objects.filter(user=user).order_by("-created_at")[:3]
+        prev_summary = "\n".join([f"Q: {q.question}\nA: {q.answer}" for q in reversed(prev_qna)])
+        age = (date.today() - profile.birth_date).days // 365
+
+        # Step 1: classify the question locally; the caller asks the AI only when unsure
+        with stage("intent"):
+            question_type, confidence = intent.classify(question)
+
+        prompt_args = dict(
+            chart=chart, nakshatra=profile.nakshatra, planet_lines=planet_lines, yoga_lines=yoga_lines,
+            question=question, previous_summary=prev_summary, age=age, transit_lines=transit_lines,
+        )
+        return prompt_args, question_type, confidence
+
+    def get_planet_description(self, chart):
         lines = []
-        for planet, degree in positions.items():
-            sign = chart_data["Signs"].get(planet)
-            house = chart_data["Houses"].get(planet)
-            nak = get_nakshatra(degree)
+        for i, planet in enumerate(BATCH_BODIES):
+            degree = chart.longitudes[i]
+            sign = RASHIS[chart.signs[i]]
+            nak = NAKSHATRAS[chart.nakshatras[i]]
             rasi_lord = get_rasi_lord(sign)
             nak_lord = get_nakshatra_lord(nak)
             lines.append(
-                f"- {planet}: {sign} ({degree:.2f}°) in House {house}, Nakshatra: {nak} | "
+                f"- {planet}: {sign} ({degree:.2f}°) in House {chart.houses[i]}, Nakshatra: {nak} | "
                 f"Sign Lord: {rasi_lord}, Nakshatra Lord: {nak_lord}"
             )
         return lines
 
-    def build_prompt(self, chart_data, planet_lines, yoga_lines, question, question_type, previous_summary, age):
+    def get_transit_description(self, snapshot, natal_moon):
+        lines = []
+        for planet, degree in snapshot.positions.items():
+            retro = " (R)" if snapshot.is_retrograde(planet) and planet not in ("Rahu", "Ketu") else ""
+            lines.append(
+                f"- {planet}: {get_sign_name(degree)} ({degree:.2f}°){retro}, "
+                f"House {house_from_moon(natal_moon, degree)} from natal Moon"
+            )
+        for assessment in (
+            analyze_saturn_transit(natal_moon, snapshot.positions["Saturn"]),
+            analyze_jupiter_transit(natal_moon, snapshot.positions["Jupiter"]),
+        ):
+            if assessment:
+                lines.append(f"- {assessment}")
+        return lines
+
+    def get_dasha_description(self, timeline, at):
+        periods = timeline.at(utc_to_jd(at), depth=3)
+        if not periods:
+            return []
+        chain = " / ".join(p.lord for p in periods)
+        return [f"- Running Dasha ({'/'.join(DASHA_LEVELS[:len(periods)])}): {chain}, "
+                f"{DASHA_LEVELS[len(periods) - 1]} until {periods[-1].end:%d %B %Y}"]
+
+    def intent_prompt(self, question):
+        return f"""
+You are an expert Vedic astrologer. A user has asked this question:
+
+"{question}"
+
+What is the intent behind this question? Return ONLY the category label.
+
+Use one of the following labels:
+{chr(10).join(f"- {label}" for label in intent.LABELS)}
+
+Only return the label. Do not explain.
+""".strip()
+
+    def parse_intent(self, text):
+        label = text.lower().strip()
+        return label if label in intent.LABELS else intent.DEFAULT_LABEL
+
+    def classify_remote(self, question):
+        with stage("llm_intent"):
+            intent_response = self.send_to_ai(self.intent_prompt(question), temperature=0.0)
+        return self.parse_intent(self.extract_text(intent_response))
+
+    def build_prompt(self, chart, nakshatra, planet_lines, yoga_lines, question, question_type, previous_summary, age,
+                     transit_lines=()):
         now = datetime.now()
         return f"""
 You are a professional Vedic astrologer. Analyze the following birth chart and give a clear, accurate answer.
@@ -120,14 +173,17 @@ You are a professional Vedic astrologer. Analyze the following birth chart and g
 📅 Date: {now.strftime('%d %B %Y, %I:%M %p')} IST
 
 📈 Chart Summary:
-- Lagna: {chart_data.get("Lagna")}
-- Nakshatra: {chart_data.get("Nakshatra")}
+- Lagna: {chart.asc}
+- Nakshatra: {nakshatra}
 - Planetary Positions:
 {chr(10).join(planet_lines)}
 
 🔍 Yogas:
 {chr(10).join(yoga_lines) or "None"}
 
+🪐 Current Transits (Gochar):
+{chr(10).join(transit_lines) or "Unavailable"}
+
 📌 Instructions:
 - NEVER suggest the user consult an astrologer.
 - Focus your interpretation on the type of question.
@@ -139,7 +195,8 @@ You are a professional Vedic astrologer. Analyze the following birth chart and g
 📝 Final Answer:
 """.strip()
 
-    def send_to_ai(self, prompt, temperature=0.4):
+    def completion_request(self, prompt, temperature=0.4):
+        """Headers and JSON body for a Together completion call."""
         headers = {
             "Authorization": f"Bearer {TOGETHER_API_KEY}",
             "Content-Type": "application/json"
@@ -150,6 +207,10 @@ You are a professional Vedic astrologer. Analyze the following birth chart and g
             "max_tokens": 1000,
             "temperature": temperature
         }
+        return headers, payload
+
+    def send_to_ai(self, prompt, temperature=0.4):
+        headers, payload = self.completion_request(prompt, temperature)
         response = requests.post(TOGETHER_URL, headers=headers, json=payload, timeout=30)
         if response.status_code != 200:
             raise Exception(f"API request failed with {response.status_code}: {response.text}")
@@ -160,19 +221,21 @@ You are a professional Vedic astrologer. Analyze the following birth chart and g
 
     def extract_answer(self, response_json):
         try:
-            text = self.extract_text(response_json)
-            for phrase in [
-                "consult a professional astrologer",
-                "this is a general prediction",
-                "may vary depending on the individual",
-                "your path may differ",
-                "seek expert opinion"
-            ]:
-                text = text.replace(phrase, "")
-            return text.strip()
+            return self.clean_answer(self.extract_text(response_json))
         except Exception:
             return self.fallback_message()
 
+    def clean_answer(self, text):
+        for phrase in [
+            "consult a professional astrologer",
+            "this is a general prediction",
+            "may vary depending on the individual",
+            "your path may differ",
+            "seek expert opinion"
+        ]:
+            text = text.replace(phrase, "")
+        return text.strip()
+
     def fallback_message(self):
         return "The AI could not interpret your chart right now. Please rephrase and try again."
 
@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from birthchart.store import get_or_create_chart
+from core.gazetteer import geocode
+from core.mailer import queue_mail
+from .models import Profile
+
+
+class GeocodingFailed(Exception):
+    pass
+
+
+def build_profile_chart(profile_id, welcome=False):
+    """Geocode a new profile's birth place, attach its stored chart and (once) queue the welcome email.
+
+    Idempotent: a retried run reuses the coordinates and the stored chart.
+    """
+    profile = Profile.objects.select_related("user").get(pk=profile_id)
+    if profile.latitude is None or profile.longitude is None:
+        lat, lng = geocode(profile.birth_place)
+        if lat is None:
+            raise GeocodingFailed(f"could not geocode {profile.birth_place!r}")
+        profile.latitude, profile.longitude = lat, lng
+    # Stored (and search-indexed) once; shared with any profile of the same birth inputs
+    stored = get_or_create_chart(profile.birth_date, profile.birth_time, profile.latitude, profile.longitude)
+    profile.nakshatra = stored.payload["Nakshatra"]
+    profile.lagna = stored.payload["Lagna"]
+    profile.yogas = "\n".join(stored.yogas)
+    profile.chart = stored
+    profile.save(update_fields=["latitude", "longitude", "nakshatra", "lagna", "yogas", "chart"])
+
+    if welcome:
+        user = profile.user
+        queue_mail(
+            user.email,
+            "Welcome to Grahastra ✨",
+            "email/registration_success_email.html",
+            {
+                "name": f"{user.first_name} {user.last_name}".strip(),
+                "email": user.email,
+                "year": datetime.now().year,
+            },
+        )
@@ -90,6 +90,36 @@ class Profile(models.Model):
     nakshatra = models.CharField(max_length=50, null=True, blank=True)
     lagna = models.CharField(max_length=50, null=True, blank=True)
     yogas = models.TextField(null=True, blank=True)
+    chart = models.ForeignKey(
+        "birthchart.StoredChart", null=True, blank=True, on_delete=models.SET_NULL, related_name="profiles"
+    )
+
+    BIRTH_FIELDS = ("birth_date", "birth_time", "latitude", "longitude")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if all(f in field_names for f in cls.BIRTH_FIELDS):
+            instance._loaded_birth = instance.birth_fingerprint()
+            instance._loaded_chart_id = instance.chart_id
+        return instance
+
+    def birth_fingerprint(self):
+        return tuple(getattr(self, f) for f in self.BIRTH_FIELDS)
+
+    def save(self, *args, **kwargs):
+        # Stored charts are keyed by birth data; drop the link once it no longer matches,
+        # unless the chart was reassigned along with the new birth data
+        loaded = getattr(self, "_loaded_birth", None)
+        relinked = self.chart_id != getattr(self, "_loaded_chart_id", None)
+        if self.chart_id and not relinked and loaded is not None and loaded != self.birth_fingerprint():
+            self.chart = None
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "chart"}
+        super().save(*args, **kwargs)
+        self._loaded_birth = self.birth_fingerprint()
+        self._loaded_chart_id = self.chart_id
 
     def __str__(self):
         return f"Profile of {self.user.email}"
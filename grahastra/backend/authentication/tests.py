@@ -1,4 +1,88 @@
+import datetime
+
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from birthchart.models import StoredChart
+from birthchart.store import get_or_create_chart, search_profiles
+from core import gazetteer, jobs
+from core.models import Job, OutboxMessage, Place
+from .models import Profile
+
+
+class SignupChartTests(TestCase):
+    def setUp(self):
+        Place.objects.create(geonameid=1273874, name="Kochi", ascii_name="Kochi", alternate_names="Cochin",
+                             admin1="Kerala", country="India", country_code="IN",
+                             latitude=9.9312, longitude=76.2673, population=600000)
+        gazetteer.reset_index()
+        self.addCleanup(gazetteer.reset_index)
+
+    def signup(self):
+        return APIClient().post(reverse("signup_page"), {
+            "fullName": "Asha Menon", "email": "asha@example.com", "password": "Nakshatra#2024",
+            "confirmPassword": "Nakshatra#2024", "gender": "female", "dob": "1990-01-01", "tob": "06:30",
+            "pob": "Kochi, Kerala",
+        }, format="json")
+
+    def test_signup_job_links_chart(self):
+        response = self.signup()
+        self.assertEqual(response.status_code, 201, response.data)
+        job = Job.objects.get(pk=response.data["chart_job"]["id"])
+        self.assertEqual(job.kind, "profile_chart")
+
+        self.assertEqual(jobs.run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE, job.last_error)
+
+        profile = Profile.objects.get(user__email="asha@example.com")
+        self.assertEqual((profile.latitude, profile.longitude), (9.9312, 76.2673))
+        self.assertIsNotNone(profile.chart_id)
+        self.assertEqual(profile.nakshatra, profile.chart.payload["Nakshatra"])
+        # Linked and indexed, so the profile is in the matching pool and search results
+        self.assertIsNotNone(profile.chart.moon_navamsa)
+        self.assertIn(profile, search_profiles(moon_sign=profile.chart.moon_sign))
+        self.assertEqual(OutboxMessage.objects.filter(recipient="asha@example.com").count(), 1)
+
+    def test_rerun_is_idempotent(self):
+        self.signup()
+        job = Job.objects.get()
+        jobs.run_pending()
+        chart_id = Profile.objects.get().chart_id
+        jobs.run_job(job)
+        self.assertEqual(Profile.objects.get().chart_id, chart_id)
+        self.assertEqual(StoredChart.objects.count(), 1)
+
+
+class ProfileChartLinkTests(TestCase):
+    def setUp(self):
+        from django.contrib.auth import get_user_model
+
+        user = get_user_model().objects.create_user(email="ravi@example.com", password="x")
+        self.birth = dict(birth_date=datetime.date(1985, 6, 15), birth_time=datetime.time(14, 20),
+                          latitude=12.9716, longitude=77.5946)
+        chart = get_or_create_chart(*self.birth.values())
+        self.profile_id = Profile.objects.create(user=user, chart=chart, **self.birth).pk
+
+    def load(self):
+        return Profile.objects.get(pk=self.profile_id)
+
+    def test_birth_change_unlinks_chart(self):
+        profile = self.load()
+        profile.birth_time = datetime.time(14, 50)
+        profile.save(update_fields=["birth_time"])
+        self.assertIsNone(self.load().chart_id)
 
-# Create your tests here.
+    def test_other_fields_keep_chart(self):
+        profile = self.load()
+        profile.occupation = "Engineer"
+        profile.save()
+        self.assertIsNotNone(self.load().chart_id)
 
+    def test_chart_reassigned_with_birth_change_is_kept(self):
+        profile = self.load()
+        profile.latitude, profile.longitude = 9.9312, 76.2673
+        profile.chart = get_or_create_chart(profile.birth_date, profile.birth_time, 9.9312, 76.2673)
+        profile.save(update_fields=["latitude", "longitude", "chart"])
+        self.assertEqual(self.load().chart_id, profile.chart.pk)
@@ -5,5 +5,6 @@ urlpatterns = [
     path('login/',views.LoginView.as_view(), name='login_page'),
     path('signup/',views.SignupView.as_view(), name='signup_page'),
     path('logout/',views.LogoutView.as_view(), name='logout_page'),
+    path('places/',views.PlaceAutocompleteView.as_view(), name='place_autocomplete'),
 
 ]
\ No newline at end of file
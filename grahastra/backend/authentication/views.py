@@ -5,6 +5,7 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken
+from core.gazetteer import autocomplete
 from .serializers import LoginSerializer, SignupSerializer
 
 User = get_user_model()
@@ -34,11 +35,14 @@ class SignupView(APIView):
                     user = serializer.save()
                     tokens = get_tokens_for_user(user)
 
+                job = serializer.chart_job
                 return Response(
                     {
                         "success": True,
                         "message": "Signup successful",
                         "tokens": tokens,
+                        # The chart is computed in the background; poll /jobs/<id>/ or /mychart/
+                        "chart_job": {"id": job.pk, "status": job.status},
                     },
                     status=status.HTTP_201_CREATED,
                 )
@@ -110,3 +114,21 @@ class LogoutView(APIView):
                 {"success": False, "message": f"Logout failed: {str(e)}"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+
+
+# -------------------------------
+# PLACE AUTOCOMPLETE (signup form)
+# -------------------------------
+
+class PlaceAutocompleteView(APIView):
+    """`?q=koc` -> matching places from the offline gazetteer, most populous first."""
+    permission_classes = [AllowAny]
+    MAX_LIMIT = 20
+
+    def get(self, request):
+        query = request.query_params.get("q", "")
+        try:
+            limit = min(int(request.query_params.get("limit", 10)), self.MAX_LIMIT)
+        except ValueError:
+            return Response({"error": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"results": autocomplete(query, limit=max(limit, 1))}, status=status.HTTP_200_OK)
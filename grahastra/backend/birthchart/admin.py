@@ -1,3 +1,18 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import StoredChart, PanchangDay
+
+
+@admin.register(StoredChart)
+class StoredChartAdmin(admin.ModelAdmin):
+    list_display = ('key', 'birth_utc', 'latitude', 'longitude', 'lagna_sign', 'moon_sign', 'moon_nakshatra')
+    # Integer, indexed columns: filtering never scans the payload JSON
+    list_filter = ('lagna_sign', 'moon_sign', 'moon_nakshatra', 'algorithm_version')
+    search_fields = ('key',)
+
+
+@admin.register(PanchangDay)
+class PanchangDayAdmin(admin.ModelAdmin):
+    list_display = ('date', 'lat_cell', 'lon_cell', 'algorithm_version')
+    list_filter = ('algorithm_version',)
+    date_hierarchy = 'date'
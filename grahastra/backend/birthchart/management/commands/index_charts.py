@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from authentication.models import Profile
+from birthchart.models import StoredChart
+from birthchart.store import index_chart, get_profile_chart
+
+
+class Command(BaseCommand):
+    help = "Fill the population search index (feature columns, rule and placement rows) of stored charts."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true",
+                            help="Re-index every stored chart, not only those missing features.")
+        parser.add_argument("--link-profiles", action="store_true",
+                            help="Also compute and link charts for profiles that have none yet.")
+
+    def handle(self, *args, **options):
+        if options["link_profiles"]:
+            linked = 0
+            profiles = Profile.objects.filter(chart__isnull=True).exclude(birth_date=None).exclude(birth_time=None)
+            for profile in profiles.exclude(latitude=None).exclude(longitude=None).iterator():
+                get_profile_chart(profile)
+                linked += 1
+            self.stdout.write(f"Linked {linked} profiles")
+
+        charts = StoredChart.objects.all()
+        if not options["all"]:
+            charts = charts.filter(moon_navamsa__isnull=True)
+        indexed = 0
+        for stored in charts.iterator():
+            index_chart(stored)
+            indexed += 1
+        self.stdout.write(f"Indexed {indexed} charts")
@@ -0,0 +1,42 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from authentication.models import Profile
+from birthchart.panchang import PANCHANG_MIN_YEAR, PANCHANG_MAX_YEAR, grid_cell, generate_year, missing_years
+
+
+class Command(BaseCommand):
+    help = "Precompute a year of daily panchang for city-grid cells (given locations and/or every profile's)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--year", type=int, default=datetime.date.today().year)
+        parser.add_argument("--location", action="append", default=[], metavar="LAT,LON",
+                            help="A location to precompute; may be repeated.")
+        parser.add_argument("--profiles", action="store_true",
+                            help="Also precompute the cell of every profile's birth place.")
+        parser.add_argument("--force", action="store_true",
+                            help="Regenerate cells that already have the year (missing days are filled).")
+
+    def handle(self, *args, **options):
+        cells = set()
+        for location in options["location"]:
+            try:
+                lat, lon = (float(v) for v in location.split(","))
+            except ValueError:
+                raise CommandError(f"Invalid --location {location!r}, expected LAT,LON")
+            cells.add(grid_cell(lat, lon))
+        if options["profiles"]:
+            coords = Profile.objects.exclude(latitude=None).exclude(longitude=None).values_list("latitude", "longitude")
+            cells.update(grid_cell(lat, lon) for lat, lon in coords.iterator())
+        if not cells:
+            raise CommandError("Nothing to do: pass --location and/or --profiles")
+
+        year = options["year"]
+        if not PANCHANG_MIN_YEAR <= year <= PANCHANG_MAX_YEAR:
+            raise CommandError(f"--year must be within {PANCHANG_MIN_YEAR}-{PANCHANG_MAX_YEAR}")
+        todo = sorted(cells) if options["force"] else missing_years(sorted(cells), year)
+        for cell in todo:
+            written = generate_year(cell, year)
+            self.stdout.write(f"Cell {cell}: {written} days")
+        self.stdout.write(f"Precomputed {len(todo)} of {len(cells)} cells for {year}")
@@ -0,0 +1,50 @@
+# src- grahastra/birthchart/matching.py
+"""
+One-vs-many matchmaking over stored charts.
+
+Candidate Moon factors come straight from the indexed StoredChart columns, so
+a search is one narrow query plus a vectorised `score_matches` pass; the full
+porutham breakdown is only built for the returned top K.
+"""
+
+import numpy as np
+
+from core import compute
+from core.astrology_utils import MANGLIK_BIT, MatchProfile, top_matches, match_report
+from authentication.models import Profile
+from .store import get_profile_chart, index_chart
+
+OPPOSITE_GENDER = {"male": "female", "female": "male"}
+
+
+def match_profile(stored):
+    if stored.moon_navamsa is None:
+        index_chart(stored)
+    return MatchProfile(stored.moon_nakshatra, stored.moon_sign, stored.moon_navamsa,
+                        bool(stored.rule_mask & MANGLIK_BIT))
+
+
+def find_matches(profile, k=20):
+    """[(candidate Profile, match report)] best first; raises KeyError for genders without a match pool."""
+    opposite = OPPOSITE_GENDER[profile.gender]
+    person = match_profile(get_profile_chart(profile))
+
+    rows = (
+        Profile.objects.filter(gender=opposite, chart__moon_navamsa__isnull=False)
+        .exclude(marital_status="married")
+        .exclude(pk=profile.pk)
+        .values_list("id", "chart__moon_nakshatra", "chart__moon_sign", "chart__moon_navamsa", "chart__rule_mask")
+    )
+    data = np.array(list(rows), dtype=np.int64).reshape(-1, 5)
+    person_is_bride = profile.gender == "female"
+    scores = compute.run("score_matches", person, data[:, 1], data[:, 2], data[:, 3],
+                         data[:, 4] & MANGLIK_BIT != 0, person_is_bride=person_is_bride)
+    best = top_matches(scores, k)
+
+    candidates = Profile.objects.select_related("user").in_bulk(data[best, 0].tolist())
+    results = []
+    for i in best.tolist():
+        other = MatchProfile(*data[i, 1:4].tolist(), bool(data[i, 4] & MANGLIK_BIT))
+        report = match_report(person, other) if person_is_bride else match_report(other, person)
+        results.append((candidates[int(data[i, 0])], report))
+    return results
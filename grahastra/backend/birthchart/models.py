@@ -1,6 +1,128 @@
 from django.db import models
 
-# Create your models here.
+from core.astrology_utils import BATCH_BODIES, RASHIS, NAKSHATRAS, RULE_BITS
+
+SIGN_CHOICES = list(enumerate(RASHIS))
+NAKSHATRA_CHOICES = list(enumerate(NAKSHATRAS))
+BODY_CHOICES = list(enumerate(BATCH_BODIES))
+
+
+def _index(value, names):
+    """Accept either a display name or its integer index."""
+    return value if isinstance(value, int) else names.index(value)
+
+
+class StoredChartQuerySet(models.QuerySet):
+    """Population filters; every one resolves to an indexed column or join row."""
+
+    def with_rules(self, *rule_ids):
+        qs = self
+        for rule_id in rule_ids:
+            # One join per rule so several rules must all match
+            qs = qs.filter(rule_rows__rule=RULE_BITS[rule_id])
+        return qs
+
+    def lagna(self, sign):
+        return self.filter(lagna_sign=_index(sign, RASHIS))
+
+    def moon_sign(self, sign):
+        return self.filter(moon_sign=_index(sign, RASHIS))
+
+    def moon_nakshatra(self, nakshatra):
+        return self.filter(moon_nakshatra=_index(nakshatra, NAKSHATRAS))
+
+    def placed(self, planet, house=None, sign=None):
+        lookup = {"placements__body": _index(planet, BATCH_BODIES)}
+        if house is not None:
+            lookup["placements__house"] = house
+        if sign is not None:
+            lookup["placements__sign"] = _index(sign, RASHIS)
+        return self.filter(**lookup)
+
+    def search(self, rules=(), lagna=None, moon_sign=None, nakshatra=None, placements=()):
+        """`placements` is a sequence of (planet, house) pairs."""
+        qs = self.with_rules(*rules)
+        if lagna is not None:
+            qs = qs.lagna(lagna)
+        if moon_sign is not None:
+            qs = qs.moon_sign(moon_sign)
+        if nakshatra is not None:
+            qs = qs.moon_nakshatra(nakshatra)
+        for planet, house in placements:
+            qs = qs.placed(planet, house=house)
+        return qs
+
+
+class StoredChart(models.Model):
+    """Computed chart payload shared by every profile with the same birth inputs.
+
+    `key` is a content hash of (birth minute in UTC, lat, lon, ayanamsa,
+    algorithm version), see `birthchart.store.chart_key`. The integer feature
+    columns and the ChartRule/ChartPlacement rows are the population search
+    index, filled by `birthchart.store.index_chart`.
+    """
+    key = models.CharField(max_length=64, unique=True)
+    birth_utc = models.DateTimeField()
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    ayanamsa = models.CharField(max_length=20)
+    algorithm_version = models.PositiveSmallIntegerField()
+    payload = models.JSONField()
+    yogas = models.JSONField(default=list)
+    lagna_sign = models.PositiveSmallIntegerField(null=True, db_index=True, choices=SIGN_CHOICES)
+    moon_sign = models.PositiveSmallIntegerField(null=True, db_index=True, choices=SIGN_CHOICES)
+    moon_nakshatra = models.PositiveSmallIntegerField(null=True, db_index=True, choices=NAKSHATRA_CHOICES)
+    moon_navamsa = models.PositiveSmallIntegerField(null=True, choices=SIGN_CHOICES)
+    # Matched yoga/dosha rules, bit == core.astrology_utils.RULE_BITS[id]
+    rule_mask = models.BigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = StoredChartQuerySet.as_manager()
+
+    def __str__(self):
+        return f"Chart {self.key[:12]} ({self.birth_utc:%Y-%m-%d %H:%M} UTC)"
+
+
+class ChartRule(models.Model):
+    """One row per yoga/dosha rule a stored chart matches."""
+    chart = models.ForeignKey(StoredChart, on_delete=models.CASCADE, related_name="rule_rows")
+    rule = models.PositiveSmallIntegerField()
+
+    class Meta:
+        # Leading `rule` column serves "every chart with rule X" lookups
+        unique_together = ("rule", "chart")
+
+
+class ChartPlacement(models.Model):
+    """House/sign occupancy of one body in a stored chart."""
+    chart = models.ForeignKey(StoredChart, on_delete=models.CASCADE, related_name="placements")
+    body = models.PositiveSmallIntegerField(choices=BODY_CHOICES)
+    sign = models.PositiveSmallIntegerField(choices=SIGN_CHOICES)
+    house = models.PositiveSmallIntegerField()
+    nakshatra = models.PositiveSmallIntegerField(choices=NAKSHATRA_CHOICES)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["body", "house"]),
+            models.Index(fields=["body", "sign"]),
+            models.Index(fields=["body", "nakshatra"]),
+        ]
+
+
+class PanchangDay(models.Model):
+    """Precomputed panchang of one date for one city-grid cell, see `birthchart.panchang`."""
+    date = models.DateField()
+    # Cell indices: round(degrees / birthchart.panchang.GRID_DEGREES)
+    lat_cell = models.SmallIntegerField()
+    lon_cell = models.SmallIntegerField()
+    algorithm_version = models.PositiveSmallIntegerField()
+    payload = models.JSONField()
+
+    class Meta:
+        unique_together = ("lat_cell", "lon_cell", "algorithm_version", "date")
+
+    def __str__(self):
+        return f"Panchang {self.date} @ ({self.lat_cell}, {self.lon_cell})"
 
 from django.views.generic.edit import UpdateView
 from django.contrib.auth.mixins import LoginRequiredMixin
@@ -0,0 +1,116 @@
+# src- grahastra/birthchart/panchang.py
+"""
+Precomputed daily panchang.
+
+Sunrise (and so every panchang time) moves by well under a minute across a
+city, so locations are quantized to a grid of GRID_DEGREES cells and each cell
+is generated a whole year at a time and shared by everyone in it. Reads go
+through the Django cache, then the PanchangDay table. Reads never compute:
+years are filled ahead by `precompute_panchang`, or by a `panchang_year` job
+that `request_year` queues (the API does so only for a signed-in user's own
+profile cell), so arbitrary callers cannot make the server generate and store
+years for cells nobody lives in.
+
+Lagna tables (ascendant sign/navamsa transition times) are cheap enough to
+root-find on demand and are only cached, per date and grid cell.
+"""
+
+import datetime
+
+from django.core.cache import cache
+
+from core import compute, jobs
+from core.models import Job
+from core.astrology_utils import PANCHANG_ALGORITHM_VERSION, lagna_table, local_to_jd
+from .models import PanchangDay
+
+# ~11 km; sunrise shifts ~25 s per 0.1° of longitude
+GRID_DEGREES = 0.1
+CACHE_PREFIX = "panchang"
+CACHE_TIMEOUT = 7 * 24 * 3600
+# Years the ephemeris tables cover (core.astrology_utils.CHEB_RANGE)
+PANCHANG_MIN_YEAR, PANCHANG_MAX_YEAR = 1900, 2099
+
+
+def grid_cell(lat, lon):
+    return round(lat / GRID_DEGREES), round(lon / GRID_DEGREES)
+
+
+def cell_center(cell):
+    return cell[0] * GRID_DEGREES, cell[1] * GRID_DEGREES
+
+
+def _cache_key(cell, day, kind="day"):
+    return f"{CACHE_PREFIX}:{kind}:{PANCHANG_ALGORITHM_VERSION}:{cell[0]}:{cell[1]}:{day.isoformat()}"
+
+
+def generate_year(cell, year):
+    """Compute and store every day of `year` for a cell; returns the number of rows written."""
+    if not PANCHANG_MIN_YEAR <= year <= PANCHANG_MAX_YEAR:
+        raise ValueError(f"year must be within {PANCHANG_MIN_YEAR}-{PANCHANG_MAX_YEAR}")
+    start = datetime.date(year, 1, 1)
+    days = (datetime.date(year + 1, 1, 1) - start).days
+    lat, lon = cell_center(cell)
+    rows = [
+        PanchangDay(date=datetime.date.fromisoformat(day["date"]), lat_cell=cell[0], lon_cell=cell[1],
+                    algorithm_version=PANCHANG_ALGORITHM_VERSION, payload=day)
+        for day in compute.run("panchang", start, days, lat, lon)
+    ]
+    # Concurrent first requests for the same cell race harmlessly
+    PanchangDay.objects.bulk_create(rows, ignore_conflicts=True)
+    return len(rows)
+
+
+def get_panchang(day, lat, lon):
+    """Precomputed panchang payload of `day` for the grid cell containing (lat, lon), or None if not stored."""
+    cell = grid_cell(lat, lon)
+    key = _cache_key(cell, day)
+    payload = cache.get(key)
+    if payload is not None:
+        return payload
+
+    lookup = dict(lat_cell=cell[0], lon_cell=cell[1], algorithm_version=PANCHANG_ALGORITHM_VERSION, date=day)
+    row = PanchangDay.objects.filter(**lookup).only("payload").first()
+    if row is None:
+        return None
+    cache.set(key, row.payload, timeout=CACHE_TIMEOUT)
+    return row.payload
+
+
+def generate_year_job(lat_cell, lon_cell, year):
+    """core.jobs handler for `panchang_year`; a no-op once the year is stored."""
+    cell = (lat_cell, lon_cell)
+    if missing_years([cell], year):
+        generate_year(cell, year)
+
+
+def request_year(cell, year, user=None):
+    """Queue generation of a cell's year for `user` unless they already have it queued or running; returns the Job.
+
+    Jobs are per user so each requester can poll their own; once the year is stored the rest are no-ops.
+    """
+    kwargs = {"lat_cell": cell[0], "lon_cell": cell[1], "year": year}
+    pending = (Job.objects.filter(kind="panchang_year", kwargs=kwargs, user=user,
+                                  status__in=[Job.QUEUED, Job.RUNNING]).first())
+    return pending or jobs.enqueue("panchang_year", user=user, **kwargs)
+
+
+def get_lagna_table(day, lat, lon):
+    """Lagna/navamsa spans from 00:00 to 24:00 IST of `day` for the grid cell containing (lat, lon)."""
+    cell = grid_cell(lat, lon)
+    key = _cache_key(cell, day, "lagna")
+    spans = cache.get(key)
+    if spans is None:
+        start = local_to_jd(datetime.datetime.combine(day, datetime.time()))
+        spans = [span.as_dict() for span in lagna_table(start, start + 1.0, *cell_center(cell))]
+        cache.set(key, spans, timeout=CACHE_TIMEOUT)
+    return spans
+
+
+def missing_years(cells, year):
+    """The cells (of `cells`) with no stored panchang for `year` at the current version."""
+    done = set(
+        PanchangDay.objects.filter(algorithm_version=PANCHANG_ALGORITHM_VERSION, date=datetime.date(year, 1, 1))
+        .values_list("lat_cell", "lon_cell")
+    )
+    return [cell for cell in cells if tuple(cell) not in done]
@@ -0,0 +1,176 @@
+# src- grahastra/birthchart/store.py
+"""
+Content-addressed chart storage.
+
+A chart depends only on the birth minute (UTC), the location, the ayanamsa and
+the algorithm version, so it is computed once per distinct input and shared by
+every profile that hashes to the same key.
+"""
+
+import datetime
+import hashlib
+
+from django.db import transaction
+
+from authentication.models import Profile
+
+from core.astrology_utils import (
+    AYANAMSA, CHART_ALGORITHM_VERSION, IST_OFFSET, BATCH_BODIES, RASHIS, NAKSHATRAS,
+    Chart, ChartContext, get_nakshatra, format_deg, get_rasi_lord, get_nakshatra_lord,
+    compute_varga_indices, calculate_navamsa_chart
+)
+from .models import StoredChart, ChartRule, ChartPlacement
+from .serializers import PlanetSerializer, NavamsaSerializer
+
+# ~11 m; finer differences do not move any chart factor
+COORD_DECIMALS = 4
+
+
+def birth_utc(birth_date, birth_time):
+    """Birth moment in UTC, truncated to the minute (birth data is stored as IST)."""
+    local = datetime.datetime.combine(birth_date, birth_time).replace(second=0, microsecond=0)
+    return (local - IST_OFFSET).replace(tzinfo=datetime.timezone.utc)
+
+
+def chart_key(utc_dt, lat, lon, ayanamsa=AYANAMSA, version=CHART_ALGORITHM_VERSION):
+    raw = f"{utc_dt:%Y-%m-%dT%H:%M}|{lat:.{COORD_DECIMALS}f}|{lon:.{COORD_DECIMALS}f}|{ayanamsa}|{version}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def build_chart_payload(ctx, chart):
+    """Dashboard chart payload (the `chart` block of BirthChartAPI)."""
+    asc_deg, lagna_sign = ctx.asc_deg, ctx.asc_sign
+    nakshatra = NAKSHATRAS[chart.nakshatra("Moon")]
+
+    # Navamsa chart
+    navamsa = []
+    for planet, nav in zip(BATCH_BODIES, compute_varga_indices(chart.longitudes, ["D9"])[0].tolist()):
+        navamsa.append({"name": planet, "navamsa_rasi": RASHIS[nav], "rasi_lord": get_rasi_lord(RASHIS[nav])})
+
+    # Bhava chart
+    bhava_chart = {str(i): [] for i in range(1, 13)}
+    for planet, house in zip(BATCH_BODIES, chart.houses):
+        bhava_chart[str(house)].append(planet)
+
+    # Planets payload: include both raw number and display string
+    planets = [
+        {
+            "name": "Ascendant",
+            "degree": asc_deg,
+            "degree_str": format_deg(asc_deg),
+            "rasi": lagna_sign,
+            "rasi_lord": get_rasi_lord(lagna_sign),
+            "nakshatra": get_nakshatra(asc_deg),
+            "nakshatra_lord": get_nakshatra_lord(get_nakshatra(asc_deg)),
+        }
+    ]
+    for i, name in enumerate(BATCH_BODIES):
+        deg = chart.longitudes[i]
+        rasi = RASHIS[chart.signs[i]]
+        nak = NAKSHATRAS[chart.nakshatras[i]]
+        planets.append({
+            "name": name,
+            "degree": deg,
+            "degree_str": format_deg(deg),
+            "rasi": rasi,
+            "rasi_lord": get_rasi_lord(rasi),
+            "nakshatra": nak,
+            "nakshatra_lord": get_nakshatra_lord(nak),
+        })
+
+    payload = {
+        "Lagna": lagna_sign,
+        "Nakshatra": nakshatra,
+        "Planets": PlanetSerializer(planets, many=True).data,
+        "Navamsa": NavamsaSerializer(navamsa, many=True).data,
+        "Bhava": bhava_chart,
+    }
+    return payload
+
+
+def chart_features(chart):
+    """Indexed search columns for a chart, plus its matched-rule bitmask."""
+    _yogas, _doshas, matched = chart.evaluate()
+    return {
+        "lagna_sign": int(chart.asc // 30) % 12,
+        "moon_sign": chart.sign("Moon"),
+        "moon_nakshatra": chart.nakshatra("Moon"),
+        "moon_navamsa": RASHIS.index(calculate_navamsa_chart({"Moon": chart.longitude("Moon")})["Moon"]),
+        "rule_mask": matched,
+    }
+
+
+def chart_from_payload(payload):
+    """Rebuild the Chart of a stored payload (degrees are stored at full display precision)."""
+    degrees = {p["name"]: float(p["degree"]) for p in payload["Planets"]}
+    return Chart.from_positions(degrees, degrees.pop("Ascendant"))
+
+
+def index_chart(stored, chart=None):
+    """(Re)write the search columns and join rows of a stored chart."""
+    chart = chart or chart_from_payload(stored.payload)
+    features = chart_features(chart)
+    with transaction.atomic():
+        StoredChart.objects.filter(pk=stored.pk).update(**features)
+        for name, value in features.items():
+            setattr(stored, name, value)
+        stored.rule_rows.all().delete()
+        ChartRule.objects.bulk_create(
+            ChartRule(chart=stored, rule=bit) for bit in range(features["rule_mask"].bit_length())
+            if features["rule_mask"] >> bit & 1
+        )
+        stored.placements.all().delete()
+        ChartPlacement.objects.bulk_create(
+            ChartPlacement(chart=stored, body=body, sign=chart.signs[body], house=chart.houses[body],
+                           nakshatra=chart.nakshatras[body])
+            for body in range(len(BATCH_BODIES))
+        )
+    return stored
+
+
+def get_or_create_chart(birth_date, birth_time, lat, lon):
+    utc_dt = birth_utc(birth_date, birth_time)
+    lat, lon = round(lat, COORD_DECIMALS), round(lon, COORD_DECIMALS)
+    key = chart_key(utc_dt, lat, lon)
+    stored = StoredChart.objects.filter(key=key).first()
+    if stored is not None:
+        return stored
+
+    ctx = ChartContext.from_datetime(utc_dt.replace(tzinfo=None) + IST_OFFSET, lat, lon)
+    chart = Chart.from_context(ctx)
+    stored, created = StoredChart.objects.get_or_create(
+        key=key,
+        defaults={
+            "birth_utc": utc_dt,
+            "latitude": lat,
+            "longitude": lon,
+            "ayanamsa": AYANAMSA,
+            "algorithm_version": CHART_ALGORITHM_VERSION,
+            "payload": build_chart_payload(ctx, chart),
+            "yogas": chart.yogas(),
+        },
+    )
+    if created:
+        index_chart(stored, chart)
+    return stored
+
+
+def get_profile_chart(profile):
+    """Stored chart for a profile; recomputed only when the link was invalidated or is stale."""
+    stored = profile.chart
+    if stored is not None and stored.algorithm_version == CHART_ALGORITHM_VERSION:
+        return stored
+    stored = get_or_create_chart(profile.birth_date, profile.birth_time, profile.latitude, profile.longitude)
+    profile.chart = stored
+    profile.save(update_fields=["chart"])
+    return stored
+
+
+def natal_longitude(stored, planet):
+    """Sidereal longitude of a body from a stored payload, without touching the ephemeris."""
+    return next(float(p["degree"]) for p in stored.payload["Planets"] if p["name"] == planet)
+
+
+def search_profiles(**filters):
+    """Profiles whose linked chart matches `StoredChartQuerySet.search(**filters)`."""
+    return Profile.objects.filter(chart__in=StoredChart.objects.search(**filters))
@@ -1,3 +1,171 @@
+import datetime
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from authentication.models import Profile
+from core.astrology_utils import AYANAMSA, BATCH_BODIES, CHART_ALGORITHM_VERSION, RULE_BITS, Chart
+from core.models import Job
+from .models import ChartPlacement, StoredChart
+from .store import birth_utc, chart_key, get_or_create_chart, get_profile_chart, index_chart
+
+
+def client_for(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+    return client
+
+
+class PanchangAPITests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email="meera@example.com", password="x")
+        Profile.objects.create(user=self.user, latitude=9.9312, longitude=76.2673)
+
+    def get(self, client, **params):
+        return client.get(reverse("panchang"), {"date": "2026-05-01", **params})
+
+    def test_out_of_range_date(self):
+        for date in ("9999-12-31", "1899-12-31"):
+            self.assertEqual(self.get(APIClient(), date=date, lat=10, lon=76).status_code, 400)
+
+    def test_anonymous_miss_is_not_generated(self):
+        self.assertEqual(self.get(APIClient(), lat=9.93, lon=76.27).status_code, 404)
+        self.assertFalse(Job.objects.exists())
+
+    def test_own_cell_miss_queues_a_pollable_job(self):
+        client = client_for(self.user)
+        response = self.get(client)
+        self.assertEqual(response.status_code, 503)
+        job_id = response.data["job"]["id"]
+        self.assertEqual(self.get(client).data["job"]["id"], job_id)  # not queued twice
+
+        status = client.get(reverse("job_status", args=[job_id]))
+        self.assertEqual(status.status_code, 200)
+        self.assertEqual(status.data["kind"], "panchang_year")
+        # Another cell is not generated on demand
+        self.assertEqual(self.get(client, lat=20.0, lon=76.0).status_code, 404)
+
+
+BIRTH = dict(birth_date=datetime.date(1985, 6, 15), birth_time=datetime.time(14, 20),
+             latitude=12.9716, longitude=77.5946)
+
+
+class ChartStoreTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(email="ravi@example.com", password="x")
+        self.profile = Profile.objects.create(user=user, **BIRTH)
+
+    def test_same_inputs_share_one_chart(self):
+        first = get_or_create_chart(*BIRTH.values())
+        # Seconds and sub-4-decimal coordinate differences hash to the same key
+        again = get_or_create_chart(BIRTH["birth_date"], datetime.time(14, 20, 45), 12.97161, 77.59464)
+        self.assertEqual(again.pk, first.pk)
+        self.assertEqual(StoredChart.objects.count(), 1)
+        self.assertEqual(first.key, chart_key(birth_utc(BIRTH["birth_date"], BIRTH["birth_time"]), 12.9716, 77.5946))
+
+        other = get_or_create_chart(BIRTH["birth_date"], datetime.time(14, 21), 12.9716, 77.5946)
+        self.assertNotEqual(other.pk, first.pk)
+
+    def test_profile_chart_is_reused(self):
+        stored = get_profile_chart(self.profile)
+        self.assertEqual(self.profile.chart_id, stored.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_profile_chart(self.profile), stored)
+
+    def test_stale_version_is_recomputed(self):
+        stored = get_profile_chart(self.profile)
+        old = CHART_ALGORITHM_VERSION - 1
+        StoredChart.objects.filter(pk=stored.pk).update(
+            algorithm_version=old,
+            key=chart_key(stored.birth_utc, stored.latitude, stored.longitude, version=old),
+        )
+        profile = Profile.objects.get(pk=self.profile.pk)
+        fresh = get_profile_chart(profile)
+        self.assertNotEqual(fresh.pk, stored.pk)
+        self.assertEqual(fresh.algorithm_version, CHART_ALGORITHM_VERSION)
+        self.assertEqual(Profile.objects.get(pk=self.profile.pk).chart_id, fresh.pk)
+
+    def test_birth_change_invalidates_link(self):
+        stored = get_profile_chart(self.profile)
+        profile = Profile.objects.get(pk=self.profile.pk)
+        profile.birth_time = datetime.time(5, 45)
+        profile.save()
+        profile.refresh_from_db()
+        self.assertIsNone(profile.chart_id)
+
+        fresh = get_profile_chart(profile)
+        self.assertNotEqual(fresh.pk, stored.pk)
+        self.assertEqual(fresh.birth_utc, birth_utc(BIRTH["birth_date"], datetime.time(5, 45)))
+
+
+def hand_chart(asc=15.0, **longitudes):
+    """Every body at 20° of its sign unless overridden; with the Lagna at 15° Medam, house == sign + 1."""
+    signs = {'Sun': 0, 'Moon': 4, 'Mars': 2, 'Mercury': 11, 'Jupiter': 6, 'Venus': 9,
+             'Saturn': 3, 'Rahu': 7, 'Ketu': 1}
+    lon = {b: s * 30 + 20.0 for b, s in signs.items()}
+    lon.update(longitudes)
+    return Chart([lon[b] for b in BATCH_BODIES], asc)
+
+
+def indexed(key, asc=15.0, **longitudes):
+    stored = StoredChart.objects.create(
+        key=key, birth_utc=datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc), latitude=0, longitude=0,
+        ayanamsa=AYANAMSA, algorithm_version=CHART_ALGORITHM_VERSION, payload={},
+    )
+    return index_chart(stored, hand_chart(asc, **longitudes))
+
+
+class ChartSearchTests(TestCase):
+    def setUp(self):
+        # quiet: Lagna Medam, Moon 20° Chingam (Pooram), only Raja Yoga
+        self.quiet = indexed("quiet")
+        # Moon 20° Karkidakam (Ayilyam), 4th from Lagna with Jupiter 7th: Gajakesari
+        self.kesari = indexed("kesari", Moon=110.0)
+        # Lagna Edavam shifts every house down by one; Mercury joins the Sun
+        self.taurus = indexed("taurus", asc=45.0, Mercury=25.0)
+
+    def keys(self, qs):
+        return sorted(qs.values_list("key", flat=True))
+
+    def test_index_columns(self):
+        self.assertEqual((self.quiet.lagna_sign, self.quiet.moon_sign, self.quiet.moon_nakshatra), (0, 4, 10))
+        self.assertEqual(self.kesari.moon_nakshatra, 8)
+        self.assertEqual(self.quiet.rule_mask, 1 << RULE_BITS["raja"])
+        self.assertEqual(list(self.quiet.rule_rows.values_list("rule", flat=True)), [RULE_BITS["raja"]])
+        moon = self.taurus.placements.get(body=BATCH_BODIES.index("Moon"))
+        self.assertEqual((moon.sign, moon.house), (4, 4))
+
+    def test_search_filters(self):
+        search = StoredChart.objects.search
+        self.assertEqual(self.keys(search(lagna="Medam")), ["kesari", "quiet"])
+        self.assertEqual(self.keys(search(lagna=1)), ["taurus"])
+        self.assertEqual(self.keys(search(moon_sign="Chingam")), ["quiet", "taurus"])
+        self.assertEqual(self.keys(search(nakshatra=8)), ["kesari"])
+        self.assertEqual(self.keys(search(placements=[("Moon", 5)])), ["quiet"])
+        self.assertEqual(self.keys(search(placements=[("Moon", 5), ("Jupiter", 7)])), ["quiet"])
+        self.assertEqual(self.keys(search(rules=["gajakesari"])), ["kesari"])
+        self.assertEqual(self.keys(search(rules=["budhaditya"], moon_sign=4)), ["taurus"])
+        self.assertEqual(self.keys(search(rules=["gajakesari", "budhaditya"])), [])
+        self.assertEqual(self.keys(search()), ["kesari", "quiet", "taurus"])
+
+    def test_reindex_replaces_rows(self):
+        index_chart(self.quiet, hand_chart(Moon=110.0))
+        self.assertEqual(self.keys(StoredChart.objects.search(rules=["gajakesari"])), ["kesari", "quiet"])
+        self.assertEqual(self.keys(StoredChart.objects.search(moon_sign=4)), ["taurus"])
+        self.assertEqual(ChartPlacement.objects.filter(chart=self.quiet).count(), len(BATCH_BODIES))
+        self.assertFalse(StoredChart.objects.search(placements=[("Moon", 5)]).exists())
+
+    def test_index_from_stored_payload(self):
+        stored = get_or_create_chart(*BIRTH.values())
+        columns = ("lagna_sign", "moon_sign", "moon_nakshatra", "moon_navamsa", "rule_mask")
+        before = StoredChart.objects.filter(pk=stored.pk).values(*columns).get()
+        rules = sorted(stored.rule_rows.values_list("rule", flat=True))
+        StoredChart.objects.filter(pk=stored.pk).update(lagna_sign=None, moon_sign=None, rule_mask=0)
+        stored.rule_rows.all().delete()
 
-# Create your tests here.
+        index_chart(StoredChart.objects.get(pk=stored.pk))
+        self.assertEqual(StoredChart.objects.filter(pk=stored.pk).values(*columns).get(), before)
+        self.assertEqual(sorted(stored.rule_rows.values_list("rule", flat=True)), rules)
@@ -1,9 +1,19 @@
 # urls.py
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
-from .views import BirthChartAPI
+from .views import (
+    BirthChartAPI, BirthTimeUncertaintyAPI, TransitTimelineAPI, ChartSearchAPI, MatchesAPI, MuhurtaAPI,
+    PanchangAPI, LagnaTableAPI,
+)
 
 urlpatterns = [
     path("mychart/", BirthChartAPI.as_view(), name="mychart"),
+    path("mychart/uncertainty/", BirthTimeUncertaintyAPI.as_view(), name="birth_time_uncertainty"),
+    path("transits/timeline/", TransitTimelineAPI.as_view(), name="transit_timeline"),
+    path("search/", ChartSearchAPI.as_view(), name="chart_search"),
+    path("matches/", MatchesAPI.as_view(), name="matches"),
+    path("muhurta/", MuhurtaAPI.as_view(), name="muhurta"),
+    path("panchang/", PanchangAPI.as_view(), name="panchang"),
+    path("panchang/lagna/", LagnaTableAPI.as_view(), name="lagna_table"),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
 ]
\ No newline at end of file
@@ -1,20 +1,23 @@
 # src- grahastra/dashboard/views.py
 
-import swisseph as swe
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.views import APIView
 from rest_framework import status
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from .models import Profile
 import datetime
-from core.astrology_utils import (
-    get_planet_positions, get_nakshatra,
-    calculate_lagna, get_birth_chart_data,
-    format_deg, get_rasi_lord, get_sign_name, get_nakshatra_lord,
-    calculate_navamsa_chart, get_house_placements
-)
-from .serializers import ProfileSerializer, PlanetSerializer, NavamsaSerializer
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from core import compute
+from core.models import Job
+from core.timing import stage
+from core.astrology_utils import local_to_jd, muhurta_windows, best_muhurtas, MUHURTA_EVENTS
+from .models import Profile
+from .serializers import ProfileSerializer
+from .store import get_profile_chart, natal_longitude, search_profiles
+from .matching import find_matches
+from .panchang import PANCHANG_MIN_YEAR, PANCHANG_MAX_YEAR, get_panchang, get_lagna_table, grid_cell, request_year
 
 class BirthChartAPI(APIView):
     authentication_classes = [JWTAuthentication]
@@ -22,11 +25,18 @@ class BirthChartAPI(APIView):
 
     def get(self, request, *args, **kwargs):
         user = request.user
-        try:
-            profile = user.profile
-        except Profile.DoesNotExist:
+        # One indexed lookup: profile joined with its stored chart
+        profile = Profile.objects.select_related("chart").filter(user=user).first()
+        if profile is None:
             return Response({"error": "Profile not found"}, status=status.HTTP_404_NOT_FOUND)
 
+        if profile.chart_id is None:
+            # Signup computes the first chart in the background (authentication.jobs)
+            job = user.jobs.filter(kind="profile_chart").exclude(status=Job.DONE).order_by("-id").first()
+            if job is not None and job.status != Job.FAILED:
+                return Response({"status": "pending", "job": {"id": job.pk, "status": job.status}},
+                                status=status.HTTP_202_ACCEPTED)
+
         # ensure required data
         if not all([profile.birth_date, profile.birth_time, profile.latitude, profile.longitude]):
             return Response(
@@ -34,85 +44,307 @@ class BirthChartAPI(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Convert to UTC (assumes IST stored)
-        dt = datetime.datetime.combine(profile.birth_date, profile.birth_time)
-        dt_utc = dt - datetime.timedelta(hours=5, minutes=30)
-        jd = swe.julday(
-            dt_utc.year, dt_utc.month, dt_utc.day,
-            dt_utc.hour + dt_utc.minute / 60.0
-        )
-
-        # Ephemeris setup
-        swe.set_ephe_path('core/ephe/')
-        swe.set_sid_mode(swe.SIDM_LAHIRI)
-
-        # Planet positions
-        positions = get_planet_positions(
-            profile.birth_date.strftime('%Y-%m-%d'),
-            profile.birth_time.strftime('%H:%M'),
-            profile.latitude,
-            profile.longitude
-        )
-
-        # Lagna & Nakshatra
-        asc_deg, lagna_sign = calculate_lagna(jd, profile.latitude, profile.longitude)
-        nakshatra = get_nakshatra(positions["Moon"])
-
-        # Main chart (if you use it elsewhere)
-        _ = get_birth_chart_data(positions, nakshatra, asc_deg)
-
-        # Navamsa chart
-        navamsa = [
-            {"name": planet, "navamsa_rasi": nav_rasi, "rasi_lord": get_rasi_lord(nav_rasi)}
-            for planet, nav_rasi in calculate_navamsa_chart(positions).items()
-        ]
-
-        # Bhava chart
-        bhava_chart = {str(i): [] for i in range(1, 13)}
-        for planet, house in get_house_placements(positions, asc_deg).items():
-            bhava_chart[str(house)].append(planet)
-
-        # Planets payload: include both raw number and display string
-        planets = [
-            {
-                "name": "Ascendant",
-                "degree": asc_deg,
-                "degree_str": format_deg(asc_deg),
-                "rasi": lagna_sign,
-                "rasi_lord": get_rasi_lord(lagna_sign),
-                "nakshatra": get_nakshatra(asc_deg),
-                "nakshatra_lord": get_nakshatra_lord(get_nakshatra(asc_deg)),
-            }
-        ]
-        for name in ["Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Rahu", "Ketu"]:
-            deg = positions[name]
-            rasi = get_sign_name(deg)
-            nak = get_nakshatra(deg)
-            planets.append({
-                "name": name,
-                "degree": deg,
-                "degree_str": format_deg(deg),
-                "rasi": rasi,
-                "rasi_lord": get_rasi_lord(rasi),
-                "nakshatra": nak,
-                "nakshatra_lord": get_nakshatra_lord(nak),
-            })
+        with stage("chart"):
+            stored = get_profile_chart(profile)
+
+        with stage("serialize"):
+            profile_data = ProfileSerializer(profile).data
 
         return Response({
             "user": {
                 "first_name": user.first_name,
                 "last_name": user.last_name,
-                "profile": ProfileSerializer(profile).data,
+                "profile": profile_data,
             },
-            "chart": {
-                "Lagna": lagna_sign,
-                "Nakshatra": nakshatra,
-                "Planets": PlanetSerializer(planets, many=True).data,
-                "Navamsa": NavamsaSerializer(navamsa, many=True).data,
-                "Bhava": bhava_chart,
-            }
+            "chart": stored.payload,
+        }, status=status.HTTP_200_OK)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        # Render here (instead of in the handler) so JSON encoding is its own stage
+        with stage("render"):
+            response.render()
+        return response
+
+
+class TransitTimelineAPI(APIView):
+    """Sade-Sati / Kantaka Shani / Jupiter-favourable windows relative to the natal Moon."""
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    MAX_YEARS = 120
+
+    def get(self, request, *args, **kwargs):
+        profile = Profile.objects.select_related("chart").filter(user=request.user).first()
+        if profile is None:
+            return Response({"error": "Profile not found"}, status=status.HTTP_404_NOT_FOUND)
+        if not all([profile.birth_date, profile.birth_time, profile.latitude, profile.longitude]):
+            return Response(
+                {"error": "Please complete your birth details in the profile page."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            start = request.query_params.get("start")
+            start_date = datetime.date.fromisoformat(start) if start else profile.birth_date
+            years = min(int(request.query_params.get("years", 100)), self.MAX_YEARS)
+        except ValueError:
+            return Response({"error": "Use start=YYYY-MM-DD and an integer years."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if years < 1:
+            return Response({"error": "years must be at least 1."}, status=status.HTTP_400_BAD_REQUEST)
+
+        moon = natal_longitude(get_profile_chart(profile), "Moon")
+        start_jd = local_to_jd(datetime.datetime.combine(start_date, datetime.time()))
+        timeline = compute.run("sade_sati", moon, start_jd, start_jd + years * 365.25)
+        return Response({"start": start_date, "years": years, "timeline": timeline}, status=status.HTTP_200_OK)
+
+
+class BirthTimeUncertaintyAPI(APIView):
+    """Spans of `birth time ± minutes` over which lagna, navamsa lagna, Moon nakshatra/pada,
+    house placements and yogas/doshas stay constant (`?minutes=120`)."""
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    MAX_MINUTES = 240
+
+    def get(self, request, *args, **kwargs):
+        profile = Profile.objects.filter(user=request.user).first()
+        if profile is None:
+            return Response({"error": "Profile not found"}, status=status.HTTP_404_NOT_FOUND)
+        if not all([profile.birth_date, profile.birth_time, profile.latitude, profile.longitude]):
+            return Response(
+                {"error": "Please complete your birth details in the profile page."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            minutes = int(request.query_params.get("minutes", 60))
+        except ValueError:
+            return Response({"error": "minutes must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        minutes = max(1, min(minutes, self.MAX_MINUTES))
+
+        jd = local_to_jd(datetime.datetime.combine(profile.birth_date, profile.birth_time))
+        segments = compute.run("birth_time_segments", jd, minutes, profile.latitude, profile.longitude)
+        recorded = next(i for i, seg in enumerate(segments) if seg.start_jd <= jd <= seg.end_jd)
+        return Response({
+            "minutes": minutes,
+            "recorded_segment": recorded,
+            "segments": [seg.as_dict() for seg in segments],
+        }, status=status.HTTP_200_OK)
+
+
+class ChartSearchAPI(APIView):
+    """Staff segment search over stored charts, e.g. `?rule=gajakesari&nakshatra=Rohini&placement=Jupiter:10`.
+
+    Every filter maps to an indexed column or join row (see `StoredChartQuerySet`).
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAdminUser]
+
+    MAX_LIMIT = 1000
+
+    def get(self, request, *args, **kwargs):
+        params = request.query_params
+        try:
+            placements = []
+            for item in params.getlist("placement"):
+                planet, house = item.split(":")
+                placements.append((planet, int(house)))
+            limit = min(int(params.get("limit", 100)), self.MAX_LIMIT)
+            profiles = search_profiles(
+                rules=params.getlist("rule"),
+                lagna=params.get("lagna"),
+                moon_sign=params.get("moon_sign"),
+                nakshatra=params.get("nakshatra"),
+                placements=placements,
+            )
+        except (KeyError, ValueError):
+            return Response({"error": "Unknown rule, sign, nakshatra or placement."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        rows = profiles.select_related("user").order_by("id")[:limit]
+        return Response({
+            "count": profiles.count(),
+            "results": [
+                {
+                    "profile": p.id,
+                    "email": p.user.email,
+                    "name": f"{p.user.first_name} {p.user.last_name}".strip(),
+                    "nakshatra": p.nakshatra,
+                    "lagna": p.lagna,
+                }
+                for p in rows
+            ],
+        }, status=status.HTTP_200_OK)
+
+
+class MatchesAPI(APIView):
+    """Top-K Porutham / Ashtakoota matches for the requesting user's profile."""
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    MAX_K = 100
+
+    def get(self, request, *args, **kwargs):
+        profile = Profile.objects.select_related("chart").filter(user=request.user).first()
+        if profile is None:
+            return Response({"error": "Profile not found"}, status=status.HTTP_404_NOT_FOUND)
+        if not all([profile.birth_date, profile.birth_time, profile.latitude, profile.longitude]):
+            return Response(
+                {"error": "Please complete your birth details in the profile page."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if profile.gender not in ("male", "female"):
+            return Response({"error": "Please set your gender in the profile page."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            k = max(1, min(int(request.query_params.get("k", 20)), self.MAX_K))
+        except ValueError:
+            return Response({"error": "k must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            "matches": [
+                {
+                    "profile": other.id,
+                    "name": f"{other.user.first_name} {other.user.last_name}".strip(),
+                    "nakshatra": other.nakshatra,
+                    "lagna": other.lagna,
+                    **report,
+                }
+                for other, report in find_matches(profile, k)
+            ]
         }, status=status.HTTP_200_OK)
 
 
+class MuhurtaAPI(APIView):
+    """Auspicious windows for an event, streamed as NDJSON (one window per line, in time order).
+
+    `?event=marriage&start=YYYY-MM-DD&days=30[&lat=..&lon=..][&min_score=..]`; the location
+    defaults to the profile's, and tarabala uses the profile's natal Moon. With `&top=K` the
+    K best-scoring windows are returned instead, as one JSON list.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    MAX_DAYS = 92
+    MAX_TOP = 50
+
+    def get(self, request, *args, **kwargs):
+        profile = Profile.objects.select_related("chart").filter(user=request.user).first()
+        if profile is None:
+            return Response({"error": "Profile not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        params = request.query_params
+        event = params.get("event", "marriage")
+        if event not in MUHURTA_EVENTS:
+            return Response({"error": f"event must be one of {', '.join(MUHURTA_EVENTS)}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            start = params.get("start")
+            start_date = datetime.date.fromisoformat(start) if start else datetime.date.today()
+            days = min(int(params.get("days", 30)), self.MAX_DAYS)
+            lat = float(params.get("lat", profile.latitude))
+            lon = float(params.get("lon", profile.longitude))
+            min_score = float(params.get("min_score", 0))
+            top = params.get("top")
+            top = min(int(top), self.MAX_TOP) if top is not None else None
+        except (TypeError, ValueError):
+            return Response({"error": "Use start=YYYY-MM-DD, integer days/top and numeric lat/lon/min_score."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if days < 1 or (top is not None and top < 1):
+            return Response({"error": "days and top must be at least 1."}, status=status.HTTP_400_BAD_REQUEST)
+        if not _location_in_range(lat, lon):
+            return Response({"error": "Location out of range."}, status=status.HTTP_400_BAD_REQUEST)
+
+        natal_moon = None
+        if all([profile.birth_date, profile.birth_time, profile.latitude, profile.longitude]):
+            natal_moon = natal_longitude(get_profile_chart(profile), "Moon")
+
+        start_jd = local_to_jd(datetime.datetime.combine(start_date, datetime.time()))
+        windows = muhurta_windows(event, start_jd, start_jd + days, lat, lon, natal_moon)
+        windows = (w for w in windows if w.score >= min_score)
+        if top is not None:
+            # Ranking needs the whole scan, so this form is not streamed
+            return Response({"windows": [w.as_dict() for w in best_muhurtas(windows, top)]},
+                            status=status.HTTP_200_OK)
+        lines = (json.dumps(w.as_dict(), cls=DjangoJSONEncoder) + "\n" for w in windows)
+        return StreamingHttpResponse(lines, content_type="application/x-ndjson")
+
+
+def _location_in_range(lat, lon):
+    # No daily sunrise/sunset (and no house cusps) inside the polar circles
+    return -66.0 <= lat <= 66.0 and -180.0 <= lon <= 180.0
+
+
+def _day_and_location(request):
+    """(date, lat, lon) from `?date=&lat=&lon=`, defaulting to today and the profile's location.
 
-#have to order function call
+    Returns a 400 Response instead when the parameters are missing or invalid.
+    """
+    params = request.query_params
+    lat, lon = params.get("lat"), params.get("lon")
+    if lat is None or lon is None:
+        profile = None
+        if request.user.is_authenticated:
+            profile = Profile.objects.filter(user=request.user).first()
+        if profile is None or profile.latitude is None or profile.longitude is None:
+            return Response({"error": "lat and lon are required."}, status=status.HTTP_400_BAD_REQUEST)
+        lat, lon = profile.latitude, profile.longitude
+    try:
+        day = params.get("date")
+        day = datetime.date.fromisoformat(day) if day else datetime.date.today()
+        lat, lon = float(lat), float(lon)
+    except ValueError:
+        return Response({"error": "Use date=YYYY-MM-DD and numeric lat/lon."}, status=status.HTTP_400_BAD_REQUEST)
+    if not PANCHANG_MIN_YEAR <= day.year <= PANCHANG_MAX_YEAR:
+        return Response({"error": f"date must be within {PANCHANG_MIN_YEAR}-{PANCHANG_MAX_YEAR}."},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if not _location_in_range(lat, lon):
+        return Response({"error": "Location out of range."}, status=status.HTTP_400_BAD_REQUEST)
+    return day, lat, lon
+
+
+class PanchangAPI(APIView):
+    """Daily panchang, `?date=YYYY-MM-DD&lat=..&lon=..`, served from precomputed city-grid data.
+
+    Anonymous callers must pass lat/lon; signed-in users default to their profile's location.
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        parsed = _day_and_location(request)
+        if isinstance(parsed, Response):
+            return parsed
+        payload = get_panchang(*parsed)
+        if payload is not None:
+            return Response(payload, status=status.HTTP_200_OK)
+
+        # Not precomputed: only a signed-in user's own cell is generated on demand, in the background
+        day, lat, lon = parsed
+        cell = grid_cell(lat, lon)
+        profile = None
+        if request.user.is_authenticated:
+            profile = Profile.objects.filter(user=request.user).exclude(latitude=None).exclude(longitude=None).first()
+        if profile is not None and grid_cell(profile.latitude, profile.longitude) == cell:
+            job = request_year(cell, day.year, user=request.user)
+            response = Response({"error": "Panchang for this date is being prepared, retry shortly.",
+                                 "job": {"id": job.pk, "status": job.status}},
+                                status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            response["Retry-After"] = "30"
+            return response
+        return Response({"error": "No precomputed panchang for this date and location."},
+                        status=status.HTTP_404_NOT_FOUND)
+
+
+class LagnaTableAPI(APIView):
+    """Lagna and navamsa-lagna spans over a day (IST), same parameters as PanchangAPI."""
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        parsed = _day_and_location(request)
+        if isinstance(parsed, Response):
+            return parsed
+        return Response(get_lagna_table(*parsed), status=status.HTTP_200_OK)
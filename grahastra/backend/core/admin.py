@@ -1,3 +1,32 @@
 from django.contrib import admin
 
 # Register your models here.
+from .models import GeocodeCache, Job, OutboxMessage, Place
+
+
+@admin.register(Place)
+class PlaceAdmin(admin.ModelAdmin):
+    list_display = ('name', 'admin1', 'country_code', 'latitude', 'longitude', 'population')
+    search_fields = ('name', 'ascii_name')
+    list_filter = ('country_code',)
+
+
+@admin.register(GeocodeCache)
+class GeocodeCacheAdmin(admin.ModelAdmin):
+    list_display = ('query', 'latitude', 'longitude', 'created_at')
+    search_fields = ('query',)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'attempts', 'run_after', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status')
+    readonly_fields = ('last_error',)
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'subject', 'campaign', 'status', 'attempts', 'created_at', 'sent_at')
+    list_filter = ('status', 'campaign')
+    search_fields = ('recipient',)
+    readonly_fields = ('last_error',)
@@ -15,17 +15,30 @@ Caveats:
   but structured to allow future replacement with rigorous calculations.
 - All angular math is done in 0–360° with helper utilities provided.
 
-Dependencies: `pyswisseph` as `swisseph` (import as `swe`).
+Dependencies: `pyswisseph` as `swisseph` (import as `swe`), `numpy` for the batch APIs.
 """
 
 import swisseph as swe
 import datetime
-from dataclasses import dataclass
-from typing import Dict, List, Tuple, Any
+import heapq
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple, Any, Callable, Optional, Sequence, Union
+
+try:
+    from .timing import stage
+except ImportError:  # run as a script, see HELPER: QUICK RUN
+    from timing import stage
 
 # -------------------- SETUP --------------------
 swe.set_ephe_path('core/ephe/')
 swe.set_sid_mode(swe.SIDM_LAHIRI)
+AYANAMSA = 'lahiri'
+# Bump whenever a change alters computed chart output so stored charts are recomputed
+CHART_ALGORITHM_VERSION = 1
 
 # -------------------- CONSTANTS --------------------
 KENDRA_HOUSES = [1, 4, 7, 10]
@@ -112,37 +125,303 @@ def angle_diff(a: float, b: float) -> float:
     """Smallest angular difference between a and b in degrees."""
     return abs((a - b + 180.0) % 360.0 - 180.0)
 
+def angle_signed(a: float, b: float) -> float:
+    """Signed difference a - b folded into [-180, 180)."""
+    return (a - b + 180.0) % 360.0 - 180.0
+
 # -------------------- PLANETARY POSITIONS --------------------
-def get_planet_positions(date_str: str, time_str: str, lat: float, lon: float) -> Dict[str, float]:
+EPHE_FLAGS = swe.FLG_SIDEREAL | swe.FLG_SWIEPH | swe.FLG_SPEED
+IST_OFFSET = datetime.timedelta(hours=5, minutes=30)
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+
+def parse_local_datetime(date_str: str, time_str: str) -> datetime.datetime:
     year, month, day = map(int, date_str.split('-'))
     hour, minute = map(int, time_str.split(':'))
-    dt = datetime.datetime(year, month, day, hour, minute)
-    # Convert given IST to UTC (fixed IST offset)
-    dt_utc = dt - datetime.timedelta(hours=5, minutes=30)
-    ut_hour = dt_utc.hour + dt_utc.minute / 60.0
-    jd = swe.julday(dt_utc.year, dt_utc.month, dt_utc.day, ut_hour)
-
-    FLAGS = swe.FLG_SIDEREAL | swe.FLG_SWIEPH
-    positions = {}
+    return datetime.datetime(year, month, day, hour, minute)
+
+
+def utc_to_jd(dt_utc: datetime.datetime) -> float:
+    """Julian day (UT) for a UTC datetime (naive or aware)."""
+    ut_hour = dt_utc.hour + dt_utc.minute / 60.0 + dt_utc.second / 3600.0
+    return swe.julday(dt_utc.year, dt_utc.month, dt_utc.day, ut_hour)
+
+
+def local_to_jd(dt: datetime.datetime) -> float:
+    """Julian day (UT) for a naive IST datetime."""
+    return utc_to_jd(dt - IST_OFFSET)
+
+
+def jd_to_utc_datetime(jd: float) -> datetime.datetime:
+    y, m, d, h = swe.revjul(jd)
+    return datetime.datetime(y, m, d) + datetime.timedelta(hours=h)
+
+
+@dataclass(frozen=True)
+class BodyState:
+    longitude: float
+    latitude: float
+    distance: float
+    speed: float
+
+    @property
+    def retrograde(self) -> bool:
+        return self.speed < 0.0
+
+
+def calc_body_states(jd: float) -> Dict[str, BodyState]:
+    """One `calc_ut` pass per body; Ketu is derived from Rahu."""
+    states = {}
     for name, code in PLANET_CODES.items():
-        xx, _fl = swe.calc_ut(jd, code, FLAGS)
-        positions[name] = round(dms_normalize(xx[0]), 2)
-    # Ketu opposite Rahu
-    positions['Ketu'] = round(dms_normalize(positions['Rahu'] + 180.0), 2)
-    return positions
+        xx, _fl = swe.calc_ut(jd, code, EPHE_FLAGS)
+        states[name] = BodyState(dms_normalize(xx[0]), xx[1], xx[2], xx[3])
+    rahu = states['Rahu']
+    # The nodes move together, so Ketu shares Rahu's (retrograde) speed
+    states['Ketu'] = BodyState(dms_normalize(rahu.longitude + 180.0), -rahu.latitude, rahu.distance, rahu.speed)
+    return states
+
+
+def get_planet_positions(date_str: str, time_str: str, lat: float, lon: float) -> Dict[str, float]:
+    jd = local_to_jd(parse_local_datetime(date_str, time_str))
+    return {name: round(b.longitude, 2) for name, b in calc_body_states(jd).items()}
 
 # Also return speeds (for retrograde)
-def get_planet_positions_with_speed(jd: float) -> Dict[str, Tuple[float, float]]:
-    FLAGS = swe.FLG_SIDEREAL | swe.FLG_SWIEPH
+def get_planet_positions_with_speed(jd: float, use_tables: bool = True) -> Dict[str, Tuple[float, float]]:
+    """Longitude and speed per body; slow bodies come from the Chebyshev tables when loaded."""
+    tables = load_chebyshev_tables() if use_tables else {}
     pos = {}
     for name, code in PLANET_CODES.items():
-        xx, _fl = swe.calc_ut(jd, code, FLAGS)
-        lon = dms_normalize(xx[0])
-        spd = xx[3]
-        pos[name] = (lon, spd)
-    pos['Ketu'] = (dms_normalize(pos['Rahu'][0] + 180.0), -pos['Rahu'][1])
+        table = tables.get(name)
+        if table is not None and table.covers(jd):
+            pos[name] = table.at(jd)
+        else:
+            xx, _fl = swe.calc_ut(jd, code, EPHE_FLAGS)
+            pos[name] = (dms_normalize(xx[0]), xx[3])
+    pos['Ketu'] = (dms_normalize(pos['Rahu'][0] + 180.0), pos['Rahu'][1])
     return pos
 
+# -------------------- CHEBYSHEV EPHEMERIS TABLES --------------------
+# Optional precomputed Chebyshev fits of sidereal (Lahiri) longitude for the
+# smooth, slow bodies. Each body is split into fixed-length segments over
+# 1900-01-01 .. 2100-01-01 UT and fitted at Chebyshev nodes on the unwrapped
+# longitude; speed is the analytic derivative of the same polynomial.
+#
+# Maximum error against `swe.calc_ut` (sampled at 20,000 random moments):
+#     Sun      32 d, degree 12   < 2e-6°    (speed < 1e-5 °/day)
+#     Jupiter  64 d, degree 14   < 6e-4°    (speed < 2.5e-3 °/day)
+#     Saturn  128 d, degree 14   < 5e-4°    (speed < 2.5e-3 °/day)
+#     Rahu    512 d, degree 10   < 1e-8°    (speed < 5e-7 °/day)
+# The Jupiter/Saturn floor comes from small derivative discontinuities in the
+# Swiss Ephemeris output itself; all bounds are below the 0.01° rounding used
+# for displayed positions. Outside the covered range callers fall back to
+# `swe.calc_ut`. Rebuild with `python manage.py build_ephemeris_tables`.
+
+CHEB_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ephe', 'chebyshev_lahiri.npz')
+CHEB_RANGE = (2415020.5, 2488069.5)  # 1900-01-01 .. 2100-01-01 (UT)
+# body: (segment length in days, polynomial degree)
+CHEB_SPECS = {
+    'Sun': (32.0, 12),
+    'Jupiter': (64.0, 14),
+    'Saturn': (128.0, 14),
+    'Rahu': (512.0, 10),
+}
+
+
+def _chebval_rows(t: np.ndarray, coeffs: np.ndarray) -> np.ndarray:
+    """Clenshaw evaluation where every element of `t` has its own coefficient row."""
+    b1 = np.zeros_like(t)
+    b2 = np.zeros_like(t)
+    for k in range(coeffs.shape[1] - 1, 0, -1):
+        b1, b2 = coeffs[:, k] + 2.0 * t * b1 - b2, b1
+    return coeffs[:, 0] + t * b1 - b2
+
+
+def _chebval_scalar(t: float, row: List[float]) -> float:
+    b1 = b2 = 0.0
+    t2 = 2.0 * t
+    for k in range(len(row) - 1, 0, -1):
+        b1, b2 = row[k] + t2 * b1 - b2, b1
+    return row[0] + t * b1 - b2
+
+
+class ChebyshevTable:
+    __slots__ = ('start', 'end', 'seg_days', 'coeffs', 'dcoeffs', '_rows', '_drows')
+
+    def __init__(self, start: float, seg_days: float, coeffs: np.ndarray):
+        self.start = start
+        self.seg_days = seg_days
+        self.coeffs = coeffs
+        self.end = start + seg_days * len(coeffs)
+        # d/djd = d/dt * dt/djd, with t spanning [-1, 1] over one segment
+        self.dcoeffs = np.polynomial.chebyshev.chebder(coeffs, axis=1) * (2.0 / seg_days)
+        # Plain-float copies for the scalar path used by root finders
+        self._rows = coeffs.tolist()
+        self._drows = self.dcoeffs.tolist()
+
+    def at(self, jd: float) -> Tuple[float, float]:
+        """Scalar (longitude, speed) without NumPy call overhead."""
+        seg = min(int((jd - self.start) // self.seg_days), len(self._rows) - 1)
+        t = 2.0 * (jd - self.start - seg * self.seg_days) / self.seg_days - 1.0
+        return _chebval_scalar(t, self._rows[seg]) % 360.0, _chebval_scalar(t, self._drows[seg])
+
+    def covers(self, jd: ArrayLike) -> Union[bool, np.ndarray]:
+        return (jd >= self.start) & (jd < self.end)
+
+    def evaluate(self, jds: ArrayLike) -> Tuple[np.ndarray, np.ndarray]:
+        """Sidereal longitude (0–360°) and speed (°/day) for JDs inside the covered range."""
+        jds = np.atleast_1d(np.asarray(jds, dtype=np.float64))
+        seg = np.minimum(((jds - self.start) // self.seg_days).astype(np.intp), len(self.coeffs) - 1)
+        t = 2.0 * (jds - self.start - seg * self.seg_days) / self.seg_days - 1.0
+        lon = np.mod(_chebval_rows(t, self.coeffs[seg]), 360.0)
+        speed = _chebval_rows(t, self.dcoeffs[seg])
+        return lon, speed
+
+
+def build_chebyshev_tables(start: float = CHEB_RANGE[0], end: float = CHEB_RANGE[1],
+                           specs: Dict[str, Tuple[float, int]] = None) -> Dict[str, ChebyshevTable]:
+    tables = {}
+    for name, (seg_days, degree) in (specs or CHEB_SPECS).items():
+        nseg = int(np.ceil((end - start) / seg_days))
+        nodes = np.cos(np.pi * (np.arange(degree + 1) + 0.5) / (degree + 1))
+        seg_starts = start + seg_days * np.arange(nseg)
+        jds = seg_starts[:, None] + (nodes[None, :] + 1.0) * seg_days / 2.0
+        code = PLANET_CODES[name]
+        lon = np.array([swe.calc_ut(jd, code, EPHE_FLAGS)[0][0] for jd in jds.ravel().tolist()])
+        lon = np.degrees(np.unwrap(np.radians(lon.reshape(nseg, degree + 1)), axis=1))
+        coeffs = np.array([np.polynomial.chebyshev.chebfit(nodes, row, degree) for row in lon])
+        tables[name] = ChebyshevTable(start, seg_days, coeffs)
+    return tables
+
+
+def save_chebyshev_tables(tables: Dict[str, ChebyshevTable], path: str = CHEB_TABLE_PATH) -> None:
+    arrays = {}
+    for name, table in tables.items():
+        arrays[f'{name}_coeffs'] = table.coeffs
+        arrays[f'{name}_meta'] = np.array([table.start, table.seg_days])
+    np.savez_compressed(path, ayanamsa=np.array(AYANAMSA), **arrays)
+
+
+_cheb_tables: Optional[Dict[str, ChebyshevTable]] = None
+
+
+def load_chebyshev_tables(path: str = CHEB_TABLE_PATH) -> Dict[str, ChebyshevTable]:
+    """Tables keyed by body name; empty when the table file is absent or built for another ayanamsa."""
+    global _cheb_tables
+    if _cheb_tables is None:
+        tables = {}
+        if os.path.exists(path):
+            with np.load(path) as data:
+                if str(data['ayanamsa']) == AYANAMSA:
+                    for key in data.files:
+                        if key.endswith('_coeffs'):
+                            name = key[:-len('_coeffs')]
+                            start, seg_days = data[f'{name}_meta']
+                            tables[name] = ChebyshevTable(float(start), float(seg_days), data[key])
+        _cheb_tables = tables
+    return _cheb_tables
+
+# -------------------- BATCH POSITIONS --------------------
+BATCH_BODIES = ['Sun', 'Moon', 'Mars', 'Mercury', 'Jupiter', 'Venus', 'Saturn', 'Rahu', 'Ketu']
+BODY_INDEX = {name: i for i, name in enumerate(BATCH_BODIES)}
+
+@dataclass
+class BatchPositions:
+    """Columnar positions for many moments: arrays are shaped (len(BATCH_BODIES), n)."""
+    jd: np.ndarray
+    longitudes: np.ndarray
+    speeds: np.ndarray
+    signs: np.ndarray
+    nakshatras: np.ndarray
+    padas: np.ndarray
+    asc: Optional[np.ndarray] = None
+    asc_signs: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.jd)
+
+    def longitude(self, planet: str) -> np.ndarray:
+        return self.longitudes[BODY_INDEX[planet]]
+
+    def speed(self, planet: str) -> np.ndarray:
+        return self.speeds[BODY_INDEX[planet]]
+
+
+def bulk_sign_indices(longitudes: np.ndarray) -> np.ndarray:
+    return np.minimum(longitudes // 30.0, 11).astype(np.int8)
+
+
+def bulk_nakshatra_indices(longitudes: np.ndarray) -> np.ndarray:
+    return np.minimum(longitudes // NAK_SEG, 26).astype(np.int8)
+
+
+def bulk_pada_numbers(longitudes: np.ndarray) -> np.ndarray:
+    return (np.minimum((longitudes % NAK_SEG) // PADA_SEG, 3) + 1).astype(np.int8)
+
+
+def bulk_ascendants(jds: np.ndarray, lats: ArrayLike, lons: ArrayLike) -> np.ndarray:
+    """Sidereal ascendant per moment, same formula as `calculate_lagna`."""
+    lats = np.broadcast_to(np.asarray(lats, dtype=np.float64), jds.shape)
+    lons = np.broadcast_to(np.asarray(lons, dtype=np.float64), jds.shape)
+    houses, ayanamsa = swe.houses, swe.get_ayanamsa
+    asc = np.fromiter(
+        (houses(jd, la, lo)[0][0] - ayanamsa(jd) for jd, la, lo in zip(jds.tolist(), lats.tolist(), lons.tolist())),
+        dtype=np.float64, count=len(jds),
+    )
+    return np.mod(asc, 360.0)
+
+
+def get_planet_positions_batch(jds: ArrayLike, lats: ArrayLike = None, lons: ArrayLike = None,
+                               use_tables: bool = True) -> BatchPositions:
+    """Vectorised counterpart of `get_planet_positions_with_speed` for many Julian days.
+
+    Bodies covered by the Chebyshev tables are evaluated as whole arrays; the
+    rest call the ephemeris once per (body, moment), with results landing
+    directly in preallocated arrays. Every derived index (sign, nakshatra,
+    pada) is computed in bulk. Passing `lats`/`lons` (scalars or arrays
+    matching `jds`) also fills the sidereal ascendant columns.
+    """
+    jds = np.atleast_1d(np.asarray(jds, dtype=np.float64))
+    n = len(jds)
+    longitudes = np.empty((len(BATCH_BODIES), n), dtype=np.float64)
+    speeds = np.empty_like(longitudes)
+
+    tables = load_chebyshev_tables() if use_tables else {}
+    tabled = [name for name in PLANET_CODES if name in tables and tables[name].covers(jds).all()]
+    for name in tabled:
+        longitudes[BODY_INDEX[name]], speeds[BODY_INDEX[name]] = tables[name].evaluate(jds)
+
+    # Moment-major order lets Swiss Ephemeris reuse its per-date state
+    # (nutation, Earth position) across bodies.
+    calc_ut = swe.calc_ut
+    codes = [PLANET_CODES[name] for name in BATCH_BODIES if name in PLANET_CODES and name not in tabled]
+    rows = [BODY_INDEX[name] for name in BATCH_BODIES if name in PLANET_CODES and name not in tabled]
+    if codes:
+        # xx[0:4:3] -> (longitude, longitude speed)
+        raw = np.array(
+            [[calc_ut(jd, code, EPHE_FLAGS)[0][0:4:3] for code in codes] for jd in jds.tolist()],
+            dtype=np.float64,
+        ).reshape(n, len(codes), 2)
+        longitudes[rows] = raw[:, :, 0].T
+        speeds[rows] = raw[:, :, 1].T
+    rahu, ketu = BODY_INDEX['Rahu'], BODY_INDEX['Ketu']
+    longitudes[ketu] = longitudes[rahu] + 180.0
+    speeds[ketu] = speeds[rahu]
+    np.mod(longitudes, 360.0, out=longitudes)
+
+    batch = BatchPositions(
+        jd=jds,
+        longitudes=longitudes,
+        speeds=speeds,
+        signs=bulk_sign_indices(longitudes),
+        nakshatras=bulk_nakshatra_indices(longitudes),
+        padas=bulk_pada_numbers(longitudes),
+    )
+    if lats is not None and lons is not None:
+        batch.asc = bulk_ascendants(jds, lats, lons)
+        batch.asc_signs = bulk_sign_indices(batch.asc)
+    return batch
+
 # -------------------- BASIC CALCULATIONS --------------------
 
 def get_nakshatra(longitude: float) -> str:
@@ -191,86 +470,237 @@ def calculate_lagna(jd: float, lat: float, lon: float) -> Tuple[float, str]:
         return 0.0, "Unknown"
 
 
+@dataclass
+class ChartContext:
+    """Ephemeris state for one birth moment, computed once and shared by every stage.
+
+    Build it with `from_local` / `from_datetime`; downstream helpers read
+    `positions`, `bodies` and `asc_deg` instead of calling the ephemeris again.
+    """
+    local_dt: datetime.datetime
+    jd: float
+    lat: float
+    lon: float
+    bodies: Dict[str, BodyState]
+    asc_deg: float
+    asc_sign: str
+    positions: Dict[str, float] = field(init=False)
+
+    def __post_init__(self):
+        # Wrapped after rounding: 359.996° must read 0.0°, not a 13th sign
+        self.positions = {p: round(b.longitude, 2) % 360.0 for p, b in self.bodies.items()}
+
+    @classmethod
+    def from_datetime(cls, dt: datetime.datetime, lat: float, lon: float) -> "ChartContext":
+        jd = local_to_jd(dt)
+        with stage("lagna"):
+            asc_deg, asc_sign = calculate_lagna(jd, lat, lon)
+        with stage("ephemeris"):
+            bodies = calc_body_states(jd)
+        return cls(dt, jd, lat, lon, bodies, asc_deg, asc_sign)
+
+    @classmethod
+    def from_local(cls, date_str: str, time_str: str, lat: float, lon: float) -> "ChartContext":
+        return cls.from_datetime(parse_local_datetime(date_str, time_str), lat, lon)
+
+    def speed(self, planet: str) -> float:
+        return self.bodies[planet].speed
+
+
+class Chart:
+    """Compact natal chart: one slot per BATCH_BODIES index, no string keys.
+
+    Longitudes/speeds are float64 arrays; sign, house, nakshatra and pada are
+    int8 arrays (house 0 == no Lagna). Display names are resolved only at the
+    serialization edge (`to_dict`, payload builders, prompts).
+    """
+    __slots__ = ('jd', 'asc', 'longitudes', 'speeds', 'signs', 'houses', 'nakshatras', 'padas')
+
+    def __init__(self, longitudes: Sequence[float], asc: Optional[float] = None,
+                 speeds: Optional[Sequence[float]] = None, jd: Optional[float] = None):
+        self.jd = jd
+        self.asc = asc
+        self.longitudes = array('d', longitudes)
+        self.speeds = array('d', speeds if speeds is not None else [0.0] * len(self.longitudes))
+        self.signs = array('b', [int(l // 30) for l in self.longitudes])
+        self.nakshatras = array('b', [int(l // NAK_SEG) for l in self.longitudes])
+        self.padas = array('b', [get_nakshatra_pada(l) for l in self.longitudes])
+        if asc is None:
+            self.houses = array('b', bytes(len(self.longitudes)))
+        else:
+            self.houses = array('b', [int(((l - asc) % 360) // 30) + 1 for l in self.longitudes])
+
+    @classmethod
+    def from_context(cls, ctx: ChartContext) -> 'Chart':
+        # Display-precision longitudes, as every chart view and detector has always used
+        return cls([ctx.positions[b] for b in BATCH_BODIES], ctx.asc_deg,
+                   [ctx.bodies[b].speed for b in BATCH_BODIES], ctx.jd)
+
+    @classmethod
+    def from_positions(cls, positions: Dict[str, float], asc: Optional[float] = None) -> 'Chart':
+        return cls([positions[b] for b in BATCH_BODIES], asc)
+
+    def longitude(self, planet: str) -> float:
+        return self.longitudes[BODY_INDEX[planet]]
+
+    def sign(self, planet: str) -> int:
+        return self.signs[BODY_INDEX[planet]]
+
+    def house(self, planet: str) -> int:
+        return self.houses[BODY_INDEX[planet]]
+
+    def nakshatra(self, planet: str) -> int:
+        return self.nakshatras[BODY_INDEX[planet]]
+
+    def retrograde(self, planet: str) -> bool:
+        return self.speeds[BODY_INDEX[planet]] < 0.0
+
+    def masks(self) -> 'ChartMasks':
+        return ChartMasks(self.longitudes, self.signs, self.houses, self.asc)
+
+    def evaluate(self) -> Tuple[List[str], List[str], int]:
+        return evaluate_rules(self.masks())
+
+    def yogas(self) -> List[str]:
+        return self.evaluate()[0]
+
+    # Serialization edge: name-keyed views
+
+    @property
+    def positions(self) -> Dict[str, float]:
+        return dict(zip(BATCH_BODIES, self.longitudes))
+
+    def sign_names(self) -> Dict[str, str]:
+        return {b: RASHIS[s] for b, s in zip(BATCH_BODIES, self.signs)}
+
+    def house_numbers(self) -> Dict[str, int]:
+        return dict(zip(BATCH_BODIES, self.houses)) if self.asc is not None else {}
+
+    def to_dict(self, nakshatra: Optional[str] = None) -> Dict[str, Any]:
+        """Legacy `get_birth_chart_data` shape."""
+        return {
+            **self.positions,
+            "Nakshatra": nakshatra if nakshatra is not None else NAKSHATRAS[self.nakshatra('Moon')],
+            "Lagna": self.asc,
+            "Signs": self.sign_names(),
+            "Houses": self.house_numbers(),
+            "Yogas": self.yogas(),
+        }
+
+
 def get_house_placements(positions: Dict[str, float], asc_deg: float) -> Dict[str, int]:
     return {planet: int(((deg - asc_deg) % 360) // 30) + 1 for planet, deg in positions.items()}
 
 
+# -------------------- DIVISIONAL CHARTS (VARGAS) --------------------
+# Every Parashari varga is a lookup table indexed by [rasi sign, part of the
+# sign] -> varga sign. Parts are equal slices of 30°; D30's unequal
+# Trimshamsa spans all fall on whole degrees, so it uses 30 one-degree parts.
+
+SHODASHAVARGA = ['D1', 'D2', 'D3', 'D4', 'D7', 'D9', 'D10', 'D12',
+                 'D16', 'D20', 'D24', 'D27', 'D30', 'D40', 'D45', 'D60']
+
+MOVABLE_SIGNS = (0, 3, 6, 9)
+FIXED_SIGNS = (1, 4, 7, 10)
+DUAL_SIGNS = (2, 5, 8, 11)
+
+
+def _by_modality(sign: int, movable: int, fixed: int, dual: int) -> int:
+    if sign in MOVABLE_SIGNS:
+        return movable
+    if sign in FIXED_SIGNS:
+        return fixed
+    return dual
+
+
+def _is_odd_sign(sign: int) -> bool:
+    return sign % 2 == 0  # Medam (Aries) is the 1st, odd sign
+
+
+# Odd / even sign Trimshamsa: (end degree, sign) spans
+_TRIMSHAMSA = {
+    True: [(5, 0), (10, 10), (18, 8), (25, 2), (30, 6)],   # Mars, Saturn, Jupiter, Mercury, Venus
+    False: [(5, 1), (12, 5), (20, 11), (25, 9), (30, 7)],  # Venus, Mercury, Jupiter, Saturn, Mars
+}
+
+# varga -> (parts per sign, rule(sign, part) -> varga sign)
+VARGA_RULES = {
+    'D1': (1, lambda s, p: s),
+    'D2': (2, lambda s, p: (4, 3)[p] if _is_odd_sign(s) else (3, 4)[p]),      # Hora: Leo / Cancer
+    'D3': (3, lambda s, p: s + 4 * p),                                         # 1st, 5th, 9th
+    'D4': (4, lambda s, p: s + 3 * p),                                         # 1st, 4th, 7th, 10th
+    'D7': (7, lambda s, p: (s if _is_odd_sign(s) else s + 6) + p),
+    'D9': (9, lambda s, p: _by_modality(s, s, s + 8, s + 4) + p),
+    'D10': (10, lambda s, p: (s if _is_odd_sign(s) else s + 8) + p),
+    'D12': (12, lambda s, p: s + p),
+    'D16': (16, lambda s, p: _by_modality(s, 0, 4, 8) + p),                    # Aries / Leo / Sagittarius
+    'D20': (20, lambda s, p: _by_modality(s, 0, 8, 4) + p),                    # Aries / Sagittarius / Leo
+    'D24': (24, lambda s, p: (4 if _is_odd_sign(s) else 3) + p),               # Leo / Cancer
+    'D27': (27, lambda s, p: (0, 3, 6, 9)[s % 4] + p),                         # by element
+    'D30': (30, lambda s, p: next(sign for end, sign in _TRIMSHAMSA[_is_odd_sign(s)] if p < end)),
+    'D40': (40, lambda s, p: (0 if _is_odd_sign(s) else 6) + p),               # Aries / Libra
+    'D45': (45, lambda s, p: _by_modality(s, 0, 4, 8) + p),
+    'D60': (60, lambda s, p: s + p),
+}
+
+VARGA_TABLES: Dict[str, np.ndarray] = {
+    name: np.array([[rule(s, p) % 12 for p in range(parts)] for s in range(12)], dtype=np.int8)
+    for name, (parts, rule) in VARGA_RULES.items()
+}
+
+
+def compute_varga_indices(longitudes: ArrayLike, divisions: Sequence[str] = SHODASHAVARGA) -> np.ndarray:
+    """Varga sign index (0–11) for every longitude and division in one vectorised pass.
+
+    `longitudes` may be any shape (e.g. bodies, or charts x bodies); the result
+    has a leading axis over `divisions`.
+    """
+    lon = np.mod(np.asarray(longitudes, dtype=np.float64), 360.0)
+    sign = np.minimum(lon // 30.0, 11).astype(np.intp)
+    deg = lon - sign * 30.0
+    out = np.empty((len(divisions),) + lon.shape, dtype=np.int8)
+    for row, name in enumerate(divisions):
+        table = VARGA_TABLES[name]
+        parts = table.shape[1]
+        part = np.minimum((deg * (parts / 30.0)).astype(np.intp), parts - 1)
+        out[row] = table[sign, part]
+    return out
+
+
+def calculate_vargas(positions: Dict[str, float], divisions: Sequence[str] = SHODASHAVARGA) -> Dict[str, Dict[str, int]]:
+    """{division: {planet: sign index}} for every requested varga."""
+    planets = list(positions)
+    idx = compute_varga_indices([positions[p] for p in planets], divisions)
+    return {name: dict(zip(planets, row.tolist())) for name, row in zip(divisions, idx)}
+
+
+def calculate_varga_chart(positions: Dict[str, float], division: str) -> Dict[str, str]:
+    return {p: RASHIS[i] for p, i in calculate_vargas(positions, [division])[division].items()}
+
+
 def calculate_navamsa_chart(positions: Dict[str, float]) -> Dict[str, str]:
-    # D9: Each 3°20' step maps to a Navamsa sign in a sign-specific order.
-    navamsa = {}
-    for planet, deg in positions.items():
-        sign_index = int(deg // 30)
-        sign_deg = deg % 30
-        pada = int(sign_deg // (30/9))  # 0..8
-        # Sequence for movable, fixed, dual signs
-        # Movable: sign -> sign, then sequential
-        # Fixed: 9th from sign; Dual: 5th from sign
-        if sign_index in [0, 3, 6, 9]:  # movable
-            start = sign_index
-        elif sign_index in [1, 4, 7, 10]:  # fixed
-            start = (sign_index + 8) % 12
-        else:  # dual
-            start = (sign_index + 4) % 12
-        nav_sign = (start + pada) % 12
-        navamsa[planet] = RASHIS[nav_sign]
-    return navamsa
+    # D9: movable signs count from themselves, fixed from the 9th, dual from the 5th
+    return calculate_varga_chart(positions, 'D9')
 
 
 def calculate_drekkana_chart(positions: Dict[str, float]) -> Dict[str, str]:
-    # D3: Each 10° -> a Drekkana sign
-    d3 = {}
-    for p, deg in positions.items():
-        sign_index = int(deg // 30)
-        offset = int((deg % 30) // 10)
-        d3_sign = (sign_index + offset * 4) % 12  # classical Parashara mapping
-        d3[p] = RASHIS[d3_sign]
-    return d3
+    # D3: each 10° -> sign itself, 5th, 9th
+    return calculate_varga_chart(positions, 'D3')
 
 
 def calculate_chaturthamsa_chart(positions: Dict[str, float]) -> Dict[str, str]:
-    # D4: 7°30' per part; movable/fixed/dual mapping
-    d4 = {}
-    for p, deg in positions.items():
-        sign_index = int(deg // 30)
-        part = int((deg % 30) // 7.5)  # 0..3
-        if sign_index in [0, 3, 6, 9]:
-            start = sign_index
-        elif sign_index in [1, 4, 7, 10]:
-            start = (sign_index + 3) % 12
-        else:
-            start = (sign_index + 6) % 12
-        d4[p] = RASHIS[(start + part) % 12]
-    return d4
+    # D4: each 7°30' -> sign itself, 4th, 7th, 10th
+    return calculate_varga_chart(positions, 'D4')
 
 
 def calculate_dasamsa_chart(positions: Dict[str, float]) -> Dict[str, str]:
-    # D10: 3° per part; movable/fixed/dual mapping
-    d10 = {}
-    for p, deg in positions.items():
-        sign_index = int(deg // 30)
-        part = int((deg % 30) // 3)  # 0..9
-        if sign_index in [0, 3, 6, 9]:
-            start = sign_index
-        elif sign_index in [1, 4, 7, 10]:
-            start = (sign_index + 8) % 12
-        else:
-            start = (sign_index + 4) % 12
-        d10[p] = RASHIS[(start + part) % 12]
-    return d10
+    # D10: 3° parts counted from the sign (odd) or from the 9th (even)
+    return calculate_varga_chart(positions, 'D10')
 
+# -------------------- BIRTH CHART DATA --------------------
 
 def get_birth_chart_data(positions: Dict[str, float], nakshatra: str, lagna: float = None) -> Dict[str, Any]:
-    signs = {planet: get_sign_name(deg) for planet, deg in positions.items()}
-    houses = get_house_placements(positions, lagna) if lagna is not None else {}
-    chart = {
-        **positions,
-        "Nakshatra": nakshatra,
-        "Lagna": lagna,
-        "Signs": signs,
-        "Houses": houses,
-    }
-    chart["Yogas"] = detect_yogas(chart)
-    return chart
+    return Chart.from_positions(positions, lagna).to_dict(nakshatra)
 
 # -------------------- PLANETARY STRENGTHS --------------------
 
@@ -293,11 +723,12 @@ def is_combust(planet: str, planet_deg: float, sun_deg: float) -> bool:
     return angle_diff(planet_deg, sun_deg) <= orb
 
 
-def is_retrograde(jd: float, planet: str) -> bool:
+def is_retrograde(jd: float, planet: str, ctx: ChartContext = None) -> bool:
+    if ctx is not None and planet in ctx.bodies:
+        return ctx.bodies[planet].retrograde
     if planet not in PLANET_CODES:
         return False
-    FLAGS = swe.FLG_SIDEREAL | swe.FLG_SWIEPH
-    xx, _fl = swe.calc_ut(jd, PLANET_CODES[planet], FLAGS)
+    xx, _fl = swe.calc_ut(jd, PLANET_CODES[planet], EPHE_FLAGS)
     return xx[3] < 0.0
 
 # Simplified Shadbala placeholder: 0–1 score per planet
@@ -395,71 +826,142 @@ def _moon_nakshatra_progress(moon_long: float) -> Tuple[str, float]:
     return nak, prog
 
 
+DASHA_LEVELS = ['mahadasha', 'antardasha', 'pratyantar', 'sookshma', 'prana']
+DASHA_YEAR_DAYS = 365.25
+DASHA_TOTAL_YEARS = sum(DASHA_YEARS.values())  # 120
+# Fraction of a parent period taken by each lord, in DASHA_ORDER
+_DASHA_FRACTIONS = [DASHA_YEARS[lord] / DASHA_TOTAL_YEARS for lord in DASHA_ORDER]
+
+
+@dataclass(frozen=True)
+class DashaPeriod:
+    level: int              # index into DASHA_LEVELS
+    path: Tuple[int, ...]   # child index at every level from the mahadasha down
+    lord: str
+    start_jd: float
+    end_jd: float
+
+    @property
+    def start(self) -> datetime.datetime:
+        return jd_to_utc_datetime(self.start_jd)
+
+    @property
+    def end(self) -> datetime.datetime:
+        return jd_to_utc_datetime(self.end_jd)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {'lord': self.lord, 'start': self.start, 'end': self.end}
+
+
+class DashaTimeline:
+    """Vimshottari periods as sorted boundary JDs, expanded lazily one level at a time.
+
+    Every expanded period keeps its children's boundaries (10 JDs in an
+    `array('d')`) and lords (indices into DASHA_ORDER); nothing below a
+    period exists until a lookup needs it. Point lookups bisect those arrays
+    (O(levels * log 9)); range queries only descend into overlapping periods.
+
+    The first mahadasha starts before birth by the part of the Moon's
+    nakshatra already traversed, so every level divides full periods.
+    """
+    __slots__ = ('birth_jd', '_children')
+
+    def __init__(self, birth_jd: float, moon_longitude: float):
+        nak, prog = _moon_nakshatra_progress(moon_longitude)
+        first = DASHA_ORDER.index(get_nakshatra_lord(nak))
+        start = birth_jd - prog * DASHA_YEARS[DASHA_ORDER[first]] * DASHA_YEAR_DAYS
+        self.birth_jd = birth_jd
+        self._children: Dict[Tuple[int, ...], Tuple[array, bytes]] = {}
+        self._children[()] = self._split(first, start, start + DASHA_TOTAL_YEARS * DASHA_YEAR_DAYS)
+
+    @staticmethod
+    def _split(first_lord: int, start: float, end: float) -> Tuple[array, bytes]:
+        span = end - start
+        bounds = array('d', [start])
+        lords = bytearray()
+        for k in range(9):
+            lord = (first_lord + k) % 9
+            lords.append(lord)
+            bounds.append(bounds[-1] + span * _DASHA_FRACTIONS[lord])
+        bounds[-1] = end  # absorb float drift
+        return bounds, bytes(lords)
+
+    def _expand(self, path: Tuple[int, ...]) -> Tuple[array, bytes]:
+        node = self._children.get(path)
+        if node is None:
+            bounds, lords = self._expand(path[:-1])
+            i = path[-1]
+            node = self._split(lords[i], bounds[i], bounds[i + 1])
+            self._children[path] = node
+        return node
+
+    def _period(self, path: Tuple[int, ...]) -> DashaPeriod:
+        bounds, lords = self._expand(path[:-1])
+        i = path[-1]
+        return DashaPeriod(len(path) - 1, path, DASHA_ORDER[lords[i]], bounds[i], bounds[i + 1])
+
+    @property
+    def start_jd(self) -> float:
+        return self._children[()][0][0]
+
+    @property
+    def end_jd(self) -> float:
+        return self._children[()][0][-1]
+
+    def children(self, period: DashaPeriod = None) -> List[DashaPeriod]:
+        path = period.path if period is not None else ()
+        return [self._period(path + (i,)) for i in range(9)]
+
+    def mahadashas(self) -> List[Dict[str, Any]]:
+        """Mahadasha dicts from birth onward (the first starts at birth, with its balance)."""
+        dasha_list = [p.as_dict() for p in self.children()]
+        dasha_list[0]['start'] = jd_to_utc_datetime(self.birth_jd)
+        return dasha_list
+
+    def at(self, jd: float, depth: int = len(DASHA_LEVELS)) -> List[DashaPeriod]:
+        """Running period at every level down to `depth` (1 = mahadasha only)."""
+        if not self.start_jd <= jd < self.end_jd:
+            return []
+        path: Tuple[int, ...] = ()
+        out = []
+        for _ in range(depth):
+            bounds, _lords = self._expand(path)
+            i = min(max(bisect_right(bounds, jd) - 1, 0), 8)
+            path = path + (i,)
+            out.append(self._period(path))
+        return out
+
+    def overlapping(self, start_jd: float, end_jd: float, level: int = 0) -> List[DashaPeriod]:
+        """Periods at `level` that intersect [start_jd, end_jd), in time order."""
+        out = []
+
+        def walk(path: Tuple[int, ...]):
+            bounds, _lords = self._expand(path)
+            lo = max(bisect_right(bounds, start_jd) - 1, 0)
+            hi = min(bisect_left(bounds, end_jd), 9)
+            for i in range(lo, hi):
+                if len(path) == level:
+                    out.append(self._period(path + (i,)))
+                else:
+                    walk(path + (i,))
+
+        if start_jd < self.end_jd and end_jd > self.start_jd:
+            walk(())
+        return out
+
+
 def calculate_vimshottari_dasha(jd: float, moon_longitude: float) -> List[Dict[str, Any]]:
     """
     Return list of Mahadashas with start/end datetimes.
     Start point is birth time with balance per Moon's nakshatra progress.
     """
-    nak, prog = _moon_nakshatra_progress(moon_longitude)
-    lord = get_nakshatra_lord(nak)
-    # years remaining in current mahadasha
-    rem_years = (1 - prog) * DASHA_YEARS[lord]
-
-    # Build sequence from current lord
-    start_idx = DASHA_ORDER.index(lord)
-    seq = DASHA_ORDER[start_idx:] + DASHA_ORDER[:start_idx]
-
-    # Base datetime from jd
-    cal = swe.revjul(jd)
-    start_dt = datetime.datetime(cal[0], cal[1], cal[2]) + datetime.timedelta(days=cal[3])
-
-    dasha_list = []
-    curr_start = start_dt
-
-    for i, dlord in enumerate(seq):
-        yrs = rem_years if i == 0 else DASHA_YEARS[dlord]
-        days = int(yrs * 365.25)
-        end_dt = curr_start + datetime.timedelta(days=days)
-        dasha_list.append({
-            'lord': dlord,
-            'start': curr_start,
-            'end': end_dt
-        })
-        curr_start = end_dt
-    return dasha_list
-
-
-def _subperiods(parent_lord: str, parent_start: datetime.datetime, parent_end: datetime.datetime) -> List[Dict[str, Any]]:
-    total_days = (parent_end - parent_start).days or 1
-    # Proportional division by years of each antardasha lord relative to parent lord
-    ad_list = []
-    acc = parent_start
-    for lord in DASHA_ORDER:
-        frac = DASHA_YEARS[lord] / sum(DASHA_YEARS.values())
-        span = datetime.timedelta(days=int(total_days * frac))
-        end = acc + span
-        ad_list.append({'lord': lord, 'start': acc, 'end': end})
-        acc = end
-    # Adjust last end to parent_end
-    if ad_list:
-        ad_list[-1]['end'] = parent_end
-    return ad_list
-
-
-def get_current_dasha(dasha_list: List[Dict[str, Any]], date: datetime.datetime) -> Dict[str, Any]:
-    for d in dasha_list:
-        if d['start'] <= date < d['end']:
-            # build antardasha and pratyantar for the found mahadasha
-            antar = _subperiods(d['lord'], d['start'], d['end'])
-            curr_antar = next((a for a in antar if a['start'] <= date < a['end']), antar[0])
-            pratyantar = _subperiods(curr_antar['lord'], curr_antar['start'], curr_antar['end'])
-            curr_praty = next((p for p in pratyantar if p['start'] <= date < p['end']), pratyantar[0])
-            return {
-                'mahadasha': d,
-                'antardasha': curr_antar,
-                'pratyantar': curr_praty
-            }
-    return {}
+    return DashaTimeline(jd, moon_longitude).mahadashas()
+
+
+def get_current_dasha(timeline: DashaTimeline, date: datetime.datetime, depth: int = 3) -> Dict[str, Any]:
+    """Running periods at `date` (naive IST) keyed by level name, down to `depth` levels."""
+    periods = timeline.at(local_to_jd(date), depth)
+    return {DASHA_LEVELS[p.level]: p.as_dict() for p in periods}
 
 # -------------------- ASHTAKAVARGA (Simplified) --------------------
 
@@ -506,193 +1008,547 @@ def get_planet_degree(chart: Dict[str, Any], planet: str) -> float:
 def get_lagna(chart: Dict[str, Any]) -> float:
     return chart.get("Lagna", 0)
 
-# -------------------- EXISTING YOGAS --------------------
+# -------------------- YOGA & DOSHA RULE ENGINE --------------------
+# Yogas and doshas are declared as data (YOGA_RULES / DOSHA_RULES) and compiled
+# once into a pair of checks per rule:
+#   check(ChartMasks) -> messages   one chart, used by the API/orchestrator
+#   vector(BatchMasks) -> bool[n]   whole arrays of charts, used for analytics
+# Both run over precomputed integer views (house occupancy masks, lordship
+# table, aspect masks), so a chart is evaluated in one pass with no string keys.
+#
+# Each rule's bit in the result mask is its position in RULES, so rules must
+# only ever be appended (stored bitmasks depend on it).
+
+HOUSE_BIT = [1 << h for h in range(13)]  # bit h == house h; bit 0 == unknown house
+SIGN_LORD_INDEX = [BODY_INDEX[RASI_LORDS[s]] for s in RASHIS]
+EXALTATION_INDEX = [RASHIS.index(EXALTATION_SIGNS[b]) if b in EXALTATION_SIGNS else -1 for b in BATCH_BODIES]
+_SIGN_INDEX = {s: i for i, s in enumerate(RASHIS)}
+_NO_LORDS = [-1] * 13
+# LORDSHIP_TABLE[asc_sign][h]: body index ruling house h (index 0 unused)
+LORDSHIP_TABLE = [[-1] + [SIGN_LORD_INDEX[(a + h - 1) % 12] for h in range(1, 13)] for a in range(12)]
+
+
+def house_mask(houses: Sequence[int]) -> int:
+    mask = 0
+    for h in houses:
+        mask |= HOUSE_BIT[h]
+    return mask
+
+
+def _house_from(house: int, offset: int) -> int:
+    return ((house - 1 + offset - 1) % 12) + 1
+
+
+# ASPECT_MASKS[b][h]: houses receiving graha drishti from body b placed in house h
+ASPECT_MASKS = [[0] + [house_mask([_house_from(h, o) for o in get_graha_drishti(b, 0.0)]) for h in range(1, 13)]
+                for b in BATCH_BODIES]
+
+_SIGN_LORD_ARRAY = np.array(SIGN_LORD_INDEX, dtype=np.intp)
+_LORDSHIP_ARRAY = np.array(LORDSHIP_TABLE, dtype=np.intp)
+
+
+class ChartMasks:
+    """Integer view of one chart for rule evaluation (bodies indexed as BATCH_BODIES)."""
+    __slots__ = ('lon', 'sign', 'house', 'occupancy', 'occupied', 'asc_sign', 'lords', 'has_lagna', 'aspects')
+
+    def __init__(self, lon: Sequence[float], sign: Sequence[int], house: Sequence[int], lagna: Optional[float]):
+        self.lon = lon
+        self.sign = sign
+        self.house = house
+        # occupancy[h]: bitmask of bodies in house h; occupied: bitmask of houses holding any body
+        occupancy = [0] * 13
+        for b, h in enumerate(house):
+            occupancy[h] |= 1 << b
+        self.occupancy = occupancy
+        self.occupied = house_mask(house) & ~1
+        # Detectors historically treat a 0.0 (or missing) Lagna as "no Lagna"
+        self.has_lagna = bool(lagna)
+        self.asc_sign = int(lagna // 30) % 12 if lagna is not None else -1
+        self.lords = LORDSHIP_TABLE[self.asc_sign] if lagna is not None else _NO_LORDS
+        self.aspects = [ASPECT_MASKS[b][h] for b, h in enumerate(house)]
+
+    @classmethod
+    def from_dict(cls, chart: Dict[str, Any]) -> 'ChartMasks':
+        signs = chart.get('Signs', {})
+        houses = chart.get('Houses', {})
+        return cls([chart[b] for b in BATCH_BODIES],
+                   [_SIGN_INDEX[signs[b]] for b in BATCH_BODIES],
+                   [houses.get(b) or 0 for b in BATCH_BODIES],
+                   chart.get('Lagna'))
+
+
+@dataclass
+class BatchMasks:
+    """ChartMasks for n charts at once; arrays are (n, 9) in BATCH_BODIES order."""
+    lon: np.ndarray
+    sign: np.ndarray
+    house: np.ndarray
+    occupied: np.ndarray   # (n,) house bitmask
+    lords: np.ndarray      # (n, 13) lordship table rows
+    has_lagna: np.ndarray  # (n,) bool
+
+    @classmethod
+    def from_longitudes(cls, longitudes: ArrayLike, asc: ArrayLike) -> 'BatchMasks':
+        lon = np.asarray(longitudes, dtype=np.float64)
+        asc = np.asarray(asc, dtype=np.float64)
+        sign = bulk_sign_indices(lon).astype(np.intp)
+        house = ((lon - asc[:, None]) % 360.0 // 30.0).astype(np.intp) + 1
+        occupied = np.bitwise_or.reduce(np.left_shift(1, house), axis=1)
+        lords = _LORDSHIP_ARRAY[bulk_sign_indices(asc).astype(np.intp)]
+        return cls(lon, sign, house, occupied, lords, asc != 0.0)
+
+    def house_of(self, bodies: np.ndarray) -> np.ndarray:
+        return np.take_along_axis(self.house, bodies, axis=1)
+
+
+def _in_mask(mask: int, houses: np.ndarray) -> np.ndarray:
+    return (np.right_shift(mask, houses) & 1).astype(bool)
+
+
+# Rule kinds. Every compiler takes the rule dict and returns (check, vector).
+
+def _compile_all_in_houses(rule: Dict[str, Any]):
+    bodies = [BODY_INDEX[b] for b in rule['bodies']]
+    target, message = house_mask(rule['houses']), rule['message']
+
+    def check(c: ChartMasks) -> List[str]:
+        house = c.house
+        return [message] if all(target & HOUSE_BIT[house[b]] for b in bodies) else []
+
+    def vector(m: BatchMasks) -> np.ndarray:
+        return _in_mask(target, m.house[:, bodies]).all(axis=1)
+    return check, vector
+
+
+def _compile_each_in_houses(rule: Dict[str, Any]):
+    bodies = [BODY_INDEX[b] for b in rule['bodies']]
+    target, message = house_mask(rule['houses']), rule['message']
+
+    def check(c: ChartMasks) -> List[str]:
+        house = c.house
+        return [message.format(planet=BATCH_BODIES[b], house=house[b])
+                for b in bodies if target & HOUSE_BIT[house[b]]]
+
+    def vector(m: BatchMasks) -> np.ndarray:
+        return _in_mask(target, m.house[:, bodies]).any(axis=1)
+    return check, vector
+
+
+def _compile_conjunction(rule: Dict[str, Any]):
+    body = BODY_INDEX[rule['body']]
+    others = [BODY_INDEX[b] for b in rule['with']]
+    orb, same_sign, message = rule['orb'], rule.get('same_sign', False), rule['message']
+
+    def check(c: ChartMasks) -> List[str]:
+        lon, sign = c.lon, c.sign
+        for o in others:
+            if (not same_sign or sign[body] == sign[o]) and angle_diff(lon[body], lon[o]) <= orb:
+                return [message]
+        return []
+
+    def vector(m: BatchMasks) -> np.ndarray:
+        hit = np.abs((m.lon[:, [body]] - m.lon[:, others] + 180.0) % 360.0 - 180.0) <= orb
+        if same_sign:
+            hit &= m.sign[:, [body]] == m.sign[:, others]
+        return hit.any(axis=1)
+    return check, vector
+
+
+def _compile_dispositor_in_houses(rule: Dict[str, Any]):
+    target, message = house_mask(rule['houses']), rule['message']
+
+    def check(c: ChartMasks) -> List[str]:
+        house, sign = c.house, c.sign
+        for b in range(len(BATCH_BODIES)):
+            if target & HOUSE_BIT[house[b]]:
+                lord = SIGN_LORD_INDEX[sign[b]]
+                if target & HOUSE_BIT[house[lord]]:
+                    return [message.format(planet=BATCH_BODIES[b], lord=BATCH_BODIES[lord])]
+        return []
+
+    def vector(m: BatchMasks) -> np.ndarray:
+        lord_house = m.house_of(_SIGN_LORD_ARRAY[m.sign])
+        return (_in_mask(target, m.house) & _in_mask(target, lord_house)).any(axis=1)
+    return check, vector
+
+
+def _compile_empty_around(rule: Dict[str, Any]):
+    body, offsets, message = BODY_INDEX[rule['body']], rule['offsets'], rule['message']
+
+    def check(c: ChartMasks) -> List[str]:
+        h = c.house[body]
+        if not h:
+            return []
+        around = house_mask([_house_from(h, o) for o in offsets])
+        return [] if c.occupied & around else [message]
+
+    def vector(m: BatchMasks) -> np.ndarray:
+        h = m.house[:, body]
+        around = sum(np.left_shift(1, (h - 1 + o - 1) % 12 + 1) for o in offsets)
+        return (h > 0) & (m.occupied & around == 0)
+    return check, vector
+
+
+def _compile_sign_with(rule: Dict[str, Any]):
+    body, other = BODY_INDEX[rule['body']], BODY_INDEX[rule['with']]
+    sign, message = _SIGN_INDEX[rule['sign']], rule['message']
+
+    def check(c: ChartMasks) -> List[str]:
+        return [message] if c.sign[body] == sign and c.house[body] == c.house[other] else []
+
+    def vector(m: BatchMasks) -> np.ndarray:
+        return (m.sign[:, body] == sign) & (m.house[:, body] == m.house[:, other])
+    return check, vector
+
+
+def _compile_lords_together(rule: Dict[str, Any]):
+    first, second = rule['houses']
+    message = rule['message']
+    # Distinct lords per ascendant sign, resolved once from the lordship table
+    pairs = [[(a, b) for a in sorted({lords[h] for h in first}) for b in sorted({lords[h] for h in second})]
+             for lords in LORDSHIP_TABLE]
+
+    def check(c: ChartMasks) -> List[str]:
+        if not c.has_lagna:
+            return []
+        house = c.house
+        return [message.format(first=BATCH_BODIES[a], second=BATCH_BODIES[b], house=house[a])
+                for a, b in pairs[c.asc_sign]
+                if house[a] and house[a] == house[b]]
+
+    def vector(m: BatchMasks) -> np.ndarray:
+        a = m.house_of(m.lords[:, first])
+        b = m.house_of(m.lords[:, second])
+        return m.has_lagna & (a[:, :, None] == b[:, None, :]).any(axis=(1, 2))
+    return check, vector
+
+
+def _compile_sign_exchange(rule: Dict[str, Any]):
+    message = rule['message']
+    bodies = np.arange(len(BATCH_BODIES))
+
+    def check(c: ChartMasks) -> List[str]:
+        sign, out = c.sign, []
+        for b in range(len(BATCH_BODIES)):
+            lord = SIGN_LORD_INDEX[sign[b]]
+            if lord != b and SIGN_LORD_INDEX[sign[lord]] == b:
+                out.append(message.format(first=BATCH_BODIES[b], second=BATCH_BODIES[lord],
+                                          first_sign=RASHIS[sign[b]], second_sign=RASHIS[sign[lord]]))
+        return out
+
+    def vector(m: BatchMasks) -> np.ndarray:
+        lord = _SIGN_LORD_ARRAY[m.sign]
+        back = _SIGN_LORD_ARRAY[np.take_along_axis(m.sign, lord, axis=1)]
+        return ((lord != bodies) & (back == bodies)).any(axis=1)
+    return check, vector
+
+
+def _compile_dignified_in_houses(rule: Dict[str, Any]):
+    bodies = [(BODY_INDEX[b], name) for b, name in rule['bodies'].items()]
+    index = [b for b, _name in bodies]
+    exalted = np.array([EXALTATION_INDEX[b] for b in index])
+    target, message = house_mask(rule['houses']), rule['message']
+
+    def check(c: ChartMasks) -> List[str]:
+        sign, house, out = c.sign, c.house, []
+        for b, name in bodies:
+            s, h = sign[b], house[b]
+            if h and (SIGN_LORD_INDEX[s] == b or EXALTATION_INDEX[b] == s) and target & HOUSE_BIT[h]:
+                out.append(message.format(name=name, planet=BATCH_BODIES[b], house=h, sign=RASHIS[s]))
+        return out
+
+    def vector(m: BatchMasks) -> np.ndarray:
+        sign = m.sign[:, index]
+        strong = (_SIGN_LORD_ARRAY[sign] == index) | (sign == exalted)
+        return (strong & _in_mask(target, m.house[:, index])).any(axis=1)
+    return check, vector
+
+
+def _reference_house(c: ChartMasks, ref: str) -> int:
+    return 1 if ref == 'Lagna' else c.house[BODY_INDEX[ref]]
+
+
+def _reference_houses(m: BatchMasks, ref: str) -> np.ndarray:
+    return np.ones(len(m.house), dtype=np.intp) if ref == 'Lagna' else m.house[:, BODY_INDEX[ref]]
+
+
+def _compile_in_reference_houses(rule: Dict[str, Any]):
+    bodies, refs, message = [BODY_INDEX[b] for b in rule['bodies']], rule['from'], rule['message']
+
+    def check(c: ChartMasks) -> List[str]:
+        target = house_mask([_reference_house(c, r) for r in refs])
+        house = c.house
+        return [message.format(planet=BATCH_BODIES[b]) for b in bodies if target & HOUSE_BIT[house[b]]]
+
+    def vector(m: BatchMasks) -> np.ndarray:
+        house = m.house[:, bodies]
+        return np.logical_or.reduce([(house == _reference_houses(m, r)[:, None]).any(axis=1) for r in refs])
+    return check, vector
+
+
+def _compile_lord_with(rule: Dict[str, Any]):
+    of, target = rule['lord_of'], house_mask(rule['houses'])
+    bodies, message = [BODY_INDEX[b] for b in rule['with']], rule['message']
+
+    def check(c: ChartMasks) -> List[str]:
+        if not c.has_lagna:
+            return []
+        lord = c.lords[of]
+        h = c.house[lord]
+        if target & HOUSE_BIT[h]:
+            for b in bodies:
+                if c.house[b] == h:
+                    return [message.format(lord=BATCH_BODIES[lord], planet=BATCH_BODIES[b], house=h)]
+        return []
+
+    def vector(m: BatchMasks) -> np.ndarray:
+        h = m.house_of(m.lords[:, [of]])
+        return m.has_lagna & _in_mask(target, h[:, 0]) & (m.house[:, bodies] == h).any(axis=1)
+    return check, vector
+
+
+def _compile_lords_in_houses(rule: Dict[str, Any]):
+    placements, message = rule['placements'], rule['message']
+    of = [o for o, _h in placements]
+    wanted = np.array([h for _o, h in placements])
+
+    def check(c: ChartMasks) -> List[str]:
+        if not c.has_lagna:
+            return []
+        lords, house = c.lords, c.house
+        return [message] if all(house[lords[o]] == h for o, h in placements) else []
+
+    def vector(m: BatchMasks) -> np.ndarray:
+        return m.has_lagna & (m.house_of(m.lords[:, of]) == wanted).all(axis=1)
+    return check, vector
+
+
+def _compile_houses_from(rule: Dict[str, Any]):
+    body, refs = BODY_INDEX[rule['body']], rule['from']
+    target, message = house_mask(rule['houses']), rule['message']
+
+    def check(c: ChartMasks) -> List[str]:
+        h = c.house[body]
+        for ref in refs:
+            if target & HOUSE_BIT[((h - _reference_house(c, ref)) % 12) + 1]:
+                return [message]
+        return []
+
+    def vector(m: BatchMasks) -> np.ndarray:
+        h = m.house[:, body]
+        return np.logical_or.reduce([_in_mask(target, (h - _reference_houses(m, r)) % 12 + 1) for r in refs])
+    return check, vector
+
+
+def _compile_hemmed_by_nodes(rule: Dict[str, Any]):
+    bodies = [BODY_INDEX[b] for b in rule['bodies']]
+    rahu, ketu, message = BODY_INDEX['Rahu'], BODY_INDEX['Ketu'], rule['message']
+
+    def check(c: ChartMasks) -> List[str]:
+        lon = c.lon
+        start, end = min(lon[rahu], lon[ketu]), max(lon[rahu], lon[ketu])
+        return [message] if all(start <= lon[b] <= end for b in bodies) else []
+
+    def vector(m: BatchMasks) -> np.ndarray:
+        nodes = m.lon[:, [rahu, ketu]]
+        lon = m.lon[:, bodies]
+        return ((lon >= nodes.min(axis=1)[:, None]) & (lon <= nodes.max(axis=1)[:, None])).all(axis=1)
+    return check, vector
+
+
+RULE_COMPILERS = {
+    'all_in_houses': _compile_all_in_houses,
+    'each_in_houses': _compile_each_in_houses,
+    'conjunction': _compile_conjunction,
+    'dispositor_in_houses': _compile_dispositor_in_houses,
+    'empty_around': _compile_empty_around,
+    'sign_with': _compile_sign_with,
+    'lords_together': _compile_lords_together,
+    'sign_exchange': _compile_sign_exchange,
+    'dignified_in_houses': _compile_dignified_in_houses,
+    'in_reference_houses': _compile_in_reference_houses,
+    'lord_with': _compile_lord_with,
+    'lords_in_houses': _compile_lords_in_houses,
+    'houses_from': _compile_houses_from,
+    'hemmed_by_nodes': _compile_hemmed_by_nodes,
+}
+
+_BENEFIC_ORDER = [b for b in BATCH_BODIES if b in BENEFICS]
+
+YOGA_RULES = [
+    {'id': 'gajakesari', 'kind': 'all_in_houses', 'bodies': ['Moon', 'Jupiter'], 'houses': KENDRA_HOUSES,
+     'message': "🌕 Gajakesari Yoga — Moon and Jupiter in Kendra."},
+    {'id': 'budhaditya', 'kind': 'conjunction', 'body': 'Sun', 'with': ['Mercury'], 'orb': 10, 'same_sign': True,
+     'message': "☀️ Budhaditya Yoga — Sun and Mercury conjunct."},
+    {'id': 'chandra_mangala', 'kind': 'conjunction', 'body': 'Moon', 'with': ['Mars'], 'orb': 10, 'same_sign': True,
+     'message': "🔥 Chandra-Mangala Yoga — Moon and Mars conjunct."},
+    {'id': 'dhana', 'kind': 'each_in_houses', 'bodies': ['Jupiter', 'Venus', 'Mercury'], 'houses': [2, 11],
+     'message': "💰 Dhana Yoga — {planet} in house {house}."},
+    {'id': 'vipareeta_raja', 'kind': 'dispositor_in_houses', 'houses': DUSTHANA_HOUSES,
+     'message': "🌀 Vipareeta Raja Yoga — {planet} and {lord} in dusthanas."},
+    {'id': 'kemadruma', 'kind': 'empty_around', 'body': 'Moon', 'offsets': [2, 12],
+     'message': "🌑 Kemadruma Yoga — No planets in 2nd and 12th from Moon."},
+    {'id': 'neecha_bhanga', 'kind': 'sign_with', 'body': 'Saturn', 'sign': 'Medam', 'with': 'Venus',
+     'message': "🧱 Neecha Bhanga Raja Yoga — Saturn debilitation cancelled."},
+    # Kendra lord + Trikona lord association (same house)
+    {'id': 'raja', 'kind': 'lords_together', 'houses': (KENDRA_HOUSES, TRIKONA_HOUSES),
+     'message': "👑 Raja Yoga — {first} (Kendra lord) with {second} (Trikona lord) in house {house}."},
+    {'id': 'parivartana', 'kind': 'sign_exchange',
+     'message': "🔁 Parivartana Yoga — {first} ↔ {second} exchange signs {first_sign} ↔ {second_sign}."},
+    # Ruchaka, Bhadra, Hamsa, Malavya, Shasha: own/exalted sign in a Kendra (ignoring combustion/retro)
+    {'id': 'panch_mahapurusha', 'kind': 'dignified_in_houses', 'houses': KENDRA_HOUSES,
+     'bodies': {'Mars': 'Ruchaka', 'Mercury': 'Bhadra', 'Jupiter': 'Hamsa', 'Venus': 'Malavya', 'Saturn': 'Shasha'},
+     'message': "🏛️ {name} Yoga — {planet} strong in Kendra ({house}) in {sign}."},
+    # Simple rule: benefic conjunction on Lagna/Moon cancels afflictions
+    {'id': 'arishta_bhanga', 'kind': 'in_reference_houses', 'bodies': _BENEFIC_ORDER, 'from': ['Lagna', 'Moon'],
+     'message': "🛡️ Arishta Bhanga — {planet} protects Lagna/Moon."},
+    # Simplified: Lagna lord in Kendra/Trikona with a benefic
+    {'id': 'lakshmi', 'kind': 'lord_with', 'lord_of': 1, 'houses': KENDRA_HOUSES + TRIKONA_HOUSES,
+     'with': _BENEFIC_ORDER, 'message': "💮 Lakshmi Yoga — Lagna lord {lord} strong with {planet} in house {house}."},
+    {'id': 'saraswati', 'kind': 'all_in_houses', 'bodies': ['Jupiter', 'Venus', 'Mercury'], 'houses': [2, 5, 9],
+     'message': "🎓 Saraswati Yoga — Jupiter, Venus, Mercury favor 2/5/9."},
+    # Simplified: 2nd lord in 11th, 11th lord in 2nd (wealth circuit)
+    {'id': 'dhanya', 'kind': 'lords_in_houses', 'placements': [(2, 11), (11, 2)],
+     'message': "🪙 Dhanya Yoga — Strong 2–11 wealth exchange."},
+]
+
+DOSHA_RULES = [
+    {'id': 'manglik', 'kind': 'houses_from', 'body': 'Mars', 'from': ['Lagna', 'Moon'], 'houses': [1, 2, 4, 7, 8, 12],
+     'message': "⚠️ Manglik (Kuja) Dosha present (simplified rule)."},
+    {'id': 'kaal_sarp', 'kind': 'hemmed_by_nodes', 'bodies': ['Sun', 'Moon', 'Mars', 'Mercury', 'Jupiter', 'Venus', 'Saturn'],
+     'message': "🐍 Kaal Sarp Dosha indicated (all planets within Rahu–Ketu arc)."},
+    {'id': 'pitra', 'kind': 'conjunction', 'body': 'Sun', 'with': ['Rahu', 'Ketu', 'Saturn'], 'orb': 8,
+     'message': "🧬 Pitra Dosha (Sun afflicted by nodes/Saturn)."},
+]
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    id: str
+    category: str  # 'yoga' | 'dosha'
+    bit: int
+    check: Callable[[ChartMasks], List[str]]
+    vector: Callable[[BatchMasks], np.ndarray]
+
+
+def compile_rules(yoga_rules: List[Dict[str, Any]], dosha_rules: List[Dict[str, Any]]) -> List[CompiledRule]:
+    specs = [('yoga', r) for r in yoga_rules] + [('dosha', r) for r in dosha_rules]
+    return [CompiledRule(r['id'], category, bit, *RULE_COMPILERS[r['kind']](r))
+            for bit, (category, r) in enumerate(specs)]
+
+
+RULES = compile_rules(YOGA_RULES, DOSHA_RULES)
+RULE_BITS = {r.id: r.bit for r in RULES}
+_RULES_BY_ID = {r.id: r for r in RULES}
+YOGA_MASK = sum(1 << r.bit for r in RULES if r.category == 'yoga')
+DOSHA_MASK = sum(1 << r.bit for r in RULES if r.category == 'dosha')
+
+
+def evaluate_rules(masks: ChartMasks) -> Tuple[List[str], List[str], int]:
+    """Single pass over every compiled rule: (yoga messages, dosha messages, matched bitmask)."""
+    yogas, doshas, matched = [], [], 0
+    for rule in RULES:
+        found = rule.check(masks)
+        if found:
+            matched |= 1 << rule.bit
+            (yogas if rule.category == 'yoga' else doshas).extend(found)
+    return yogas, doshas, matched
+
+
+def evaluate_rules_batch(longitudes: ArrayLike, asc: ArrayLike) -> np.ndarray:
+    """Matched-rule bitmask per chart, for `longitudes` shaped (n, 9) in BATCH_BODIES order and `asc` shaped (n,)."""
+    masks = BatchMasks.from_longitudes(longitudes, asc)
+    out = np.zeros(len(masks.lon), dtype=np.uint32)
+    for rule in RULES:
+        out |= rule.vector(masks).astype(np.uint32) << np.uint32(rule.bit)
+    return out
+
+
+def rule_ids(matched: int) -> List[str]:
+    return [r.id for r in RULES if matched >> r.bit & 1]
+
+
+def chart_masks(chart: Union[Chart, Dict[str, Any]]) -> ChartMasks:
+    return chart.masks() if isinstance(chart, Chart) else ChartMasks.from_dict(chart)
+
+
+def _detect(rule_id: str, chart: Union[Chart, Dict[str, Any]]) -> List[str]:
+    return _RULES_BY_ID[rule_id].check(chart_masks(chart))
+
+
+def _detect_one(rule_id: str, chart: Union[Chart, Dict[str, Any]]) -> Optional[str]:
+    found = _detect(rule_id, chart)
+    return found[0] if found else None
+
+# Per-yoga detectors kept for callers that want a single rule
 
 def detect_gajakesari(chart: Dict[str, Any]):
-    if get_planet_house(chart, "Moon") in KENDRA_HOUSES and get_planet_house(chart, "Jupiter") in KENDRA_HOUSES:
-        return "🌕 Gajakesari Yoga — Moon and Jupiter in Kendra."
+    return _detect_one('gajakesari', chart)
 
 
 def detect_budhaditya(chart: Dict[str, Any]):
-    if get_planet_sign(chart, "Sun") == get_planet_sign(chart, "Mercury") and is_conjunct(get_planet_degree(chart, "Sun"), get_planet_degree(chart, "Mercury")):
-        return "☀️ Budhaditya Yoga — Sun and Mercury conjunct."
+    return _detect_one('budhaditya', chart)
 
 
 def detect_chandra_mangala(chart: Dict[str, Any]):
-    if get_planet_sign(chart, "Moon") == get_planet_sign(chart, "Mars") and is_conjunct(get_planet_degree(chart, "Moon"), get_planet_degree(chart, "Mars")):
-        return "🔥 Chandra-Mangala Yoga — Moon and Mars conjunct."
+    return _detect_one('chandra_mangala', chart)
 
 
 def detect_dhana_yogas(chart: Dict[str, Any]):
-    return [f"💰 Dhana Yoga — {planet} in house {house}."
-            for planet in ["Jupiter", "Venus", "Mercury"]
-            if (house := get_planet_house(chart, planet)) in [2, 11]]
+    return _detect('dhana', chart)
 
 
 def detect_vipareeta_raja_yoga(chart: Dict[str, Any]):
-    for planet, house in chart.get("Houses", {}).items():
-        if house in DUSTHANA_HOUSES:
-            lord = RASI_LORDS.get(chart["Signs"].get(planet))
-            if lord and get_planet_house(chart, lord) in DUSTHANA_HOUSES:
-                return f"🌀 Vipareeta Raja Yoga — {planet} and {lord} in dusthanas."
+    return _detect_one('vipareeta_raja', chart)
 
 
 def detect_kemadruma(chart: Dict[str, Any]):
-    moon_house = get_planet_house(chart, "Moon")
-    if not moon_house:
-        return None
-    second = (moon_house % 12) + 1
-    twelfth = 12 if moon_house == 1 else moon_house - 1
-    occupied = set(chart["Houses"].values())
-    if second not in occupied and twelfth not in occupied:
-        return "🌑 Kemadruma Yoga — No planets in 2nd and 12th from Moon."
+    return _detect_one('kemadruma', chart)
 
 
 def detect_neecha_bhanga(chart: Dict[str, Any]):
-    if get_planet_sign(chart, "Saturn") == "Medam" and get_planet_house(chart, "Saturn") == get_planet_house(chart, "Venus"):
-        return "🧱 Neecha Bhanga Raja Yoga — Saturn debilitation cancelled."
+    return _detect_one('neecha_bhanga', chart)
 
-# -------------------- MORE YOGAS --------------------
 
 def detect_raja_yogas(chart: Dict[str, Any]) -> List[str]:
-    """Kendra lord + Trikona lord association (conjunction or mutual aspect / same house)."""
-    lagna = chart.get('Lagna', 0.0)
-    if not lagna:
-        return []
-    lords = get_house_lords(lagna)
-    k_lords = {lords[h] for h in KENDRA_HOUSES}
-    t_lords = {lords[h] for h in TRIKONA_HOUSES}
-    houses = chart.get('Houses', {})
-    out = []
-    for k in k_lords:
-        for t in t_lords:
-            if k in houses and t in houses and houses[k] == houses[t]:
-                out.append(f"👑 Raja Yoga — {k} (Kendra lord) with {t} (Trikona lord) in house {houses[k]}.")
-    return out
+    return _detect('raja', chart)
 
 
 def detect_parivartana_yoga(chart: Dict[str, Any]) -> List[str]:
-    signs = chart.get('Signs', {})
-    out = []
-    for p1, s1 in signs.items():
-        lord1 = get_rasi_lord(s1)
-        if lord1 not in signs:
-            continue
-        s2 = signs[lord1]
-        lord2 = get_rasi_lord(s2)
-        if lord2 == p1 and p1 != lord1:
-            out.append(f"🔁 Parivartana Yoga — {p1} ↔ {lord1} exchange signs {s1} ↔ {s2}.")
-    return list(dict.fromkeys(out))
+    return _detect('parivartana', chart)
 
 
 def detect_panch_mahapurusha(chart: Dict[str, Any]) -> List[str]:
-    """
-    Ruchaka (Mars), Bhadra (Mercury), Hamsa (Jupiter), Malavya (Venus), Shasha (Saturn):
-    Planet in own/exalted sign in a Kendra (1/4/7/10) (ignoring combustion/retro for simplicity).
-    """
-    targets = {
-        'Mars': 'Ruchaka', 'Mercury': 'Bhadra', 'Jupiter': 'Hamsa', 'Venus': 'Malavya', 'Saturn': 'Shasha'
-    }
-    out = []
-    for p, yoga in targets.items():
-        sign = get_planet_sign(chart, p)
-        house = get_planet_house(chart, p)
-        if not sign or not house:
-            continue
-        status = get_exaltation_status(p, chart[p])
-        if (get_rasi_lord(sign) == p or status == 'Exalted') and house in KENDRA_HOUSES:
-            out.append(f"🏛️ {yoga} Yoga — {p} strong in Kendra ({house}) in {sign}.")
-    return out
+    return _detect('panch_mahapurusha', chart)
 
 
 def detect_arishta_bhanga(chart: Dict[str, Any]) -> List[str]:
-    out = []
-    # Simple rule: Benefic aspect or conjunction on Lagna/Moon cancels afflictions
-    moon_h = get_planet_house(chart, 'Moon')
-    lagna_h = 1
-    occupied = chart.get('Houses', {})
-    for p in BENEFICS:
-        if occupied.get(p) in [lagna_h, moon_h]:
-            out.append(f"🛡️ Arishta Bhanga — {p} protects Lagna/Moon.")
-    return out
+    return _detect('arishta_bhanga', chart)
 
 
 def detect_lakshmi_yoga(chart: Dict[str, Any]) -> List[str]:
-    out = []
-    # Simplified: Lagna lord strong and placed in Kendra/Trikona with benefic association
-    lagna = chart.get('Lagna', 0.0)
-    if not lagna:
-        return out
-    lords = get_house_lords(lagna)
-    lagna_lord = lords[1]
-    h = get_planet_house(chart, lagna_lord)
-    if h in KENDRA_HOUSES + TRIKONA_HOUSES:
-        for b in BENEFICS:
-            if get_planet_house(chart, b) == h:
-                out.append(f"💮 Lakshmi Yoga — Lagna lord {lagna_lord} strong with {b} in house {h}.")
-                break
-    return out
+    return _detect('lakshmi', chart)
 
 
 def detect_saraswati_yoga(chart: Dict[str, Any]) -> List[str]:
-    out = []
-    # Simplified: Jupiter, Venus, Mercury strong and connected to 2/5/9 houses
-    target_houses = {2,5,9}
-    houses = chart.get('Houses', {})
-    if all(houses.get(p) in target_houses for p in ["Jupiter","Venus","Mercury"]):
-        out.append("🎓 Saraswati Yoga — Jupiter, Venus, Mercury favor 2/5/9.")
-    return out
+    return _detect('saraswati', chart)
 
 
 def detect_dhanya_yoga(chart: Dict[str, Any]) -> List[str]:
-    out = []
-    # Simplified: 2nd lord in 11th, 11th lord in 2nd (wealth circuit)
-    lagna = chart.get('Lagna', 0.0)
-    if not lagna:
-        return out
-    lords = get_house_lords(lagna)
-    h = chart.get('Houses', {})
-    if h.get(lords[2]) == 11 and h.get(lords[11]) == 2:
-        out.append("🪙 Dhanya Yoga — Strong 2–11 wealth exchange.")
-    return out
+    return _detect('dhanya', chart)
 
 # -------------------- DOSHAS --------------------
 
 def detect_manglik_dosha(chart: Dict[str, Any]) -> str:
-    # Mars in 1,2,4,7,8,12 from Lagna or Moon
-    mars_h = get_planet_house(chart, 'Mars')
-    moon_h = get_planet_house(chart, 'Moon')
-    if mars_h in [1,2,4,7,8,12] or ((mars_h - moon_h) % 12) + 1 in [1,2,4,7,8,12]:
-        return "⚠️ Manglik (Kuja) Dosha present (simplified rule)."
+    return _detect_one('manglik', chart)
 
 
 def detect_kaal_sarp_dosha(chart: Dict[str, Any]) -> str:
-    # All planets within Rahu–Ketu axis without any planet outside
-    rahu = chart.get('Rahu')
-    ketu = chart.get('Ketu')
-    if rahu is None or ketu is None:
-        return None
-    start = min(rahu, ketu)
-    end = max(rahu, ketu)
-    inside = 0
-    outside = 0
-    for p in ['Sun','Moon','Mars','Mercury','Jupiter','Venus','Saturn']:
-        deg = chart.get(p)
-        if deg is None: continue
-        if start <= deg <= end:
-            inside += 1
-        else:
-            outside += 1
-    if outside == 0:
-        return "🐍 Kaal Sarp Dosha indicated (all planets within Rahu–Ketu arc)."
+    return _detect_one('kaal_sarp', chart)
 
 
 def detect_pitra_dosha(chart: Dict[str, Any]) -> str:
-    # Simplified: Sun afflicted by Rahu/Ketu or Saturn (conjunction)
-    sun = chart.get('Sun')
-    for mal in ['Rahu','Ketu','Saturn']:
-        if is_conjunct(sun, chart.get(mal, -100), 8):
-            return "🧬 Pitra Dosha (Sun afflicted by nodes/Saturn)."
+    return _detect_one('pitra', chart)
 
 # -------------------- HOUSE-SPECIFIC STRENGTHS --------------------
 
@@ -728,81 +1584,999 @@ def check_benefic_malefic_in_kendras_trikonas(chart: Dict[str, Any]) -> Dict[str
 
 # -------------------- MAIN YOGA DETECTION --------------------
 
-def detect_yogas(chart: Dict[str, Any]) -> List[str]:
-    detectors = [
-        detect_gajakesari, detect_budhaditya, detect_chandra_mangala,
-        detect_dhana_yogas, detect_vipareeta_raja_yoga,
-        detect_kemadruma, detect_neecha_bhanga,
-        # More
-        detect_raja_yogas, detect_parivartana_yoga, detect_panch_mahapurusha,
-        detect_arishta_bhanga, detect_lakshmi_yoga, detect_saraswati_yoga,
-        detect_dhanya_yoga,
-    ]
-    yogas = []
-    for detect in detectors:
-        result = detect(chart)
-        if result:
-            yogas.extend(result if isinstance(result, list) else [result])
-    return yogas
+def detect_yogas(chart: Union[Chart, Dict[str, Any]]) -> List[str]:
+    return evaluate_rules(chart_masks(chart))[0]
+
+# -------------------- COMPATIBILITY (PORUTHAM / ASHTAKOOTA) --------------------
+# Every factor depends only on the (bride, groom) Moon nakshatra pair or the
+# Moon rasi pair, so each is precomputed into a 27x27 or 12x12 matrix indexed
+# [bride, groom]. Scoring one person against N candidates is then a couple of
+# fancy-indexing lookups (score_matches).
+
+PORUTHAMS = ['dinam', 'ganam', 'mahendram', 'stree_deerkham', 'yoni',
+             'rasi', 'rasyadhipati', 'vasyam', 'rajju', 'vedha']
+PORUTHAM_BITS = {name: i for i, name in enumerate(PORUTHAMS)}
+# A failed Rajju or Vedha rejects the match regardless of the other poruthams
+ESSENTIAL_PORUTHAMS = ('rajju', 'vedha')
+KOOTA_POINTS = {'varna': 1, 'vashya': 2, 'tara': 3, 'yoni': 4,
+                'graha_maitri': 5, 'gana': 6, 'bhakoot': 7, 'nadi': 8}
+
+# Nakshatra attributes (index as NAKSHATRAS)
+NAK_GANA = [0, 1, 2, 1, 0, 1, 0, 0, 2, 2, 1, 1, 0, 2, 0, 2, 0, 2, 2, 1, 1, 0, 2, 2, 1, 1, 0]  # Deva/Manushya/Rakshasa
+NAK_YONI = ['Horse', 'Elephant', 'Sheep', 'Serpent', 'Serpent', 'Dog', 'Cat', 'Sheep', 'Cat',
+            'Rat', 'Rat', 'Cow', 'Buffalo', 'Tiger', 'Buffalo', 'Tiger', 'Deer', 'Deer',
+            'Dog', 'Monkey', 'Mongoose', 'Monkey', 'Lion', 'Horse', 'Lion', 'Cow', 'Elephant']
+YONI_ENEMIES = [{'Horse', 'Buffalo'}, {'Elephant', 'Lion'}, {'Sheep', 'Monkey'}, {'Serpent', 'Mongoose'},
+                {'Dog', 'Deer'}, {'Cat', 'Rat'}, {'Cow', 'Tiger'}]
+NAK_NADI = [(0, 1, 2, 2, 1, 0)[i % 6] for i in range(27)]            # Adi/Madhya/Antya
+NAK_RAJJU = [(0, 1, 2, 3, 4, 3, 2, 1, 0)[i % 9] for i in range(27)]   # Pada/Kati/Nabhi/Kanta/Siro
+VEDHA_GROUPS = [{0, 17}, {1, 16}, {2, 15}, {3, 14}, {5, 21}, {6, 20}, {7, 19}, {8, 18},
+                {9, 26}, {10, 25}, {11, 24}, {12, 23}, {4, 13, 22}]
+
+# Rasi attributes (index as RASHIS)
+RASI_VARNA = [(2, 1, 0, 3)[i % 4] for i in range(12)]  # Shudra 0 .. Brahmin 3
+# Chatushpada/Manava/Jalachara/Vanachara/Keeta; Dhanu taken as Manava, Makaram as Jalachara
+RASI_VASHYA = [0, 0, 1, 2, 3, 1, 1, 4, 1, 2, 1, 2]
+VASHYA_POINTS = [  # [groom][bride]
+    [2, 1, 1, 0.5, 1],
+    [1, 2, 0.5, 0, 1],
+    [1, 0.5, 2, 1, 1],
+    [0, 0, 1, 2, 0],
+    [1, 1, 1, 0, 2],
+]
+GANA_POINTS = [  # [groom][bride]
+    [6, 6, 0],
+    [5, 6, 0],
+    [1, 0, 6],
+]
+VASYA_SIGNS = {
+    0: {4, 7}, 1: {3, 6}, 2: {5}, 3: {7, 8}, 4: {6}, 5: {2, 11},
+    6: {5, 9}, 7: {3}, 8: {11}, 9: {0, 10}, 10: {0}, 11: {9},
+}
+
+# Naisargika (natural) friendships; anything not listed is neutral
+PLANET_FRIENDS = {
+    'Sun': {'Moon', 'Mars', 'Jupiter'}, 'Moon': {'Sun', 'Mercury'},
+    'Mars': {'Sun', 'Moon', 'Jupiter'}, 'Mercury': {'Sun', 'Venus'},
+    'Jupiter': {'Sun', 'Moon', 'Mars'}, 'Venus': {'Mercury', 'Saturn'},
+    'Saturn': {'Mercury', 'Venus'},
+}
+PLANET_ENEMIES = {
+    'Sun': {'Venus', 'Saturn'}, 'Moon': set(), 'Mars': {'Mercury'}, 'Mercury': {'Moon'},
+    'Jupiter': {'Mercury', 'Venus'}, 'Venus': {'Sun', 'Moon'}, 'Saturn': {'Sun', 'Moon', 'Mars'},
+}
+SIGN_LORD_NAMES = [RASI_LORDS[s] for s in RASHIS]
+MAITRI_POINTS = {('F', 'F'): 5, ('F', 'N'): 4, ('N', 'N'): 3, ('F', 'E'): 1, ('N', 'E'): 0.5, ('E', 'E'): 0}
+
+
+def planet_relation(planet: str, other: str) -> str:
+    """'F'riend, 'N'eutral or 'E'nemy, as `planet` regards `other`."""
+    if other in PLANET_FRIENDS[planet]:
+        return 'F'
+    return 'E' if other in PLANET_ENEMIES[planet] else 'N'
+
+
+def lords_friendly(sign_a: int, sign_b: int) -> bool:
+    a, b = SIGN_LORD_NAMES[sign_a], SIGN_LORD_NAMES[sign_b]
+    return a == b or (planet_relation(a, b) == 'F' and planet_relation(b, a) == 'F')
+
+
+def _star_count(bride: int, groom: int) -> int:
+    """Groom's nakshatra counted from the bride's, inclusive (1..27)."""
+    return (groom - bride) % 27 + 1
+
+
+def _rasi_count(bride: int, groom: int) -> int:
+    return (groom - bride) % 12 + 1
+
+
+def nakshatra_poruthams(bride: int, groom: int) -> Dict[str, bool]:
+    count = _star_count(bride, groom)
+    return {
+        'dinam': count % 9 in (0, 2, 4, 6, 8),
+        'ganam': NAK_GANA[bride] == NAK_GANA[groom] or 2 not in (NAK_GANA[bride], NAK_GANA[groom]),
+        'mahendram': count in (4, 7, 10, 13, 16, 19, 22, 25),
+        'stree_deerkham': count > 13,
+        'yoni': {NAK_YONI[bride], NAK_YONI[groom]} not in YONI_ENEMIES,
+        'rajju': NAK_RAJJU[bride] != NAK_RAJJU[groom],
+        'vedha': not any(bride in g and groom in g and bride != groom for g in VEDHA_GROUPS),
+    }
+
+
+def rasi_poruthams(bride: int, groom: int) -> Dict[str, bool]:
+    count = _rasi_count(bride, groom)
+    lord_b, lord_g = SIGN_LORD_NAMES[bride], SIGN_LORD_NAMES[groom]
+    return {
+        'rasi': count == 1 or (count > 6 and count != 8),
+        'rasyadhipati': lord_b == lord_g or 'E' not in (planet_relation(lord_b, lord_g), planet_relation(lord_g, lord_b)),
+        'vasyam': bride == groom or groom in VASYA_SIGNS[bride] or bride in VASYA_SIGNS[groom],
+    }
+
+
+def _tara_good(start: int, end: int) -> bool:
+    return _star_count(start, end) % 9 not in (3, 5, 7)
+
+
+def nakshatra_kootas(bride: int, groom: int) -> Dict[str, float]:
+    yoni_b, yoni_g = NAK_YONI[bride], NAK_YONI[groom]
+    # Yoni simplified to same (4) / enemy (0) / otherwise (2)
+    yoni = 4 if yoni_b == yoni_g else 0 if {yoni_b, yoni_g} in YONI_ENEMIES else 2
+    return {
+        'tara': 1.5 * _tara_good(bride, groom) + 1.5 * _tara_good(groom, bride),
+        'yoni': yoni,
+        'gana': GANA_POINTS[NAK_GANA[groom]][NAK_GANA[bride]],
+        'nadi': 0 if NAK_NADI[bride] == NAK_NADI[groom] else 8,
+    }
+
+
+def bhakoot_dosha(bride: int, groom: int) -> bool:
+    """2/12, 5/9 or 6/8 Moon-sign relation."""
+    return _rasi_count(bride, groom) in (2, 12, 5, 9, 6, 8)
+
+
+def rasi_kootas(bride: int, groom: int) -> Dict[str, float]:
+    lord_b, lord_g = SIGN_LORD_NAMES[bride], SIGN_LORD_NAMES[groom]
+    if lord_b == lord_g:
+        maitri = 5
+    else:
+        rel = tuple(sorted((planet_relation(lord_b, lord_g), planet_relation(lord_g, lord_b)), key='FNE'.index))
+        maitri = MAITRI_POINTS[rel]
+    return {
+        'varna': 1 if RASI_VARNA[groom] >= RASI_VARNA[bride] else 0,
+        'vashya': VASHYA_POINTS[RASI_VASHYA[groom]][RASI_VASHYA[bride]],
+        'graha_maitri': maitri,
+        # Bhakoot dosha is cancelled when the Moon-sign lords are the same or mutual friends
+        'bhakoot': 0 if bhakoot_dosha(bride, groom) and not lords_friendly(bride, groom) else 7,
+    }
+
+
+
+def _porutham_mask(checks: Dict[str, bool]) -> int:
+    return sum(1 << PORUTHAM_BITS[name] for name, ok in checks.items() if ok)
+
+
+# [bride, groom] lookup matrices
+PORUTHAM_NAK = np.array([[_porutham_mask(nakshatra_poruthams(b, g)) for g in range(27)] for b in range(27)], dtype=np.uint16)
+PORUTHAM_RASI = np.array([[_porutham_mask(rasi_poruthams(b, g)) for g in range(12)] for b in range(12)], dtype=np.uint16)
+KOOTA_NAK = np.array([[sum(nakshatra_kootas(b, g).values()) for g in range(27)] for b in range(27)], dtype=np.float32)
+KOOTA_RASI = np.array([[sum(rasi_kootas(b, g).values()) for g in range(12)] for b in range(12)], dtype=np.float32)
+# Bhakoot points still lost after the rasi-lord cancellation, and whether Moon's navamsa lords can restore them
+BHAKOOT_LOST = np.array([[rasi_kootas(b, g)['bhakoot'] == 0 for g in range(12)] for b in range(12)])
+NAVAMSA_FRIENDLY = np.array([[lords_friendly(b, g) for g in range(12)] for b in range(12)])
+_POPCOUNT = np.array([bin(i).count('1') for i in range(1 << len(PORUTHAMS))], dtype=np.int8)
+ESSENTIAL_MASK = sum(1 << PORUTHAM_BITS[name] for name in ESSENTIAL_PORUTHAMS)
+MANGLIK_BIT = 1 << RULE_BITS['manglik']
+
+
+@dataclass
+class MatchProfile:
+    """Moon factors needed for matching (indices as NAKSHATRAS / RASHIS)."""
+    nakshatra: int
+    rasi: int
+    navamsa: int
+    manglik: bool
+
+    @classmethod
+    def from_chart(cls, chart: 'Chart') -> 'MatchProfile':
+        navamsa = RASHIS.index(calculate_navamsa_chart({'Moon': chart.longitude('Moon')})['Moon'])
+        manglik = detect_manglik_dosha(chart) is not None
+        return cls(chart.nakshatra('Moon'), chart.sign('Moon'), navamsa, manglik)
+
+
+def match_report(bride: MatchProfile, groom: MatchProfile) -> Dict[str, Any]:
+    """Full porutham / koota breakdown for one pair."""
+    poruthams = {**nakshatra_poruthams(bride.nakshatra, groom.nakshatra), **rasi_poruthams(bride.rasi, groom.rasi)}
+    kootas = {**nakshatra_kootas(bride.nakshatra, groom.nakshatra), **rasi_kootas(bride.rasi, groom.rasi)}
+    if kootas['bhakoot'] == 0 and NAVAMSA_FRIENDLY[bride.navamsa, groom.navamsa]:
+        kootas['bhakoot'] = KOOTA_POINTS['bhakoot']
+    return {
+        'poruthams': {name: poruthams[name] for name in PORUTHAMS},
+        'porutham_count': sum(poruthams.values()),
+        'kootas': {name: kootas[name] for name in KOOTA_POINTS},
+        'ashtakoota': sum(kootas.values()),
+        # Manglik dosha in one partner only; two Manglik charts cancel out
+        'manglik_dosha': bride.manglik != groom.manglik,
+        'compatible': all(poruthams[name] for name in ESSENTIAL_PORUTHAMS) and bride.manglik == groom.manglik,
+    }
+
+
+def score_matches(person: MatchProfile, naks: ArrayLike, rasis: ArrayLike, navamsas: ArrayLike,
+                  mangliks: ArrayLike, person_is_bride: bool = True) -> Dict[str, np.ndarray]:
+    """Vectorised `match_report` of one person against N candidates (arrays of length N)."""
+    naks, rasis, navamsas = (np.asarray(a, dtype=np.intp) for a in (naks, rasis, navamsas))
+    mangliks = np.asarray(mangliks, dtype=bool)
+    if person_is_bride:
+        nak_idx, rasi_idx, nav_idx = (person.nakshatra, naks), (person.rasi, rasis), (person.navamsa, navamsas)
+    else:
+        nak_idx, rasi_idx, nav_idx = (naks, person.nakshatra), (rasis, person.rasi), (navamsas, person.navamsa)
+    mask = PORUTHAM_NAK[nak_idx] | PORUTHAM_RASI[rasi_idx]
+    ashtakoota = KOOTA_NAK[nak_idx] + KOOTA_RASI[rasi_idx]
+    ashtakoota += KOOTA_POINTS['bhakoot'] * (BHAKOOT_LOST[rasi_idx] & NAVAMSA_FRIENDLY[nav_idx])
+    manglik_ok = mangliks == person.manglik
+    return {
+        'porutham_mask': mask,
+        'porutham_count': _POPCOUNT[mask],
+        'ashtakoota': ashtakoota,
+        'manglik_ok': manglik_ok,
+        'compatible': ((mask & ESSENTIAL_MASK) == ESSENTIAL_MASK) & manglik_ok,
+    }
+
+
+def top_matches(scores: Dict[str, np.ndarray], k: int = 20) -> np.ndarray:
+    """Indices of the k best candidates: compatible first, then Ashtakoota points, then porutham count."""
+    # Koota totals move in 0.5 steps and counts are <= 10, so the packed key never mixes tiers
+    key = scores['compatible'] * 100.0 + scores['ashtakoota'] + scores['porutham_count'] / 100.0
+    k = min(k, len(key))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    best = np.argpartition(-key, k - 1)[:k]
+    return best[np.argsort(-key[best], kind='stable')]
 
 # -------------------- TRANSITS (GOCHAR) --------------------
 
 def get_current_transits(date_str: str, time_str: str, lat: float, lon: float) -> Dict[str, float]:
-    return get_planet_positions(date_str, time_str, lat, lon)
+    jd = local_to_jd(parse_local_datetime(date_str, time_str))
+    return {p: round(lon_, 2) for p, (lon_, _spd) in get_planet_positions_with_speed(jd).items()}
+
+
+SADE_SATI_HOUSES = {12: 'rising', 1: 'peak', 2: 'setting'}
+KANTAKA_SHANI_HOUSES = {4: 'ardhashtama', 8: 'ashtama'}
+JUPITER_FAVOURABLE_HOUSES = {2, 5, 7, 9, 11}
+
+
+def house_from_moon(natal_moon_long: float, transit_long: float) -> int:
+    """House (1–12) of a transiting body counted from the natal Moon sign."""
+    return (int(transit_long // 30) - int(natal_moon_long // 30)) % 12 + 1
 
 
 def analyze_saturn_transit(natal_moon_long: float, current_saturn_long: float) -> str:
-    natal_moon_sign = int(natal_moon_long // 30)
-    sat_sign = int(current_saturn_long // 30)
-    rel = (sat_sign - natal_moon_sign) % 12
-    if rel in [12, 1, 2]:
+    house = house_from_moon(natal_moon_long, current_saturn_long)
+    if house in SADE_SATI_HOUSES:
         return "🪐 Sade-Sati phase (Saturn 12th/1st/2nd from Moon)."
-    if rel in [4, 8]:
+    if house in KANTAKA_SHANI_HOUSES:
         return "🪐 Dhaiya/Kantaka Shani (Saturn 4th/8th from Moon)."
 
 
 def analyze_jupiter_transit(natal_moon_long: float, current_jupiter_long: float) -> str:
-    natal_moon_sign = int(natal_moon_long // 30)
-    j_sign = int(current_jupiter_long // 30)
-    rel = (j_sign - natal_moon_sign) % 12
-    if rel in [2,5,7,9,11]:
+    if house_from_moon(natal_moon_long, current_jupiter_long) in JUPITER_FAVOURABLE_HOUSES:
         return "♃ Jupiter transit favorable from Moon (2/5/7/9/11)."
     return "♃ Jupiter transit neutral/challenging currently."
 
-# -------------------- ORCHESTRATOR --------------------
+# -------------------- TRANSIT INGRESS ENGINE --------------------
 
-def generate_professional_birth_chart(date_str: str, time_str: str, lat: float, lon: float) -> Dict[str, Any]:
-    # Base JD
-    year, month, day = map(int, date_str.split('-'))
-    hour, minute = map(int, time_str.split(':'))
-    dt = datetime.datetime(year, month, day, hour, minute)
-    dt_utc = dt - datetime.timedelta(hours=5, minutes=30)
-    ut_hour = dt_utc.hour + dt_utc.minute / 60.0
-    jd = swe.julday(dt_utc.year, dt_utc.month, dt_utc.day, ut_hour)
+INGRESS_DIVISIONS = {'sign': 30.0, 'nakshatra': NAK_SEG, 'pada': PADA_SEG}
+
+# Coarse scan step in days. It must be shorter than the time between two
+# stations so speed changes sign at most once between samples (Sun, Moon and
+# the mean nodes never station) and keep the motion per step well below 180°.
+INGRESS_SCAN_STEP = {
+    'Sun': 10.0, 'Moon': 1.0, 'Mercury': 4.0, 'Venus': 8.0, 'Mars': 10.0,
+    'Jupiter': 20.0, 'Saturn': 20.0, 'Rahu': 30.0, 'Ketu': 30.0,
+}
+INGRESS_TOLERANCE = 1e-5  # days (~1 s)
+
+
+@dataclass(frozen=True)
+class Ingress:
+    jd: float
+    planet: str
+    division: str
+    index: int       # division index entered (0-based sign / nakshatra / pada-of-zodiac)
+    previous: int    # division index left
+    retrograde: bool
+
+
+def body_longitudes(planet: str, jds: ArrayLike, use_tables: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """Longitude and speed arrays for one body, from the Chebyshev tables when they cover `jds`."""
+    jds = np.atleast_1d(np.asarray(jds, dtype=np.float64))
+    source = 'Rahu' if planet == 'Ketu' else planet
+    table = load_chebyshev_tables().get(source) if use_tables else None
+    if table is not None and table.covers(jds).all():
+        lon, speed = table.evaluate(jds)
+    else:
+        code = PLANET_CODES[source]
+        raw = np.array([swe.calc_ut(jd, code, EPHE_FLAGS)[0][0:4:3] for jd in jds.tolist()], dtype=np.float64)
+        lon, speed = np.mod(raw[:, 0], 360.0), raw[:, 1]
+    if planet == 'Ketu':
+        lon = np.mod(lon + 180.0, 360.0)
+    return lon, speed
+
+
+def body_state(planet: str, jd: float, use_tables: bool = True) -> Tuple[float, float]:
+    """Scalar (longitude, speed) for one body; the hot path of the root finders."""
+    source = 'Rahu' if planet == 'Ketu' else planet
+    table = load_chebyshev_tables().get(source) if use_tables else None
+    if table is not None and table.start <= jd < table.end:
+        lon, speed = table.at(jd)
+    else:
+        xx, _fl = swe.calc_ut(jd, PLANET_CODES[source], EPHE_FLAGS)
+        lon, speed = xx[0] % 360.0, xx[3]
+    if planet == 'Ketu':
+        lon = (lon + 180.0) % 360.0
+    return lon, speed
+
+
+def _find_station(planet: str, a: float, b: float, speed_a: float, speed_b: float, use_tables: bool) -> float:
+    """Zero of the speed between two samples that straddle a station (Illinois regula falsi)."""
+    side = 0
+    t = a
+    for _ in range(60):
+        t = (a * speed_b - b * speed_a) / (speed_b - speed_a)
+        spd = body_state(planet, t, use_tables)[1]
+        if (spd < 0) == (speed_a < 0):
+            a, speed_a = t, spd
+            if side == -1:
+                speed_b /= 2.0
+            side = -1
+        else:
+            b, speed_b = t, spd
+            if side == 1:
+                speed_a /= 2.0
+            side = 1
+        if b - a < INGRESS_TOLERANCE or spd == 0.0:
+            break
+    return t
+
+
+def solve_angle_crossing(state: Callable[[float], Tuple[float, float]], target: float, a: float, b: float) -> float:
+    """Time in [a, b] where a monotonic angle reaches `target`: Newton steps, bisection fallback.
+
+    `state(jd)` returns (angle in degrees, rate in degrees/day).
+    """
+    below_at_a = angle_signed(state(a)[0], target) < 0
+    t = 0.5 * (a + b)
+    for _ in range(60):
+        angle, rate = state(t)
+        g = angle_signed(angle, target)
+        if (g < 0) == below_at_a:
+            a = t
+        else:
+            b = t
+        nxt = t - g / rate if rate else 0.5 * (a + b)
+        if abs(nxt - t) < INGRESS_TOLERANCE and a <= nxt <= b:
+            return nxt
+        t = nxt if a < nxt < b else 0.5 * (a + b)
+        if b - a < INGRESS_TOLERANCE:
+            break
+    return t
+
+
+def _solve_crossing(planet: str, target: float, a: float, b: float, use_tables: bool) -> float:
+    return solve_angle_crossing(lambda t: body_state(planet, t, use_tables), target, a, b)
+
+
+def find_ingresses(planet: str, start_jd: float, end_jd: float, division: str = 'sign',
+                   use_tables: bool = True) -> List[Ingress]:
+    """Every time `planet` enters a new sign / nakshatra / pada between two Julian days.
+
+    Samples at `INGRESS_SCAN_STEP`, splits intervals at stations so each piece is
+    monotonic (this is what catches retrograde re-entries), then solves every
+    boundary crossed in a piece with speed-guided Newton steps.
+    """
+    width = INGRESS_DIVISIONS[division]
+    count = int(round(360.0 / width))
+    step = INGRESS_SCAN_STEP.get(planet, 10.0)
+    n = max(2, int(np.ceil((end_jd - start_jd) / step)) + 1)
+    jds = np.linspace(start_jd, end_jd, n)
+    lon, speed = body_longitudes(planet, jds, use_tables)
+    unwrapped = np.degrees(np.unwrap(np.radians(lon)))
+    cells = np.floor(unwrapped / width)
+
+    # Only intervals whose division changes or whose speed flips need refinement
+    candidates = np.nonzero((cells[1:] != cells[:-1]) | (np.signbit(speed[1:]) != np.signbit(speed[:-1])))[0]
+
+    ingresses = []
+    for i in candidates.tolist():
+        pieces = [(jds[i], unwrapped[i], jds[i + 1], unwrapped[i + 1])]
+        if np.signbit(speed[i]) != np.signbit(speed[i + 1]):
+            ts = _find_station(planet, jds[i], jds[i + 1], speed[i], speed[i + 1], use_tables)
+            lon_s = unwrapped[i] + angle_signed(body_state(planet, ts, use_tables)[0], lon[i])
+            pieces = [(jds[i], unwrapped[i], ts, lon_s), (ts, lon_s, jds[i + 1], unwrapped[i + 1])]
+        for a, la, b, lb in pieces:
+            ca, cb = int(np.floor(la / width)), int(np.floor(lb / width))
+            if ca == cb:
+                continue
+            retro = lb < la
+            # Boundaries crossed, in time order
+            bounds = range(ca + 1, cb + 1) if not retro else range(ca, cb, -1)
+            lo = a
+            for m in bounds:
+                t = _solve_crossing(planet, (m * width) % 360.0, lo, b, use_tables)
+                entered = (m if not retro else m - 1) % count
+                previous = (m - 1 if not retro else m) % count
+                ingresses.append(Ingress(t, planet, division, entered, previous, retro))
+                lo = t
+    return ingresses
+
+
+@dataclass(frozen=True)
+class TransitPeriod:
+    planet: str
+    sign: int
+    house: int        # from the natal Moon
+    phase: str
+    start_jd: float
+    end_jd: float
+
+
+def _transit_phase(planet: str, house: int) -> str:
+    if planet == 'Saturn':
+        if house in SADE_SATI_HOUSES:
+            return f"sade_sati_{SADE_SATI_HOUSES[house]}"
+        if house in KANTAKA_SHANI_HOUSES:
+            return f"kantaka_shani_{KANTAKA_SHANI_HOUSES[house]}"
+    if planet == 'Jupiter':
+        return 'jupiter_favourable' if house in JUPITER_FAVOURABLE_HOUSES else 'jupiter_neutral'
+    return 'neutral'
+
+
+def transit_sign_periods(planet: str, natal_moon_long: float, start_jd: float, end_jd: float,
+                         use_tables: bool = True) -> List[TransitPeriod]:
+    """Contiguous spans of a planet's sign, classified by house from the natal Moon."""
+    first_sign = int(body_state(planet, start_jd, use_tables)[0] // 30)
+    periods = []
+    sign, since = first_sign, start_jd
+    for ing in find_ingresses(planet, start_jd, end_jd, 'sign', use_tables):
+        house = house_from_moon(natal_moon_long, sign * 30.0)
+        periods.append(TransitPeriod(planet, sign, house, _transit_phase(planet, house), since, ing.jd))
+        sign, since = ing.index, ing.jd
+    house = house_from_moon(natal_moon_long, sign * 30.0)
+    periods.append(TransitPeriod(planet, sign, house, _transit_phase(planet, house), since, end_jd))
+    return periods
+
+
+def sade_sati_timeline(natal_moon_long: float, start_jd: float, end_jd: float,
+                       use_tables: bool = True) -> Dict[str, List[Dict[str, Any]]]:
+    """Sade-Sati, Kantaka Shani and Jupiter-favourable windows relative to the natal Moon.
+
+    `sade_sati` merges consecutive 12th/1st/2nd periods (including retrograde
+    back-and-forth) into whole cycles; `saturn` and `jupiter` list every sign
+    period with its phase.
+    """
+    saturn = transit_sign_periods('Saturn', natal_moon_long, start_jd, end_jd, use_tables)
+    jupiter = transit_sign_periods('Jupiter', natal_moon_long, start_jd, end_jd, use_tables)
+
+    def as_dict(p: TransitPeriod) -> Dict[str, Any]:
+        return {
+            'planet': p.planet, 'sign': RASHIS[p.sign], 'house_from_moon': p.house, 'phase': p.phase,
+            'start': jd_to_utc_datetime(p.start_jd), 'end': jd_to_utc_datetime(p.end_jd),
+        }
+
+    cycles = []
+    for p in saturn:
+        if p.house not in SADE_SATI_HOUSES:
+            continue
+        if cycles and cycles[-1]['end_jd'] == p.start_jd:
+            cycles[-1]['end_jd'] = p.end_jd
+        else:
+            cycles.append({'start_jd': p.start_jd, 'end_jd': p.end_jd})
+
+    return {
+        'sade_sati': [
+            {'start': jd_to_utc_datetime(c['start_jd']), 'end': jd_to_utc_datetime(c['end_jd'])} for c in cycles
+        ],
+        'kantaka_shani': [as_dict(p) for p in saturn if p.house in KANTAKA_SHANI_HOUSES],
+        'jupiter_favourable': [as_dict(p) for p in jupiter if p.house in JUPITER_FAVOURABLE_HOUSES],
+        'saturn': [as_dict(p) for p in saturn],
+        'jupiter': [as_dict(p) for p in jupiter],
+    }
+
+# -------------------- MUHURTA SEARCH --------------------
+# Tithi, nakshatra and tarabala only change at Moon events, and the lagna only
+# at ascendant sign changes. Rather than evaluating every minute, the search
+# samples coarsely, root-finds each boundary (solve_angle_crossing) and scores
+# the constant segments in between, yielding windows as they are found.
+
+TITHI_SPAN = 12.0
+TITHI_SCAN_STEP = 0.5            # days; the elongation advances ~6° per step
+MUHURTA_MIN_MINUTES = 10.0
+
+TARAS = ['Janma', 'Sampat', 'Vipat', 'Kshema', 'Pratyari', 'Sadhana', 'Naidhana', 'Mitra', 'Parama Mitra']
+BAD_TARAS = {2, 4, 6}
+MUHURTA_MALEFICS = ['Mars', 'Saturn', 'Rahu', 'Ketu']
+MALEFIC_BAD_HOUSES = {1, 7, 8}
+
+# Tithi numbers within a paksha are 0-based (0 = Prathama ... 14 = Purnima / Amavasya)
+MUHURTA_EVENTS = {
+    'marriage': {
+        'nakshatras': {3, 4, 9, 11, 12, 14, 16, 18, 20, 25, 26},
+        'tithis': {1, 2, 4, 6, 9, 10, 12},
+        'lagnas': {1, 2, 5, 6, 8, 11},
+    },
+    'griha_pravesham': {
+        'nakshatras': {3, 4, 11, 13, 16, 20, 22, 23, 25, 26},
+        'tithis': {1, 2, 4, 6, 9, 10, 12},
+        'lagnas': {1, 4, 7, 10},  # fixed signs
+    },
+}
+
+
+@dataclass(frozen=True)
+class MuhurtaWindow:
+    event: str
+    start_jd: float
+    end_jd: float
+    tithi: int                 # 0..29 (Shukla Prathama .. Amavasya)
+    nakshatra: int
+    lagna: int
+    tara: Optional[int]
+    afflictions: Tuple[str, ...]
+    score: float
+
+    @property
+    def start(self) -> datetime.datetime:
+        return jd_to_utc_datetime(self.start_jd)
+
+    @property
+    def end(self) -> datetime.datetime:
+        return jd_to_utc_datetime(self.end_jd)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'event': self.event,
+            'start': self.start + IST_OFFSET,
+            'end': self.end + IST_OFFSET,
+            'tithi': f"{'Shukla' if self.tithi < 15 else 'Krishna'} {self.tithi % 15 + 1}",
+            'nakshatra': NAKSHATRAS[self.nakshatra],
+            'lagna': RASHIS[self.lagna],
+            'tarabala': TARAS[self.tara] if self.tara is not None else None,
+            'afflictions': list(self.afflictions),
+            'score': self.score,
+        }
+
+
+def elongation_state(jd: float) -> Tuple[float, float]:
+    """Moon − Sun longitude (the tithi angle) and its rate."""
+    moon, moon_speed = body_state('Moon', jd)
+    sun, sun_speed = body_state('Sun', jd)
+    return (moon - sun) % 360.0, moon_speed - sun_speed
+
+
+def angle_boundaries(sampled: Callable[[np.ndarray], np.ndarray], state: Callable[[float], Tuple[float, float]],
+                     start_jd: float, end_jd: float, step: float, width: float) -> List[float]:
+    """Times in (start, end) where a monotonically increasing angle crosses a multiple of `width`."""
+    n = max(2, int(np.ceil((end_jd - start_jd) / step)) + 1)
+    jds = np.linspace(start_jd, end_jd, n)
+    unwrapped = np.degrees(np.unwrap(np.radians(sampled(jds))))
+    cells = np.floor(unwrapped / width).astype(int)
+    times = []
+    for i in np.nonzero(cells[1:] != cells[:-1])[0].tolist():
+        lo = jds[i]
+        for m in range(cells[i] + 1, cells[i + 1] + 1):
+            lo = solve_angle_crossing(state, (m * width) % 360.0, lo, jds[i + 1])
+            times.append(lo)
+    return times
+
+
+def moon_boundaries(start_jd: float, end_jd: float) -> List[float]:
+    """Sorted times where the tithi or the Moon's nakshatra changes."""
+    tithis = angle_boundaries(
+        lambda jds: np.mod(body_longitudes('Moon', jds)[0] - body_longitudes('Sun', jds)[0], 360.0),
+        elongation_state, start_jd, end_jd, TITHI_SCAN_STEP, TITHI_SPAN,
+    )
+    naks = [i.jd for i in find_ingresses('Moon', start_jd, end_jd, 'nakshatra')]
+    return sorted(tithis + naks)
+
+
+def _segments(start_jd: float, end_jd: float, cuts: Sequence[float]):
+    bounds = [start_jd, *cuts, end_jd]
+    return zip(bounds, bounds[1:])
+
+
+def _muhurta_score(tithi: int, tara: Optional[int], afflictions: Sequence[str]) -> float:
+    score = 7.0                        # favourable nakshatra + tithi + lagna
+    score += 1.0 if tithi < 15 else 0  # Shukla paksha
+    score += 2.0 if tara is not None and tara not in BAD_TARAS and tara != 0 else 0
+    return score - 2.0 * len(afflictions)
+
+
+def muhurta_windows(event: str, start_jd: float, end_jd: float, lat: float, lon: float,
+                    natal_moon: Optional[float] = None, min_minutes: float = MUHURTA_MIN_MINUTES):
+    """Yield auspicious MuhurtaWindows for `event` in time order as they are found.
+
+    Moon segments with a favourable tithi, nakshatra and (given `natal_moon`) tarabala
+    are split at ascendant sign changes; segments rising in a favourable lagna become
+    windows, penalised for malefics in the 1st/7th/8th from that lagna.
+    """
+    rules = MUHURTA_EVENTS[event]
+    natal_nak = int(natal_moon // NAK_SEG) if natal_moon is not None else None
+
+    for a, b in _segments(start_jd, end_jd, moon_boundaries(start_jd, end_jd)):
+        mid = 0.5 * (a + b)
+        nak = int(body_state('Moon', mid)[0] // NAK_SEG)
+        tithi = int(elongation_state(mid)[0] // TITHI_SPAN)
+        if nak not in rules['nakshatras'] or tithi % 15 not in rules['tithis']:
+            continue
+        tara = (nak - natal_nak) % 27 % 9 if natal_nak is not None else None
+        if tara in BAD_TARAS:
+            continue
+
+        asc_cuts = [jd for jd, _sign in ascendant_transitions(a, b, lat, lon)]
+        for la, lb in _segments(a, b, asc_cuts):
+            if (lb - la) * 1440.0 < min_minutes:
+                continue
+            mid = 0.5 * (la + lb)
+            asc = ascendant_longitude(mid, lat, lon)
+            lagna = int(asc // 30)
+            if lagna not in rules['lagnas']:
+                continue
+            afflictions = []
+            for planet in MUHURTA_MALEFICS:
+                house = int(((body_state(planet, mid)[0] - asc) % 360) // 30) + 1
+                if house in MALEFIC_BAD_HOUSES:
+                    afflictions.append(f"{planet} in house {house}")
+            yield MuhurtaWindow(event, la, lb, tithi, nak, lagna, tara, tuple(afflictions),
+                                _muhurta_score(tithi, tara, afflictions))
+
+
+def best_muhurtas(windows, k: int = 10) -> List[MuhurtaWindow]:
+    """Top-k windows by score (then earliest), consuming a `muhurta_windows` stream."""
+    return heapq.nsmallest(k, windows, key=lambda w: (-w.score, w.start_jd))
+
+# -------------------- ASCENDANT TRANSITIONS --------------------
+# The sidereal ascendant enters a new sign roughly every two hours and a new
+# navamsa every ~13 minutes. Transition times are root-found on the ascendant
+# from a coarse sample, so a day's lagna table costs a few hundred house
+# evaluations in total rather than one per minute.
+
+ASC_SCAN_STEP = 10.0 / 1440.0    # days; the ascendant is monotonic, so any step < half a day works
+NAVAMSA_SPAN = 30.0 / 9.0
+
+
+@dataclass(frozen=True)
+class LagnaSpan:
+    start_jd: float
+    end_jd: float
+    sign: int
+    navamsa: int               # navamsa sign (D9)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'start': jd_to_utc_datetime(self.start_jd) + IST_OFFSET,
+            'end': jd_to_utc_datetime(self.end_jd) + IST_OFFSET,
+            'lagna': RASHIS[self.sign],
+            'navamsa': RASHIS[self.navamsa],
+        }
+
+
+def ascendant_longitude(jd: float, lat: float, lon: float) -> float:
+    return (swe.houses(jd, lat, lon)[0][0] - swe.get_ayanamsa(jd)) % 360.0
+
+
+def ascendant_state(jd: float, lat: float, lon: float, h: float = 1e-4) -> Tuple[float, float]:
+    """Sidereal ascendant and its rate (central difference; the ascendant has no analytic speed here)."""
+    return ascendant_longitude(jd, lat, lon), angle_signed(ascendant_longitude(jd + h, lat, lon),
+                                                           ascendant_longitude(jd - h, lat, lon)) / (2 * h)
+
+
+def ascendant_transitions(start_jd: float, end_jd: float, lat: float, lon: float,
+                          division: str = 'sign') -> List[Tuple[float, int]]:
+    """(jd, index entered) for every time in (start, end) the ascendant enters a new sign or navamsa.
+
+    Indices are signs (0..11) for `division='sign'` and navamsa signs (0..11) for 'navamsa'.
+    """
+    width = {'sign': 30.0, 'navamsa': NAVAMSA_SPAN}[division]
+    times = angle_boundaries(lambda jds: bulk_ascendants(jds, lat, lon),
+                             lambda t: ascendant_state(t, lat, lon), start_jd, end_jd, ASC_SCAN_STEP, width)
+    # At a root the ascendant sits on the boundary it just crossed
+    return [(float(jd), int(round(ascendant_longitude(jd, lat, lon) / width)) % 12) for jd in times]
+
+
+def lagna_table(start_jd: float, end_jd: float, lat: float, lon: float) -> List[LagnaSpan]:
+    """Consecutive spans of constant lagna sign and navamsa covering [start, end]."""
+    cuts = [jd for jd, _navamsa in ascendant_transitions(start_jd, end_jd, lat, lon, 'navamsa')]
+    spans = []
+    for a, b in _segments(start_jd, end_jd, cuts):
+        asc = ascendant_longitude(0.5 * (a + b), lat, lon)
+        spans.append(LagnaSpan(a, b, int(asc // 30), int(asc // NAVAMSA_SPAN) % 12))
+    return spans
+
+# -------------------- BIRTH-TIME UNCERTAINTY --------------------
+# Every chart factor is piecewise constant in the birth time. Lagna and navamsa
+# lagna, each body's house (the ascendant moving a multiple of 30° past it),
+# sign changes and Moon pada changes are root-found directly. Rule results also
+# depend on conjunction orbs, so they are sampled every UNCERTAINTY_RULE_STEP
+# inside those pieces and bisected wherever the matched-rule mask flips.
+
+UNCERTAINTY_RULE_STEP = 5.0 / 1440.0  # days; orbs between bodies close far slower than this
+BIRTH_TIME_FACTORS = ('lagna', 'navamsa', 'moon_nakshatra', 'moon_pada', 'houses', 'rules')
+
+
+@dataclass(frozen=True)
+class BirthTimeSegment:
+    start_jd: float
+    end_jd: float
+    lagna: int
+    navamsa: int               # navamsa lagna sign
+    moon_nakshatra: int
+    moon_pada: int
+    houses: Tuple[int, ...]    # BATCH_BODIES order
+    rules: int                 # matched-rule bitmask, see RULE_BITS
+    changed: Tuple[str, ...]   # BIRTH_TIME_FACTORS that differ from the previous segment
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'start': jd_to_utc_datetime(self.start_jd) + IST_OFFSET,
+            'end': jd_to_utc_datetime(self.end_jd) + IST_OFFSET,
+            'lagna': RASHIS[self.lagna],
+            'navamsa_lagna': RASHIS[self.navamsa],
+            'moon_nakshatra': NAKSHATRAS[self.moon_nakshatra],
+            'moon_pada': self.moon_pada,
+            'houses': dict(zip(BATCH_BODIES, self.houses)),
+            'yogas': rule_ids(self.rules & YOGA_MASK),
+            'doshas': rule_ids(self.rules & DOSHA_MASK),
+            'changed': list(self.changed),
+        }
+
+
+def _house_offset_state(jd: float, body: str, lat: float, lon: float) -> Tuple[float, float]:
+    asc, asc_rate = ascendant_state(jd, lat, lon)
+    body_lon, speed = body_state(body, jd)
+    return (asc - body_lon) % 360.0, asc_rate - speed
 
-    # Planets
-    pos = get_planet_positions(date_str, time_str, lat, lon)
-    pos_spd = get_planet_positions_with_speed(jd)
+
+def house_transitions(start_jd: float, end_jd: float, lat: float, lon: float) -> List[float]:
+    """Times in (start, end) at which any body changes house (houses are 30° from the ascendant degree)."""
+    times = []
+    for body in BATCH_BODIES:
+        if body == 'Ketu':
+            continue  # always opposite Rahu, so it changes house at the same moments
+        times += angle_boundaries(
+            lambda jds, body=body: np.mod(bulk_ascendants(jds, lat, lon) - body_longitudes(body, jds)[0], 360.0),
+            lambda t, body=body: _house_offset_state(t, body, lat, lon),
+            start_jd, end_jd, ASC_SCAN_STEP, 30.0,
+        )
+    return times
+
+
+def _rule_masks(jds: ArrayLike, lat: float, lon: float) -> np.ndarray:
+    batch = get_planet_positions_batch(jds, lat, lon)
+    return evaluate_rules_batch(batch.longitudes.T, batch.asc)
+
+
+def _bisect_rule_flip(a: float, b: float, mask_a: int, lat: float, lon: float) -> float:
+    while b - a > INGRESS_TOLERANCE:
+        mid = 0.5 * (a + b)
+        if int(_rule_masks([mid], lat, lon)[0]) == mask_a:
+            a = mid
+        else:
+            b = mid
+    return 0.5 * (a + b)
+
+
+def _merge_close(times: Sequence[float], tolerance: float = 2 * INGRESS_TOLERANCE) -> List[float]:
+    merged = []
+    for t in sorted(times):
+        if not merged or t - merged[-1] > tolerance:
+            merged.append(t)
+    return merged
+
+
+def birth_time_segments(jd: float, minutes: float, lat: float, lon: float) -> List[BirthTimeSegment]:
+    """Sub-intervals of `jd ± minutes` over which lagna, navamsa lagna, Moon nakshatra/pada,
+    house placements and matched yoga/dosha rules all stay constant, in time order."""
+    start, end = jd - minutes / 1440.0, jd + minutes / 1440.0
+    cuts = [t for t, _navamsa in ascendant_transitions(start, end, lat, lon, 'navamsa')]
+    cuts += house_transitions(start, end, lat, lon)
+    cuts += [i.jd for i in find_ingresses('Moon', start, end, 'pada')]
+    cuts += [i.jd for body in BATCH_BODIES if body not in ('Moon', 'Ketu')
+             for i in find_ingresses(body, start, end, 'sign')]
+    pieces = list(_segments(start, end, _merge_close(cuts)))
+
+    # Sample rule masks inside every piece in one batch, then bisect each flip
+    counts = [max(2, int(np.ceil((b - a) / UNCERTAINTY_RULE_STEP)) + 1) for a, b in pieces]
+    samples = np.concatenate([np.linspace(a, b, n)[1:-1] if n > 2 else [0.5 * (a + b)]
+                              for (a, b), n in zip(pieces, counts)])
+    masks = _rule_masks(samples, lat, lon).tolist()
+    samples = samples.tolist()
+    flips = [_bisect_rule_flip(samples[i], samples[i + 1], masks[i], lat, lon)
+             for i in range(len(samples) - 1) if masks[i] != masks[i + 1]]
+    bounds = [start, *_merge_close(cuts + flips), end]
+
+    mids = np.array([0.5 * (a + b) for a, b in zip(bounds, bounds[1:])])
+    batch = get_planet_positions_batch(mids, lat, lon)
+    houses = ((batch.longitudes - batch.asc) % 360.0 // 30.0).astype(int) + 1
+    rules = evaluate_rules_batch(batch.longitudes.T, batch.asc)
+    moon = BODY_INDEX['Moon']
+
+    segments: List[BirthTimeSegment] = []
+    for i, (a, b) in enumerate(zip(bounds, bounds[1:])):
+        asc = float(batch.asc[i])
+        factors = (int(asc // 30), int(asc // NAVAMSA_SPAN) % 12, int(batch.nakshatras[moon, i]),
+                   int(batch.padas[moon, i]), tuple(houses[:, i].tolist()), int(rules[i]))
+        if segments:
+            previous = segments[-1]
+            changed = tuple(name for name, old, new in zip(BIRTH_TIME_FACTORS, _segment_factors(previous), factors)
+                            if old != new)
+            if not changed:
+                # e.g. a sign change that moved no house and no rule
+                segments[-1] = BirthTimeSegment(previous.start_jd, b, *factors, previous.changed)
+                continue
+        else:
+            changed = ()
+        segments.append(BirthTimeSegment(a, b, *factors, changed))
+    return segments
+
+
+def _segment_factors(segment: BirthTimeSegment) -> Tuple[Any, ...]:
+    return tuple(getattr(segment, name) for name in BIRTH_TIME_FACTORS)
+
+# -------------------- PANCHANG --------------------
+# A panchang day runs from one local sunrise to the next. Each limb (tithi,
+# nakshatra, yoga, karana) is read at sunrise and its ending times come from the
+# same boundary root-finding as the muhurta search, so a whole year needs one
+# batch of sunrises plus one boundary pass per limb instead of a scan per day.
+
+PANCHANG_ALGORITHM_VERSION = 1
+
+TITHI_NAMES = ['Prathama', 'Dwitiya', 'Tritiya', 'Chaturthi', 'Panchami', 'Shashthi', 'Saptami', 'Ashtami',
+               'Navami', 'Dashami', 'Ekadashi', 'Dwadashi', 'Trayodashi', 'Chaturdashi']
+YOGA_NAMES = [
+    'Vishkambha', 'Priti', 'Ayushman', 'Saubhagya', 'Shobhana', 'Atiganda', 'Sukarma', 'Dhriti', 'Shula',
+    'Ganda', 'Vriddhi', 'Dhruva', 'Vyaghata', 'Harshana', 'Vajra', 'Siddhi', 'Vyatipata', 'Variyana',
+    'Parigha', 'Shiva', 'Siddha', 'Sadhya', 'Shubha', 'Shukla', 'Brahma', 'Indra', 'Vaidhriti'
+]
+MOVABLE_KARANAS = ['Bava', 'Balava', 'Kaulava', 'Taitila', 'Garaja', 'Vanija', 'Vishti']
+VARAS = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
+VARA_LORDS = ['Sun', 'Moon', 'Mars', 'Mercury', 'Jupiter', 'Venus', 'Saturn']
+HORA_ORDER = ['Sun', 'Venus', 'Mercury', 'Moon', 'Saturn', 'Jupiter', 'Mars']  # each hora's lord follows the previous
+
+# 1-based eighth of the daytime, by vara (Sunday first)
+RAHU_KALAM_PART = [8, 2, 7, 5, 6, 4, 3]
+GULIKA_PART = [7, 6, 5, 4, 3, 2, 1]
+YAMAGANDA_PART = [5, 4, 3, 2, 1, 7, 6]
+
+KARANA_SPAN = TITHI_SPAN / 2.0
+YOGA_SPAN = NAK_SEG
+
+
+def tithi_name(index: int) -> str:
+    """0..29 -> 'Shukla Dwitiya', 'Purnima', 'Amavasya', ..."""
+    paksha = 'Shukla' if index < 15 else 'Krishna'
+    if index % 15 == 14:
+        return 'Purnima' if index < 15 else 'Amavasya'
+    return f"{paksha} {TITHI_NAMES[index % 15]}"
+
+
+def karana_name(index: int) -> str:
+    """0..59 (half-tithis from Shukla Prathama)."""
+    if index == 0:
+        return 'Kimstughna'
+    if index >= 57:
+        return ('Shakuni', 'Chatushpada', 'Naga')[index - 57]
+    return MOVABLE_KARANAS[(index - 1) % 7]
+
+
+def yoga_state(jd: float) -> Tuple[float, float]:
+    """Sun + Moon longitude (the yoga angle) and its rate."""
+    moon, moon_speed = body_state('Moon', jd)
+    sun, sun_speed = body_state('Sun', jd)
+    return (moon + sun) % 360.0, moon_speed + sun_speed
+
+
+def sun_events(start_jd: float, days: int, lat: float, lon: float, event: int) -> np.ndarray:
+    """The first sunrise/sunset (`swe.CALC_RISE`/`swe.CALC_SET`) after each of `days` consecutive start moments."""
+    rise_trans, geopos = swe.rise_trans, (lon, lat, 0.0)
+    return np.fromiter((rise_trans(start_jd + d, swe.SUN, event, geopos)[1][0] for d in range(days)),
+                       dtype=np.float64, count=days)
+
+
+def _limb_spans(first: np.ndarray, boundaries: np.ndarray, count: int, starts: np.ndarray,
+                ends: np.ndarray) -> List[List[Tuple[int, float]]]:
+    """Per day, (index, end jd) for each limb value current between `starts[d]` and `ends[d]`."""
+    days = []
+    for d, (a, b) in enumerate(zip(starts.tolist(), ends.tolist())):
+        lo = int(np.searchsorted(boundaries, a, side='right'))
+        hi = int(np.searchsorted(boundaries, b, side='left'))
+        days.append([((int(first[d]) + k) % count, float(boundaries[lo + k])) for k in range(hi - lo + 1)])
+    return days
+
+
+def _day_part(sunrise: float, sunset: float, part: int) -> Tuple[float, float]:
+    eighth = (sunset - sunrise) / 8.0
+    return sunrise + (part - 1) * eighth, sunrise + part * eighth
+
+
+def _horas(weekday: int, sunrise: float, sunset: float, next_sunrise: float) -> List[Tuple[str, float]]:
+    first = HORA_ORDER.index(VARA_LORDS[weekday])
+    day, night = (sunset - sunrise) / 12.0, (next_sunrise - sunset) / 12.0
+    starts = [sunrise + i * day for i in range(12)] + [sunset + i * night for i in range(12)]
+    return [(HORA_ORDER[(first + i) % 7], jd) for i, jd in enumerate(starts)]
+
+
+def generate_panchang(start_date: datetime.date, days: int, lat: float, lon: float) -> List[Dict[str, Any]]:
+    """Panchang for `days` consecutive (IST) dates at a location, in one batched run.
+
+    Times are ISO strings in IST, limbs are lists of {name, index, end} for every
+    value current between this sunrise and the next (usually one, two when a
+    limb ends during the day). Polar days without a sunrise are not supported.
+    """
+    midnight = local_to_jd(datetime.datetime.combine(start_date, datetime.time()))
+    sunrises = sun_events(midnight, days + 1, lat, lon, swe.CALC_RISE)
+    sunsets = sun_events(midnight, days, lat, lon, swe.CALC_SET)
+    start, end = float(sunrises[0]), float(sunrises[-1])
+    # Pad so every limb current at the last sunrise also gets its ending time
+    horizon = end + 2.0
+
+    sun, _ = body_longitudes('Sun', sunrises[:-1])
+    moon, _ = body_longitudes('Moon', sunrises[:-1])
+    elongation = np.mod(moon - sun, 360.0)
+    karana_cuts = np.array(angle_boundaries(
+        lambda jds: np.mod(body_longitudes('Moon', jds)[0] - body_longitudes('Sun', jds)[0], 360.0),
+        elongation_state, start, horizon, TITHI_SCAN_STEP, KARANA_SPAN,
+    ))
+    # Every other karana boundary is a tithi boundary
+    at_cut = np.array([elongation_state(jd)[0] for jd in karana_cuts.tolist()])
+    tithi_cuts = karana_cuts[np.rint(at_cut / KARANA_SPAN).astype(int) % 2 == 0]
+    nak_cuts = np.array([i.jd for i in find_ingresses('Moon', start, horizon, 'nakshatra')])
+    yoga_cuts = np.array(angle_boundaries(
+        lambda jds: np.mod(body_longitudes('Moon', jds)[0] + body_longitudes('Sun', jds)[0], 360.0),
+        yoga_state, start, horizon, TITHI_SCAN_STEP, YOGA_SPAN,
+    ))
+
+    limbs = {
+        'tithi': (_limb_spans(elongation // TITHI_SPAN, tithi_cuts, 30, sunrises[:-1], sunrises[1:]), tithi_name),
+        'nakshatra': (_limb_spans(moon // NAK_SEG, nak_cuts, 27, sunrises[:-1], sunrises[1:]),
+                      NAKSHATRAS.__getitem__),
+        'yoga': (_limb_spans(np.mod(moon + sun, 360.0) // YOGA_SPAN, yoga_cuts, 27, sunrises[:-1], sunrises[1:]),
+                 YOGA_NAMES.__getitem__),
+        'karana': (_limb_spans(elongation // KARANA_SPAN, karana_cuts, 60, sunrises[:-1], sunrises[1:]),
+                   karana_name),
+    }
+
+    def ist(jd: float) -> str:
+        return (jd_to_utc_datetime(jd) + IST_OFFSET).replace(tzinfo=None).isoformat(timespec='minutes')
+
+    result = []
+    for d in range(days):
+        date = start_date + datetime.timedelta(days=d)
+        weekday = (date.weekday() + 1) % 7  # Python: Monday == 0
+        sunrise, sunset, next_sunrise = float(sunrises[d]), float(sunsets[d]), float(sunrises[d + 1])
+        day = {
+            'date': date.isoformat(),
+            'vara': VARAS[weekday],
+            'vara_lord': VARA_LORDS[weekday],
+            'sunrise': ist(sunrise),
+            'sunset': ist(sunset),
+        }
+        for limb, (spans, name) in limbs.items():
+            day[limb] = [{'name': name(index), 'index': index, 'end': ist(jd)} for index, jd in spans[d]]
+        for period, parts in (('rahu_kalam', RAHU_KALAM_PART), ('gulika', GULIKA_PART),
+                              ('yamagandam', YAMAGANDA_PART)):
+            a, b = _day_part(sunrise, sunset, parts[weekday])
+            day[period] = {'start': ist(a), 'end': ist(b)}
+        day['hora'] = [{'lord': lord, 'start': ist(jd)} for lord, jd in _horas(weekday, sunrise, sunset, next_sunrise)]
+        result.append(day)
+    return result
+
+# -------------------- ORCHESTRATOR --------------------
+
+def generate_professional_birth_chart(date_str: str, time_str: str, lat: float, lon: float,
+                                      ctx: ChartContext = None) -> Dict[str, Any]:
+    # Single ephemeris pass: JD, every body and the ascendant
+    ctx = ctx or ChartContext.from_local(date_str, time_str, lat, lon)
+    dt, jd = ctx.local_dt, ctx.jd
+    pos = ctx.positions
 
     # Lagna
-    asc_deg, asc_sign = calculate_lagna(jd, lat, lon)
+    asc_deg, asc_sign = ctx.asc_deg, ctx.asc_sign
 
     # Core chart
-    signs = {p: get_sign_name(d) for p, d in pos.items()}
-    houses = get_house_placements(pos, asc_deg)
+    chart = Chart.from_context(ctx)
+    signs = chart.sign_names()
+    houses = chart.house_numbers()
 
     # Strengths
-    exalt = {p: get_exaltation_status(p, pos[p]) for p in pos}
-    combust = {p: is_combust(p, pos[p], pos['Sun']) for p in pos}
-    retro = {p: (pos_spd.get(p, (0,0))[1] < 0) for p in pos}
-    shadbala = calculate_shadbala(pos)
-    avastha = {p: get_baladi_avastha(p, pos[p]) for p in pos}
-
-    # Vargas
-    d3 = calculate_drekkana_chart(pos)
-    d4 = calculate_chaturthamsa_chart(pos)
-    d9 = calculate_navamsa_chart(pos)
-    d10 = calculate_dasamsa_chart(pos)
+    with stage("strengths"):
+        exalt = {p: get_exaltation_status(p, pos[p]) for p in pos}
+        combust = {p: is_combust(p, pos[p], pos['Sun']) for p in pos}
+        retro = {p: is_retrograde(jd, p, ctx) for p in pos}
+        shadbala = calculate_shadbala(pos)
+        avastha = {p: get_baladi_avastha(p, pos[p]) for p in pos}
+
+    # Vargas: full Shodashavarga in one pass
+    with stage("vargas"):
+        vargas = {d: {p: RASHIS[i] for p, i in chart.items()} for d, chart in calculate_vargas(pos).items()}
 
     # Nakshatra details
     moon_nak = get_nakshatra(pos['Moon'])
@@ -811,31 +2585,24 @@ def generate_professional_birth_chart(date_str: str, time_str: str, lat: float,
     planet_naks = map_planets_to_nakshatras(pos)
 
     # Dasha
-    mahadashas = calculate_vimshottari_dasha(jd, pos['Moon'])
-    now = dt  # birth moment; caller can pass another date for current
-    current_dasha = get_current_dasha(mahadashas, now)
+    with stage("dasha"):
+        dasha_timeline = DashaTimeline(jd, ctx.bodies['Moon'].longitude)
+        mahadashas = dasha_timeline.mahadashas()
+        now = dt  # birth moment; caller can pass another date for current
+        current_dasha = get_current_dasha(dasha_timeline, now)
 
     # Ashtakavarga (simplified)
-    av_scores = calculate_ashtakavarga(pos, asc_deg)
-    sav_total = calculate_sarvashtakavarga(av_scores)
+    with stage("ashtakavarga"):
+        av_scores = calculate_ashtakavarga(pos, asc_deg)
+        sav_total = calculate_sarvashtakavarga(av_scores)
 
     # Aspects
-    graha_aspects = calculate_aspects(pos, asc_deg)
+    with stage("aspects"):
+        graha_aspects = calculate_aspects(pos, asc_deg)
 
     # Yogas + Doshas
-    chart = {
-        **pos,
-        'Lagna': asc_deg,
-        'Signs': signs,
-        'Houses': houses
-    }
-    yogas = detect_yogas(chart)
-    doshas = [
-        detect_manglik_dosha(chart),
-        detect_kaal_sarp_dosha(chart),
-        detect_pitra_dosha(chart)
-    ]
-    doshas = [d for d in doshas if d]
+    with stage("yogas"):
+        yogas, doshas, _matched = chart.evaluate()
 
     # Transits snapshot = same moment (caller can compute for today separately)
     saturn_assess = analyze_saturn_transit(pos['Moon'], pos['Saturn'])
@@ -855,12 +2622,7 @@ def generate_professional_birth_chart(date_str: str, time_str: str, lat: float,
             'shadbala_simplified': shadbala,
             'baladi_avastha': avastha,
         },
-        'vargas': {
-            'D3': d3,
-            'D4': d4,
-            'D9': d9,
-            'D10': d10,
-        },
+        'vargas': vargas,
         'nakshatra': {
             'moon': {'nakshatra': moon_nak, 'pada': moon_pada, 'lord': moon_nak_lord},
             'planet_mapping': planet_naks,
@@ -0,0 +1,172 @@
+# src grahastra/backend/core/benchmarks.py
+"""
+Benchmarks for core.astrology_utils over a fixed corpus of births.
+
+Every case runs over the whole corpus, repeated until a round lasts at least
+MIN_ROUND_SECONDS; throughput is taken from the fastest round (the least
+disturbed by other load, as `timeit` recommends), and allocation is the mean tracemalloc peak of a single call (run in a
+separate pass so tracing does not slow the timed rounds). Results are compared
+with a stored baseline (BASELINE_PATH) to flag regressions; refresh it with
+`manage.py benchmark --save-baseline` after an intended change, on the machine
+the baseline is tracked for.
+"""
+
+import datetime
+import json
+import os
+import platform
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import astrology_utils as astro
+
+CORPUS_SEED = 1729
+CORPUS_SIZE = 200
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks', 'baseline.json')
+DEFAULT_TOLERANCE = 0.20
+MIN_ROUND_SECONDS = 0.1
+# Absolute allocation slack, so near-zero baselines do not flag a few stray objects
+ALLOCATION_SLACK_BYTES = 256
+
+
+@dataclass(frozen=True)
+class Birth:
+    date_str: str
+    time_str: str
+    lat: float
+    lon: float
+
+
+@dataclass
+class Prepared:
+    """Inputs each case needs, derived once per birth outside the timed loop."""
+    birth: Birth
+    jd: float
+    local_dt: datetime.datetime
+    moon: float
+    positions: Dict[str, float]
+    chart: Dict[str, Any]
+    timeline: astro.DashaTimeline
+
+
+@dataclass
+class Result:
+    name: str
+    ops_per_sec: float
+    peak_bytes_per_op: float
+
+
+def birth_corpus(size: int = CORPUS_SIZE, seed: int = CORPUS_SEED) -> List[Birth]:
+    """Deterministic births spread over 1900-2099 and the Indian subcontinent."""
+    rng = random.Random(seed)
+    births = []
+    for _ in range(size):
+        day = datetime.date(1900, 1, 1) + datetime.timedelta(days=rng.randrange(200 * 365))
+        births.append(Birth(day.isoformat(), f"{rng.randrange(24):02d}:{rng.randrange(60):02d}",
+                            round(rng.uniform(8.0, 32.0), 4), round(rng.uniform(68.0, 92.0), 4)))
+    return births
+
+
+def prepare(birth: Birth) -> Prepared:
+    ctx = astro.ChartContext.from_local(birth.date_str, birth.time_str, birth.lat, birth.lon)
+    moon = ctx.bodies['Moon'].longitude
+    chart = astro.Chart.from_context(ctx).to_dict()
+    return Prepared(birth, ctx.jd, ctx.local_dt, moon, ctx.positions, chart, astro.DashaTimeline(ctx.jd, moon))
+
+
+def _vargas(fn: Callable[[Dict[str, float]], Any]) -> Callable[[Prepared], Any]:
+    return lambda p: fn(p.positions)
+
+
+CASES: Dict[str, Callable[[Prepared], Any]] = {
+    'get_planet_positions': lambda p: astro.get_planet_positions(p.birth.date_str, p.birth.time_str,
+                                                                 p.birth.lat, p.birth.lon),
+    'calculate_lagna': lambda p: astro.calculate_lagna(p.jd, p.birth.lat, p.birth.lon),
+    'detect_yogas': lambda p: astro.detect_yogas(p.chart),
+    'calculate_navamsa_chart': _vargas(astro.calculate_navamsa_chart),
+    'calculate_drekkana_chart': _vargas(astro.calculate_drekkana_chart),
+    'calculate_chaturthamsa_chart': _vargas(astro.calculate_chaturthamsa_chart),
+    'calculate_dasamsa_chart': _vargas(astro.calculate_dasamsa_chart),
+    'calculate_vargas': _vargas(astro.calculate_vargas),
+    'calculate_vimshottari_dasha': lambda p: astro.calculate_vimshottari_dasha(p.jd, p.moon),
+    'get_current_dasha': lambda p: astro.get_current_dasha(p.timeline, p.local_dt),
+    'generate_professional_birth_chart': lambda p: astro.generate_professional_birth_chart(
+        p.birth.date_str, p.birth.time_str, p.birth.lat, p.birth.lon),
+}
+
+
+def run_case(fn: Callable[[Prepared], Any], corpus: List[Prepared], rounds: int = 5) -> Tuple[float, float]:
+    """(ops/sec of the fastest round, mean peak bytes allocated by one call)."""
+    start = time.perf_counter()
+    for p in corpus:
+        fn(p)  # also warms caches (Chebyshev tables, ephemeris files)
+    passes = max(1, int(MIN_ROUND_SECONDS / max(time.perf_counter() - start, 1e-9)) + 1)
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(passes):
+            for p in corpus:
+                fn(p)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        peaks = 0
+        for p in corpus:
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            fn(p)
+            peaks += tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+    return passes * len(corpus) / min(times), peaks / len(corpus)
+
+
+def run_benchmarks(names: Optional[List[str]] = None, size: int = CORPUS_SIZE, rounds: int = 5) -> List[Result]:
+    corpus = [prepare(b) for b in birth_corpus(size)]
+    return [Result(name, *run_case(CASES[name], corpus, rounds)) for name in (names or CASES)]
+
+
+def load_baseline(path: str = BASELINE_PATH) -> Dict[str, Dict[str, float]]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def save_baseline(results: List[Result], size: int, path: str = BASELINE_PATH) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data = {
+        'meta': {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'processor': platform.processor() or platform.machine(),
+            'corpus': {'seed': CORPUS_SEED, 'size': size},
+            'created': datetime.date.today().isoformat(),
+        },
+        'results': {r.name: {k: round(v, 1) for k, v in asdict(r).items() if k != 'name'} for r in results},
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.write('\n')
+
+
+def regressions(results: List[Result], baseline: Dict[str, Dict[str, float]],
+                tolerance: float = DEFAULT_TOLERANCE) -> Dict[str, List[str]]:
+    """Per case, the metrics worse than baseline by more than `tolerance` (fraction)."""
+    flagged = {}
+    for r in results:
+        base = baseline.get(r.name)
+        if not base:
+            continue
+        worse = []
+        if r.ops_per_sec < base['ops_per_sec'] * (1.0 - tolerance):
+            worse.append('ops_per_sec')
+        if r.peak_bytes_per_op > base['peak_bytes_per_op'] * (1.0 + tolerance) + ALLOCATION_SLACK_BYTES:
+            worse.append('peak_bytes_per_op')
+        if worse:
+            flagged[r.name] = worse
+    return flagged
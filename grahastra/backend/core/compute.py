@@ -0,0 +1,209 @@
+# src grahastra/backend/core/compute.py
+"""
+Process pool for CPU-bound chart work.
+
+Swiss Ephemeris calls and the Python around them hold the GIL, so a heavy
+report computed inline stalls every other request on the same web worker.
+Registered tasks (see TASKS) are dispatched to a per-process pool of warm
+workers instead: each worker loads the ephemeris and Chebyshev tables once.
+
+The pool is bounded: at most MAX_PENDING jobs may be queued or running, and a
+submit that cannot get a slot within QUEUE_WAIT seconds raises ComputeBusy
+(HTTP 503). Waiting longer than TIMEOUT for a result raises ComputeTimeout
+(HTTP 504); the job is cancelled if it has not started yet. With WORKERS = 0
+jobs run inline in the caller, which is what tests and management commands
+on a dev box want. Configure through the `COMPUTE_POOL` setting.
+"""
+
+import datetime
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+
+from django.conf import settings
+from rest_framework.exceptions import APIException
+
+from . import astrology_utils as astro
+from . import timing
+
+DEFAULTS = {
+    'WORKERS': 0,
+    'MAX_PENDING': 32,
+    'TIMEOUT': 30.0,
+    'QUEUE_WAIT': 1.0,
+    # 'spawn' keeps children clear of locks held by the forking (threaded) web worker
+    'START_METHOD': 'spawn',
+}
+
+def birth_chart_batch(records):
+    """[(id, date_str, time_str, lat, lon)] -> [(id, chart, error)]; one bad record never fails the batch."""
+    results = []
+    for record_id, date_str, time_str, lat, lon in records:
+        try:
+            results.append((record_id, astro.generate_professional_birth_chart(date_str, time_str, lat, lon), None))
+        except Exception as exc:
+            results.append((record_id, None, f"{type(exc).__name__}: {exc}"))
+    return results
+
+
+# Module-level functions only: tasks and their arguments travel by pickle
+TASKS = {
+    'birth_chart_batch': birth_chart_batch,
+    'birth_chart': astro.generate_professional_birth_chart,
+    'sade_sati': astro.sade_sati_timeline,
+    'birth_time_segments': astro.birth_time_segments,
+    'panchang': astro.generate_panchang,
+    'score_matches': astro.score_matches,
+}
+
+
+class ComputeBusy(APIException):
+    status_code = 503
+    default_detail = "The chart service is busy, please retry shortly."
+    default_code = "compute_busy"
+
+
+class ComputeTimeout(APIException):
+    status_code = 504
+    default_detail = "The chart computation took too long."
+    default_code = "compute_timeout"
+
+
+def _warm_worker():
+    """Pool initializer: pay the ephemeris file and table loads once per worker."""
+    astro.load_chebyshev_tables()
+    astro.calc_body_states(astro.utc_to_jd(datetime.datetime(2000, 1, 1)))
+
+
+def _call(task, args, kwargs):
+    return TASKS[task](*args, **kwargs)
+
+
+def _call_timed(task, args, kwargs):
+    """_call with stage timing in the worker; the stages are replayed in the caller's recorder."""
+    token = timing.start_recording()
+    try:
+        result = _call(task, args, kwargs)
+    finally:
+        stages = timing.stop_recording(token)
+    return result, stages
+
+
+class ComputePool:
+    def __init__(self, workers=0, max_pending=32, timeout=30.0, queue_wait=1.0, start_method='spawn'):
+        self.workers = workers
+        self.timeout = timeout
+        self.queue_wait = queue_wait
+        self.start_method = start_method
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def sync(self):
+        return self.workers <= 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_warm_worker,
+                )
+            return self._executor
+
+    def _reset(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, task, *args, **kwargs):
+        """Queue a registered task; returns a Future. Raises ComputeBusy when the queue is full."""
+        return self._submit(_call, task, args, kwargs)
+
+    def submit_timed(self, task, *args, **kwargs):
+        """Like submit, but the Future resolves to (result, {stage: ms}) timed in the worker."""
+        return self._submit(_call_timed, task, args, kwargs)
+
+    def _submit(self, entry, task, args, kwargs):
+        if task not in TASKS:
+            raise KeyError(f"Unknown compute task {task!r}")
+        if self.sync:
+            future = Future()
+            try:
+                future.set_result(entry(task, args, kwargs))
+            except Exception as exc:
+                future.set_exception(exc)
+            return future
+
+        if not self._slots.acquire(timeout=self.queue_wait):
+            raise ComputeBusy()
+        executor = self._get_executor()
+        try:
+            future = executor.submit(entry, task, args, kwargs)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); start a fresh pool for the next job
+            self._slots.release()
+            self._reset(executor)
+            raise
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _f: self._slots.release())
+        return future
+
+    def run(self, task, *args, timeout=None, **kwargs):
+        """Run a registered task and wait for its result (at most `timeout`, default TIMEOUT, seconds)."""
+        if not self.sync and timing.active():
+            with timing.stage(f"compute_{task}"):
+                result, stages = self._wait(self.submit_timed(task, *args, **kwargs), timeout)
+            for name, ms in stages.items():
+                timing.record(name, ms)
+            return result
+        return self._wait(self.submit(task, *args, **kwargs), timeout)
+
+    def _wait(self, future, timeout):
+        try:
+            return future.result(timeout=self.timeout if timeout is None else timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise ComputeTimeout()
+        except BrokenProcessPool:
+            if self._executor is not None:
+                self._reset(self._executor)
+            raise
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """This process's pool; rebuilt after a fork so children never share their parent's workers."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            options = {**DEFAULTS, **getattr(settings, 'COMPUTE_POOL', {})}
+            _pool = ComputePool(options['WORKERS'], options['MAX_PENDING'], options['TIMEOUT'],
+                                options['QUEUE_WAIT'], options['START_METHOD'])
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def submit(task, *args, **kwargs):
+    return get_pool().submit(task, *args, **kwargs)
+
+
+def run(task, *args, **kwargs):
+    return get_pool().run(task, *args, **kwargs)
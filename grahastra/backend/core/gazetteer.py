@@ -0,0 +1,195 @@
+# src grahastra/backend/core/gazetteer.py
+"""
+Offline place lookup.
+
+Places come from a GeoNames cities dump loaded into the Place table
+(`manage.py load_gazetteer`). Each process builds a compact prefix index over
+them on first use: one sorted list of normalized names (official, ASCII and
+ASCII alternate names, so "bombay" finds Mumbai) with a parallel array of place
+rows. An exact match and an autocomplete are then a bisect plus a scan of the
+matching run.
+
+`geocode(text)` resolves free text such as "Kochi, Kerala, India": the first
+comma-separated part is the place name and the rest qualify it (state, country
+or ISO code). Texts the gazetteer cannot resolve go to GeocodeCache and, only
+for a miss there, to OpenCage, whose answer is then cached. "Not found" answers
+are cached too and asked again after MISS_TTL; a geocoder that could not be
+reached caches nothing, so the caller's retry asks again.
+"""
+
+import datetime
+
+import heapq
+import re
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MIN_PREFIX = 2
+MAX_QUERY_LENGTH = 255
+MISS_TTL = datetime.timedelta(days=30)
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def normalize(text: str) -> str:
+    """Lower-case ASCII words separated by single spaces ("São Paulo" -> "sao paulo")."""
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return _NON_ALNUM.sub(' ', text.lower()).strip()
+
+
+@dataclass(frozen=True)
+class GazetteerPlace:
+    name: str
+    admin1: str
+    country: str
+    country_code: str
+    latitude: float
+    longitude: float
+    population: int
+
+    @property
+    def label(self) -> str:
+        return ", ".join(part for part in (self.name, self.admin1, self.country) if part)
+
+    def qualifiers(self) -> Tuple[str, ...]:
+        return (normalize(self.admin1), normalize(self.country), self.country_code.lower())
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            'name': self.name,
+            'admin1': self.admin1,
+            'country': self.country,
+            'label': self.label,
+            'lat': self.latitude,
+            'lon': self.longitude,
+        }
+
+
+class PrefixIndex:
+    def __init__(self, places: List[GazetteerPlace], names: Iterable[Tuple[str, int]]):
+        """`names` yields (normalized name, index into `places`); duplicates are dropped."""
+        pairs = sorted(set(names))
+        self.places = places
+        self.keys = [key for key, _ in pairs]
+        self.rows = array('i', [row for _, row in pairs])
+
+    def __len__(self):
+        return len(self.places)
+
+    def _run(self, key: str, prefix: bool) -> Iterable[int]:
+        i = bisect_left(self.keys, key)
+        n = len(self.keys)
+        while i < n and (self.keys[i].startswith(key) if prefix else self.keys[i] == key):
+            yield self.rows[i]
+            i += 1
+
+    def exact(self, name: str) -> List[GazetteerPlace]:
+        return [self.places[row] for row in set(self._run(normalize(name), prefix=False))]
+
+    def complete(self, prefix: str, limit: int = 10) -> List[GazetteerPlace]:
+        """Places with a name starting with `prefix`, most populous first."""
+        key = normalize(prefix)
+        if len(key) < MIN_PREFIX:
+            return []
+        rows = heapq.nlargest(limit, set(self._run(key, prefix=True)),
+                              key=lambda row: self.places[row].population)
+        return [self.places[row] for row in rows]
+
+    def resolve(self, text: str) -> Optional[GazetteerPlace]:
+        """Best place for "name[, qualifier...]": most qualifiers matched, then population.
+
+        Qualifiers that match nothing (a district, say) are tolerated, but when
+        qualifiers were given and none of them matches, the text is treated as a
+        miss rather than guessed.
+        """
+        name, *rest = text.split(',')
+        qualifiers = [q for q in (normalize(part) for part in rest) if q]
+        best, best_score = None, None
+        for place in self.exact(name):
+            fields = place.qualifiers()
+            score = (sum(1 for q in qualifiers if any(f.startswith(q) for f in fields if f)), place.population)
+            if best_score is None or score > best_score:
+                best, best_score = place, score
+        if best is None or (qualifiers and best_score[0] == 0):
+            return None
+        return best
+
+
+_index: Optional[PrefixIndex] = None
+_index_lock = threading.Lock()
+
+
+def build_index() -> PrefixIndex:
+    from .models import Place
+
+    places, names = [], []
+    rows = Place.objects.values_list('name', 'ascii_name', 'alternate_names', 'admin1', 'country',
+                                     'country_code', 'latitude', 'longitude', 'population')
+    for name, ascii_name, alternates, admin1, country, code, lat, lon, population in rows.iterator(chunk_size=5000):
+        row = len(places)
+        places.append(GazetteerPlace(name, admin1, country, code, lat, lon, population))
+        for alias in (name, ascii_name, *alternates.split(',')):
+            key = normalize(alias)
+            if key:
+                names.append((key, row))
+    return PrefixIndex(places, names)
+
+
+def get_index() -> PrefixIndex:
+    """This process's index, built from the Place table on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = build_index()
+    return _index
+
+
+def reset_index() -> None:
+    """Drop the index so the next lookup rebuilds it (after reloading the gazetteer)."""
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def autocomplete(prefix: str, limit: int = 10) -> List[Dict[str, object]]:
+    name, *rest = prefix.split(',')
+    places = get_index().complete(name, limit=limit if not rest else limit * 5)
+    qualifiers = [q for q in (normalize(part) for part in rest) if q]
+    if qualifiers:
+        # "Kochi, Ke" narrows to places whose state/country starts with the typed qualifiers
+        places = [p for p in places if all(any(f.startswith(q) for f in p.qualifiers() if f) for q in qualifiers)]
+    return [p.as_dict() for p in places[:limit]]
+
+
+def geocode(text: str) -> Tuple[Optional[float], Optional[float]]:
+    """(lat, lon) for free place text, or (None, None) if nobody can place it."""
+    from django.utils import timezone
+    from grahastra.utility import GeocoderUnavailable, get_coordinates_from_place
+    from .models import GeocodeCache
+
+    place = get_index().resolve(text)
+    if place is not None:
+        return place.latitude, place.longitude
+
+    query = normalize(text)[:MAX_QUERY_LENGTH]
+    if not query:
+        return None, None
+    cached = GeocodeCache.objects.filter(query=query).values_list('latitude', 'longitude', 'created_at').first()
+    if cached is not None:
+        lat, lon, created_at = cached
+        if lat is not None or timezone.now() - created_at < MISS_TTL:
+            return lat, lon
+
+    try:
+        lat, lon = get_coordinates_from_place(text)
+    except GeocoderUnavailable:
+        return None, None
+    # update_or_create: another request may cache the same text concurrently, or refresh an expired miss
+    GeocodeCache.objects.update_or_create(query=query, defaults={'latitude': lat, 'longitude': lon,
+                                                                 'created_at': timezone.now()})
+    return lat, lon
@@ -0,0 +1,116 @@
+# src grahastra/backend/core/jobs.py
+"""
+Database-backed background jobs.
+
+`enqueue` inserts a Job row, normally inside the caller's transaction, so the
+job exists exactly when the data it refers to does. Workers
+(`manage.py run_jobs`) claim due jobs with SELECT ... FOR UPDATE SKIP LOCKED,
+so any number of them can poll the same table without handing a job to two
+workers. Handlers run outside the claiming transaction. A failure is retried
+with exponential backoff until `max_attempts`, then the job is marked failed.
+A RUNNING job whose worker died is requeued once its lease
+(`JOB_QUEUE['LEASE']` seconds) has expired.
+
+Handlers are looked up by kind in HANDLERS (dotted paths, so apps can own
+their handlers without core importing them), and they receive the job's
+kwargs. They must be idempotent, because a job can run more than once.
+
+With `JOB_QUEUE['RUN_INLINE']` on (local development without a worker) jobs
+run right after the enqueuing transaction commits.
+"""
+
+import datetime
+import traceback
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+HANDLERS = {
+    'profile_chart': 'authentication.jobs.build_profile_chart',
+    'panchang_year': 'birthchart.panchang.generate_year_job',
+}
+
+DEFAULTS = {
+    'LEASE': 600,          # seconds a claimed job may run before it counts as abandoned
+    'RETRY_BASE': 10,      # first retry delay in seconds, doubled per attempt
+    'RETRY_MAX': 3600,
+    'RUN_INLINE': False,
+}
+
+
+def options() -> Dict[str, object]:
+    return {**DEFAULTS, **getattr(settings, 'JOB_QUEUE', {})}
+
+
+def enqueue(kind: str, user=None, max_attempts: int = 5, delay: float = 0, **kwargs) -> Job:
+    """Queue `kind` with JSON-serializable `kwargs`; runs no earlier than `delay` seconds from now."""
+    if kind not in HANDLERS:
+        raise KeyError(f"Unknown job kind {kind!r}")
+    job = Job.objects.create(kind=kind, kwargs=kwargs, user=user, max_attempts=max_attempts,
+                             run_after=timezone.now() + datetime.timedelta(seconds=delay))
+    if options()['RUN_INLINE']:
+        transaction.on_commit(lambda: run_job(job))
+    return job
+
+
+def claim(limit: int = 1, kinds: Optional[Iterable[str]] = None) -> List[Job]:
+    """Mark up to `limit` due jobs RUNNING for this worker and return them."""
+    now = timezone.now()
+    with transaction.atomic():
+        qs = Job.objects.select_for_update(skip_locked=True).filter(status=Job.QUEUED, run_after__lte=now)
+        if kinds:
+            qs = qs.filter(kind__in=list(kinds))
+        jobs = list(qs.order_by('run_after', 'id')[:limit])
+        for job in jobs:
+            job.status = Job.RUNNING
+            job.attempts += 1
+            job.locked_at = now
+        Job.objects.bulk_update(jobs, ['status', 'attempts', 'locked_at'])
+    return jobs
+
+
+def run_job(job: Job) -> bool:
+    """Run a claimed job and record the outcome; True if it succeeded."""
+    if job.status != Job.RUNNING:  # RUN_INLINE: claim it here
+        job.status, job.attempts, job.locked_at = Job.RUNNING, job.attempts + 1, timezone.now()
+        job.save(update_fields=['status', 'attempts', 'locked_at'])
+    try:
+        import_string(HANDLERS[job.kind])(**job.kwargs)
+    except Exception:
+        job.last_error = traceback.format_exc(limit=5)
+        if job.attempts >= job.max_attempts:
+            job.status, job.finished_at = Job.FAILED, timezone.now()
+        else:
+            opts = options()
+            delay = min(opts['RETRY_BASE'] * 2 ** (job.attempts - 1), opts['RETRY_MAX'])
+            job.status, job.run_after = Job.QUEUED, timezone.now() + datetime.timedelta(seconds=delay)
+        job.locked_at = None
+        job.save(update_fields=['status', 'run_after', 'locked_at', 'last_error', 'finished_at'])
+        return False
+    job.status, job.locked_at, job.finished_at = Job.DONE, None, timezone.now()
+    job.save(update_fields=['status', 'locked_at', 'finished_at'])
+    return True
+
+
+def requeue_stale() -> int:
+    """Return jobs whose worker vanished mid-run to the queue (or fail them if out of attempts)."""
+    cutoff = timezone.now() - datetime.timedelta(seconds=options()['LEASE'])
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, locked_at=None, finished_at=timezone.now(), last_error="lease expired")
+    requeued = stale.update(status=Job.QUEUED, locked_at=None, last_error="lease expired")
+    return failed + requeued
+
+
+def run_pending(limit: int = 10, kinds: Optional[Iterable[str]] = None) -> int:
+    """Claim and run one batch; returns how many jobs were claimed."""
+    jobs = claim(limit, kinds)
+    for job in jobs:
+        run_job(job)
+    return len(jobs)
@@ -0,0 +1,219 @@
+# src grahastra/backend/core/mailer.py
+"""
+Outbox mailer.
+
+Mail is never sent from a request. `queue_mail` writes an OutboxMessage row
+(inside the caller's transaction when there is one), and `manage.py
+send_outbox` delivers the rows. The sender claims a batch with
+SELECT ... FOR UPDATE SKIP LOCKED, renders and sends it on a bounded pool of
+threads, and marks each row sent or schedules a retry. Every thread keeps one
+SMTP connection open across batches, so a burst costs one TLS handshake per
+thread rather than one per message. Compiled templates are cached per process.
+
+Delivery is at least once: a row left SENDING by a crashed sender is retried
+after `MAIL_OUTBOX['LEASE']` seconds.
+
+`queue_digest(day)` queues the daily digest for every active user. A unique
+(campaign, recipient) constraint makes re-running a day's campaign a no-op.
+For development and tests, `manage.py smtp_sink` runs a local SMTP stand-in.
+"""
+
+import datetime
+import functools
+import smtplib
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.template.loader import get_template
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from .models import OutboxMessage
+
+DEFAULTS = {
+    'WORKERS': 4,          # sender threads, each with its own SMTP connection
+    'BATCH_SIZE': 50,      # messages per thread per claim
+    'MAX_ATTEMPTS': 5,
+    'RETRY_BASE': 60,      # first retry delay in seconds, doubled per attempt
+    'LEASE': 600,
+}
+DIGEST_TEMPLATE = "email/daily_digest.html"
+QUEUE_CHUNK = 1000
+
+
+def options() -> Dict[str, object]:
+    return {**DEFAULTS, **getattr(settings, 'MAIL_OUTBOX', {})}
+
+
+@functools.lru_cache(maxsize=32)
+def _template(name):
+    return get_template(name)
+
+
+def render_message(message: OutboxMessage) -> EmailMultiAlternatives:
+    html = _template(message.template).render(message.context)
+    mail = EmailMultiAlternatives(subject=message.subject, body=strip_tags(html),
+                                  from_email=settings.EMAIL_HOST_USER, to=[message.recipient])
+    mail.attach_alternative(html, "text/html")
+    return mail
+
+
+def queue_mail(recipient: str, subject: str, template: str, context: Dict, campaign: str = '') -> OutboxMessage:
+    return OutboxMessage.objects.create(recipient=recipient, subject=subject, template=template,
+                                        context=context, campaign=campaign)
+
+
+# -------------------------------
+# Daily digest
+# -------------------------------
+
+def _digest_panchang(day, lat, lon, memo):
+    """The few panchang lines the digest shows, or None if the cell's year is not precomputed; memoized per cell."""
+    from birthchart.panchang import get_panchang, grid_cell
+
+    cell = grid_cell(lat, lon)
+    if cell not in memo:
+        p = get_panchang(day, lat, lon)
+        memo[cell] = p and {
+            'vara': p['vara'],
+            'sunrise': p['sunrise'][11:],
+            'sunset': p['sunset'][11:],
+            'tithi': p['tithi'][0]['name'],
+            'nakshatra': p['nakshatra'][0]['name'],
+            'rahu_kalam': f"{p['rahu_kalam']['start'][11:]}–{p['rahu_kalam']['end'][11:]}",
+        }
+    return memo[cell]
+
+
+def queue_digest(day: datetime.date) -> int:
+    """Queue `day`'s digest for every active user; returns how many messages were queued."""
+    campaign = f"digest:{day.isoformat()}"
+    users = (get_user_model().objects.filter(is_active=True)
+             .values_list('email', 'first_name', 'profile__latitude', 'profile__longitude')
+             .order_by('pk'))
+    memo, batch, queued = {}, [], 0
+    for email, first_name, lat, lon in users.iterator(chunk_size=QUEUE_CHUNK):
+        context = {'name': first_name or email, 'date': day.strftime("%d %B %Y"), 'year': day.year}
+        panchang = _digest_panchang(day, lat, lon, memo) if lat is not None and lon is not None else None
+        if panchang:
+            context['panchang'] = panchang
+        batch.append(OutboxMessage(recipient=email, subject=f"Your day in the stars · {day:%d %b}",
+                                   template=DIGEST_TEMPLATE, context=context, campaign=campaign))
+        if len(batch) >= QUEUE_CHUNK:
+            queued += _insert(batch)
+            batch = []
+    return queued + _insert(batch)
+
+
+def _insert(batch: List[OutboxMessage]) -> int:
+    if not batch:
+        return 0
+    # Already-queued (campaign, recipient) pairs are skipped, so a re-run only fills gaps
+    before = OutboxMessage.objects.filter(campaign=batch[0].campaign).count()
+    OutboxMessage.objects.bulk_create(batch, ignore_conflicts=True)
+    return OutboxMessage.objects.filter(campaign=batch[0].campaign).count() - before
+
+
+# -------------------------------
+# Sending
+# -------------------------------
+
+class Mailer:
+    """Sender threads with persistent SMTP connections; use one per sending process."""
+
+    def __init__(self, workers: Optional[int] = None, batch_size: Optional[int] = None):
+        opts = options()
+        self.workers = workers or opts['WORKERS']
+        self.batch_size = batch_size or opts['BATCH_SIZE']
+        self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix="mailer")
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = get_connection()
+            with self._lock:
+                self._connections.append(connection)
+        connection.open()  # no-op while the connection is open
+        return connection
+
+    def _send_chunk(self, messages: List[OutboxMessage]) -> List[Tuple[int, Optional[str]]]:
+        """(message id, error or None) for each message, sent over this thread's connection."""
+        results = []
+        for message in messages:
+            try:
+                mail = render_message(message)
+                try:
+                    self._connection().send_messages([mail])
+                except smtplib.SMTPServerDisconnected:
+                    # Server dropped the idle connection; reconnect once
+                    self._local.connection.close()
+                    self._connection().send_messages([mail])
+                results.append((message.pk, None))
+            except Exception:
+                results.append((message.pk, traceback.format_exc(limit=3)))
+        return results
+
+    def claim(self) -> List[OutboxMessage]:
+        now = timezone.now()
+        with transaction.atomic():
+            messages = list(OutboxMessage.objects.select_for_update(skip_locked=True)
+                            .filter(status=OutboxMessage.QUEUED, run_after__lte=now)
+                            .order_by('run_after', 'id')[:self.workers * self.batch_size])
+            for message in messages:
+                message.status, message.locked_at = OutboxMessage.SENDING, now
+                message.attempts += 1
+            OutboxMessage.objects.bulk_update(messages, ['status', 'locked_at', 'attempts'])
+        return messages
+
+    def send_pending(self) -> Tuple[int, int]:
+        """Claim and send one round of due messages; returns (sent, failed)."""
+        requeue_stale()
+        messages = self.claim()
+        if not messages:
+            return 0, 0
+        chunks = [messages[i:i + self.batch_size] for i in range(0, len(messages), self.batch_size)]
+        results = [r for chunk in self.executor.map(self._send_chunk, chunks) for r in chunk]
+
+        by_id = {m.pk: m for m in messages}
+        sent = [pk for pk, error in results if error is None]
+        OutboxMessage.objects.filter(pk__in=sent).update(
+            status=OutboxMessage.SENT, sent_at=timezone.now(), locked_at=None)
+        opts = options()
+        for pk, error in results:
+            if error is None:
+                continue
+            message = by_id[pk]
+            if message.attempts >= opts['MAX_ATTEMPTS']:
+                message.status = OutboxMessage.FAILED
+            else:
+                delay = opts['RETRY_BASE'] * 2 ** (message.attempts - 1)
+                message.status = OutboxMessage.QUEUED
+                message.run_after = timezone.now() + datetime.timedelta(seconds=delay)
+            message.last_error, message.locked_at = error, None
+            message.save(update_fields=['status', 'run_after', 'last_error', 'locked_at'])
+        return len(sent), len(results) - len(sent)
+
+    def close_connections(self) -> None:
+        """Close idle SMTP connections; threads reopen them on their next message."""
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True)
+        self.close_connections()
+
+
+def requeue_stale() -> int:
+    cutoff = timezone.now() - datetime.timedelta(seconds=options()['LEASE'])
+    return (OutboxMessage.objects.filter(status=OutboxMessage.SENDING, locked_at__lt=cutoff)
+            .update(status=OutboxMessage.QUEUED, locked_at=None))
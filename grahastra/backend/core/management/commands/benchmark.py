@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import (
+    BASELINE_PATH, CASES, CORPUS_SIZE, DEFAULT_TOLERANCE,
+    load_baseline, regressions, run_benchmarks, save_baseline,
+)
+
+
+def _delta(new, old):
+    return f"{new / old - 1:+.0%}" if old else ""
+
+
+class Command(BaseCommand):
+    help = "Benchmark core.astrology_utils on a fixed birth corpus and compare with the stored baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument("cases", nargs="*", help=f"Cases to run (default: all). One of: {', '.join(CASES)}")
+        parser.add_argument("--size", type=int, default=CORPUS_SIZE, help="Births in the corpus.")
+        parser.add_argument("--rounds", type=int, default=5, help="Timed passes over the corpus per case.")
+        parser.add_argument("--baseline", default=BASELINE_PATH)
+        parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                            help="Allowed slowdown / allocation growth as a fraction (default 0.2).")
+        parser.add_argument("--save-baseline", action="store_true",
+                            help="Write these results as the new baseline instead of comparing.")
+
+    def handle(self, *args, **options):
+        unknown = set(options["cases"]) - set(CASES)
+        if unknown:
+            raise CommandError(f"Unknown cases: {', '.join(sorted(unknown))}")
+
+        results = run_benchmarks(options["cases"] or None, options["size"], options["rounds"])
+        baseline = {} if options["save_baseline"] else load_baseline(options["baseline"])
+
+        self.stdout.write(f"{'case':36s} {'ops/sec':>12s} {'vs base':>8s} {'peak B/op':>11s} {'vs base':>8s}")
+        for r in results:
+            base = baseline.get(r.name)
+            ops_delta = _delta(r.ops_per_sec, base["ops_per_sec"]) if base else ""
+            mem_delta = _delta(r.peak_bytes_per_op, base["peak_bytes_per_op"]) if base else ""
+            self.stdout.write(f"{r.name:36s} {r.ops_per_sec:12.1f} {ops_delta:>8s} "
+                              f"{r.peak_bytes_per_op:11.0f} {mem_delta:>8s}")
+
+        if options["save_baseline"]:
+            save_baseline(results, options["size"], options["baseline"])
+            self.stdout.write(f"Baseline written to {options['baseline']}")
+            return
+        if not baseline:
+            self.stdout.write(f"No baseline at {options['baseline']}; run with --save-baseline to create one.")
+            return
+
+        flagged = regressions(results, baseline, options["tolerance"])
+        if flagged:
+            lines = [f"{name}: {', '.join(metrics)}" for name, metrics in flagged.items()]
+            raise CommandError("Regressions beyond tolerance:\n  " + "\n  ".join(lines))
+        self.stdout.write(self.style.SUCCESS("No regressions beyond tolerance"))
@@ -0,0 +1,33 @@
+import numpy as np
+import swisseph as swe
+from django.core.management.base import BaseCommand
+
+from core.astrology_utils import (
+    CHEB_TABLE_PATH, EPHE_FLAGS, PLANET_CODES,
+    build_chebyshev_tables, save_chebyshev_tables,
+)
+
+
+class Command(BaseCommand):
+    help = "Fit Chebyshev tables for the slow bodies and report their error against Swiss Ephemeris."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", default=CHEB_TABLE_PATH)
+        parser.add_argument("--samples", type=int, default=20000,
+                            help="Random moments used to measure the fit error.")
+
+    def handle(self, *args, **options):
+        tables = build_chebyshev_tables()
+        save_chebyshev_tables(tables, options["output"])
+        self.stdout.write(f"Wrote {options['output']}")
+
+        rng = np.random.default_rng(0)
+        for name, table in tables.items():
+            jds = rng.uniform(table.start, table.end, options["samples"])
+            lon, speed = table.evaluate(jds)
+            ref = np.array([swe.calc_ut(jd, PLANET_CODES[name], EPHE_FLAGS)[0][0:4:3] for jd in jds.tolist()])
+            lon_err = np.abs((lon - ref[:, 0] + 180.0) % 360.0 - 180.0).max()
+            speed_err = np.abs(speed - ref[:, 1]).max()
+            self.stdout.write(
+                f"{name:8s} segments={len(table.coeffs):5d} max|Δlon|={lon_err:.2e}° max|Δspeed|={speed_err:.2e}°/day"
+            )
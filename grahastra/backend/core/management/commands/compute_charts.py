@@ -0,0 +1,214 @@
+import csv
+import datetime
+import json
+import os
+from collections import deque
+from itertools import islice
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.astrology_utils import IST_OFFSET
+from core.compute import ComputePool
+from core.gazetteer import geocode
+
+IST = datetime.timezone(IST_OFFSET)
+
+
+def read_records(path):
+    """Yield input rows as dicts from a .csv (header row) or .jsonl file, one at a time."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def parse_tz(value):
+    """IANA name ('Asia/Kolkata'), offset ('+05:30', 'UTC-4') or hours ('5.5'); default IST."""
+    if value in (None, ""):
+        return IST
+    value = str(value).strip()
+    try:
+        return ZoneInfo(value)
+    except (ZoneInfoNotFoundError, ValueError):
+        pass
+    text = value.upper().removeprefix("UTC").removeprefix("GMT") or "0"
+    if ":" in text:
+        hours, minutes = text.split(":")
+        sign = -1 if hours.startswith("-") else 1
+        offset = datetime.timedelta(hours=int(hours), minutes=sign * int(minutes))
+    else:
+        offset = datetime.timedelta(hours=float(text))
+    return datetime.timezone(offset)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compute full charts for birth records (CSV/JSONL with date, time, place or lat/lon, tz, optional id) "
+        "across worker processes, streaming results in input order to JSONL or Parquet. Re-running with the "
+        "same output resumes after the last record written."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="Birth records, .csv or .jsonl")
+        parser.add_argument("output", help="A .jsonl file, or a directory of Parquet parts with --parquet")
+        parser.add_argument("--parquet", action="store_true", help="Write Parquet parts (needs pyarrow)")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                            help="Worker processes; 0 computes inline.")
+        parser.add_argument("--chunk-size", type=int, default=200, help="Records per worker job.")
+        parser.add_argument("--timeout", type=float, default=600.0, help="Seconds allowed per chunk.")
+
+    def handle(self, *args, **options):
+        self.places = {}
+        chunk_size = options["chunk_size"]
+        writer = ParquetWriter(options["output"]) if options["parquet"] else JsonlWriter(options["output"])
+        done = writer.resume()
+        if done:
+            self.stdout.write(f"Resuming after {done} records")
+
+        records = islice(enumerate(read_records(options["input"])), done, None)
+        workers = options["workers"]
+        # In-flight chunks are bounded, so memory does not grow with the input
+        window = max(1, workers) * 2
+        pool = ComputePool(workers=workers, max_pending=window, timeout=options["timeout"],
+                           queue_wait=options["timeout"])
+        pending = deque()
+        counts = {"ok": 0, "failed": 0}
+        try:
+            while True:
+                chunk = list(islice(records, chunk_size))
+                if chunk:
+                    jobs, invalid = [], {}
+                    for index, row in chunk:
+                        try:
+                            jobs.append(self.job(index, row))
+                        except (KeyError, ValueError, TypeError) as exc:
+                            invalid[index] = f"Invalid record: {exc!r}"
+                    pending.append((chunk, invalid, pool.submit("birth_chart_batch", jobs)))
+                if not pending:
+                    break
+                if chunk and len(pending) < window:
+                    continue
+                chunk, invalid, future = pending.popleft()
+                computed = {index: (chart, error) for index, chart, error in future.result(timeout=pool.timeout)}
+                for index, row in chunk:
+                    chart, error = computed.get(index, (None, invalid.get(index)))
+                    counts["ok" if error is None else "failed"] += 1
+                    writer.write(row.get("id", index), chart, error)
+                writer.flush()
+                self.stdout.write(f"{done + counts['ok'] + counts['failed']} records written")
+        finally:
+            writer.close()
+            pool.shutdown()
+        self.stdout.write(f"Computed {counts['ok']} charts, {counts['failed']} failed")
+
+    def job(self, index, row):
+        tz = parse_tz(row.get("tz"))
+        date = datetime.date.fromisoformat(str(row["date"]))
+        time = datetime.time.fromisoformat(str(row["time"]))
+        local = datetime.datetime.combine(date, time).replace(tzinfo=tz)
+        ist = local.astimezone(IST)
+        if row.get("lat") not in (None, "") and row.get("lon") not in (None, ""):
+            lat, lon = float(row["lat"]), float(row["lon"])
+        else:
+            lat, lon = self.geocode(row["place"])
+        return index, ist.strftime("%Y-%m-%d"), ist.strftime("%H:%M"), lat, lon
+
+    def geocode(self, place):
+        # Partner files repeat the same few thousand places
+        if place not in self.places:
+            self.places[place] = geocode(place)
+        lat, lon = self.places[place]
+        if lat is None:
+            raise ValueError(f"could not geocode {place!r}")
+        return lat, lon
+
+
+class JsonlWriter:
+    """One line per input record, in input order: {"id", "chart"} or {"id", "error"}."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def resume(self):
+        done = 0
+        if os.path.exists(self.path):
+            with open(self.path, "rb+") as f:
+                complete = 0
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    complete += len(line)
+                    done += 1
+                # Drop a line cut off by an interruption
+                f.truncate(complete)
+        self.file = open(self.path, "a", encoding="utf-8")
+        return done
+
+    def write(self, record_id, chart, error):
+        row = {"id": record_id, "chart": chart} if error is None else {"id": record_id, "error": error}
+        self.file.write(json.dumps(row, default=str, ensure_ascii=False) + "\n")
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+class ParquetWriter:
+    """A directory of part-<first record>.parquet files; a part is written whole, so it is either
+    complete or absent (an interruption loses at most one unwritten part).
+    Columns: id, error, lagna, moon_nakshatra, yogas, doshas, chart (JSON)."""
+
+    PART_ROWS = 10000
+
+    def __init__(self, path):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise CommandError("Parquet output needs pyarrow (pip install pyarrow)")
+        self.pa, self.pq = pyarrow, pyarrow.parquet
+        self.path = path
+        self.rows = []
+        self.start = 0
+
+    def resume(self):
+        os.makedirs(self.path, exist_ok=True)
+        for name in os.listdir(self.path):
+            if name.endswith(".tmp"):
+                os.remove(os.path.join(self.path, name))
+            elif name.startswith("part-") and name.endswith(".parquet"):
+                rows = self.pq.ParquetFile(os.path.join(self.path, name)).metadata.num_rows
+                self.start = max(self.start, int(name[5:-8]) + rows)
+        return self.start
+
+    def write(self, record_id, chart, error):
+        chart = chart or {}
+        self.rows.append({
+            "id": str(record_id),
+            "error": error,
+            "lagna": chart.get("ascendant", {}).get("sign"),
+            "moon_nakshatra": chart.get("nakshatra", {}).get("moon", {}).get("nakshatra"),
+            "yogas": chart.get("yogas"),
+            "doshas": chart.get("doshas"),
+            "chart": json.dumps(chart, default=str, ensure_ascii=False) if error is None else None,
+        })
+
+    def flush(self, force=False):
+        if not self.rows or (len(self.rows) < self.PART_ROWS and not force):
+            return
+        path = os.path.join(self.path, f"part-{self.start:012d}.parquet")
+        self.pq.write_table(self.pa.Table.from_pylist(self.rows), path + ".tmp")
+        os.replace(path + ".tmp", path)
+        self.start += len(self.rows)
+        self.rows = []
+
+    def close(self):
+        self.flush(force=True)
@@ -0,0 +1,104 @@
+import csv
+import io
+import os
+import sys
+import zipfile
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core import gazetteer
+from core.models import Place
+
+GEONAMES_DUMP = "https://download.geonames.org/export/dump/"
+DUMPS = ("cities500", "cities1000", "cities5000", "cities15000")
+BATCH_SIZE = 5000
+
+# GeoNames "cities" columns we use (the file has 19, tab separated, no header)
+ID, NAME, ASCII_NAME, ALTERNATES, LAT, LON = 0, 1, 2, 3, 4, 5
+COUNTRY_CODE, ADMIN1_CODE, POPULATION, TIMEZONE = 8, 10, 14, 17
+
+
+def _lines(data, member=None):
+    """Text lines of a downloaded/read file, unpacking a GeoNames zip if needed."""
+    if data[:2] == b"PK":
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            data = archive.read(member or archive.namelist()[0])
+    return io.StringIO(data.decode("utf-8"))
+
+
+def _alternates(field):
+    # ASCII spellings only ("Bombay", "Calcutta"); skips scripts, codes and links
+    names = {n for n in field.split(",") if n.isascii() and not any(c.isdigit() for c in n) and "/" not in n}
+    return ",".join(sorted(names))
+
+
+class Command(BaseCommand):
+    help = ("Load a GeoNames cities dump into the Place table used for offline geocoding and "
+            "place autocomplete. Restart web workers afterwards so they rebuild their index.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", nargs="?", default="cities15000",
+                            help=f"Path to a GeoNames cities file (.txt or .zip), or one of {', '.join(DUMPS)} "
+                                 "to download it.")
+        parser.add_argument("--admin1", help="Path to admin1CodesASCII.txt (downloaded if omitted).")
+        parser.add_argument("--countries", help="Path to countryInfo.txt (downloaded if omitted).")
+        parser.add_argument("--min-population", type=int, default=0)
+
+    def read(self, path_or_name):
+        if os.path.exists(path_or_name):
+            with open(path_or_name, "rb") as f:
+                return f.read()
+        url = GEONAMES_DUMP + path_or_name
+        self.stdout.write(f"Downloading {url}")
+        try:
+            response = requests.get(url, timeout=60)
+            response.raise_for_status()
+        except requests.RequestException as exc:
+            raise CommandError(f"Could not fetch {url}: {exc}")
+        return response.content
+
+    def handle(self, *args, **options):
+        source = options["source"]
+        if not os.path.exists(source) and source not in DUMPS:
+            raise CommandError(f"{source} is neither a file nor one of {', '.join(DUMPS)}")
+        cities = self.read(source if os.path.exists(source) else f"{source}.zip")
+
+        admin1 = {}
+        for row in csv.reader(_lines(self.read(options["admin1"] or "admin1CodesASCII.txt")), delimiter="\t"):
+            if len(row) >= 3:
+                admin1[row[0]] = row[2]  # ASCII name
+        countries = {}
+        for row in csv.reader(_lines(self.read(options["countries"] or "countryInfo.txt")), delimiter="\t"):
+            if len(row) >= 5 and not row[0].startswith("#"):
+                countries[row[0]] = row[4]
+
+        csv.field_size_limit(sys.maxsize)  # alternate-name lists of large cities are long
+        places = []
+        for row in csv.reader(_lines(cities), delimiter="\t", quoting=csv.QUOTE_NONE):
+            population = int(row[POPULATION] or 0)
+            if population < options["min_population"]:
+                continue
+            code = row[COUNTRY_CODE]
+            places.append(Place(
+                geonameid=int(row[ID]),
+                name=row[NAME],
+                ascii_name=row[ASCII_NAME],
+                alternate_names=_alternates(row[ALTERNATES]),
+                admin1=admin1.get(f"{code}.{row[ADMIN1_CODE]}", ""),
+                country=countries.get(code, ""),
+                country_code=code,
+                latitude=float(row[LAT]),
+                longitude=float(row[LON]),
+                population=population,
+                timezone=row[TIMEZONE],
+            ))
+        if not places:
+            raise CommandError("No places found in the dump")
+
+        with transaction.atomic():
+            Place.objects.all().delete()
+            Place.objects.bulk_create(places, batch_size=BATCH_SIZE)
+        gazetteer.reset_index()
+        self.stdout.write(self.style.SUCCESS(f"Loaded {len(places)} places"))
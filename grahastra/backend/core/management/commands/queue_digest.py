@@ -0,0 +1,21 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.mailer import queue_digest
+
+
+class Command(BaseCommand):
+    help = ("Queue the daily digest email for every active user (run daily, e.g. from cron). "
+            "Safe to re-run: users already queued for the day are skipped.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", help="Digest date, YYYY-MM-DD (default: today).")
+
+    def handle(self, *args, **options):
+        try:
+            day = datetime.date.fromisoformat(options["date"]) if options["date"] else datetime.date.today()
+        except ValueError:
+            raise CommandError("--date must be YYYY-MM-DD")
+        queued = queue_digest(day)
+        self.stdout.write(self.style.SUCCESS(f"Queued {queued} digest emails for {day}"))
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core import jobs
+
+
+class Command(BaseCommand):
+    help = "Run background jobs from the Job table (see core.jobs). Start as many workers as needed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--kind", action="append", dest="kinds", choices=sorted(jobs.HANDLERS),
+                            help="Only run jobs of this kind (repeatable).")
+        parser.add_argument("--batch", type=int, default=10, help="Jobs claimed per poll.")
+        parser.add_argument("--sleep", type=float, default=1.0, help="Seconds to wait when the queue is empty.")
+        parser.add_argument("--once", action="store_true", help="Exit once no job is due.")
+
+    def handle(self, *args, **options):
+        ran = 0
+        try:
+            while True:
+                close_old_connections()
+                jobs.requeue_stale()
+                claimed = jobs.run_pending(options["batch"], options["kinds"])
+                ran += claimed
+                if claimed:
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["sleep"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f"Ran {ran} jobs")
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.mailer import Mailer
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbox mail (see core.mailer) over pooled SMTP connections."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, help="Sender threads (default: MAIL_OUTBOX['WORKERS']).")
+        parser.add_argument("--batch-size", type=int, help="Messages per thread per round.")
+        parser.add_argument("--sleep", type=float, default=2.0, help="Seconds to wait when the outbox is empty.")
+        parser.add_argument("--once", action="store_true", help="Exit once no message is due.")
+
+    def handle(self, *args, **options):
+        mailer = Mailer(options["workers"], options["batch_size"])
+        totals = [0, 0]
+        try:
+            while True:
+                close_old_connections()
+                sent, failed = mailer.send_pending()
+                totals[0] += sent
+                totals[1] += failed
+                if sent or failed:
+                    continue
+                if options["once"]:
+                    break
+                # Don't hold idle SMTP connections open between bursts
+                mailer.close_connections()
+                time.sleep(options["sleep"])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            mailer.shutdown()
+        self.stdout.write(f"Sent {totals[0]} messages, {totals[1]} failed attempts")
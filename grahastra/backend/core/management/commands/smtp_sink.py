@@ -0,0 +1,37 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from core.smtp_sink import SMTPSink, subject_of
+
+
+class Command(BaseCommand):
+    help = ("Run a local SMTP stand-in that accepts every message. Point the app at it with "
+            "EMAIL_HOST=localhost EMAIL_PORT=<port> EMAIL_USE_TLS=False.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="localhost")
+        parser.add_argument("--port", type=int, default=1025)
+        parser.add_argument("--outdir", help="Also write each message to <outdir>/<n>.eml.")
+
+    def handle(self, *args, **options):
+        outdir = options["outdir"]
+        if outdir:
+            os.makedirs(outdir, exist_ok=True)
+
+        def on_message(envelope):
+            sender, recipients, raw = envelope
+            self.stdout.write(f"{sender} -> {', '.join(recipients)}: {subject_of(raw)}")
+            if outdir:
+                path = os.path.join(outdir, f"{len(sink.messages):06d}.eml")
+                with open(path, "wb") as f:
+                    f.write(raw)
+
+        sink = SMTPSink(options["host"], options["port"], on_message=on_message)
+        self.stdout.write(f"SMTP sink listening on {options['host']}:{sink.port}")
+        try:
+            sink.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            sink.server_close()
@@ -0,0 +1,45 @@
+# src grahastra/backend/core/middleware.py
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from . import timing
+
+
+class ServerTimingMiddleware:
+    """Adds a `Server-Timing` header with the request's stage timers (core.timing),
+    `db` (every query on the default connection) and `total`, and feeds them to
+    the per-view histograms. Stages may overlap (a stage that queries also counts
+    towards `db`).
+
+    Removed from the stack entirely unless the STAGE_TIMING setting is on.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "STAGE_TIMING", False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = timing.start_recording()
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(_time_query):
+                response = self.get_response(request)
+        finally:
+            total = (time.perf_counter() - start) * 1000.0
+            stages = timing.stop_recording(token)
+        stages["total"] = total
+        response["Server-Timing"] = timing.server_timing_header(stages)
+
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match is not None else "unresolved"
+        timing.observe(stages, prefix=f"{view}:")
+        return response
+
+
+def _time_query(execute, sql, params, many, context):
+    with timing.stage("db"):
+        return execute(sql, params, many, context)
@@ -1,4 +1,6 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 # Create your models here.
 
@@ -23,4 +25,95 @@ class UserQuestion(models.Model):
 #     created_at = models.DateTimeField(auto_now_add=True)
 
 #     def __str__(self):
-#         return f"{self.name} - {self.question[:30]}"
\ No newline at end of file
+#         return f"{self.name} - {self.question[:30]}"
+
+class Place(models.Model):
+    """A GeoNames city, loaded by `manage.py load_gazetteer` (see core.gazetteer)."""
+    geonameid = models.IntegerField(primary_key=True)
+    name = models.CharField(max_length=200)
+    ascii_name = models.CharField(max_length=200)
+    # ASCII alternate names only, comma-separated ("Bombay,Mumbai,...")
+    alternate_names = models.TextField(blank=True)
+    admin1 = models.CharField(max_length=200, blank=True)
+    country = models.CharField(max_length=200, blank=True)
+    country_code = models.CharField(max_length=2)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    population = models.BigIntegerField(default=0)
+    timezone = models.CharField(max_length=40, blank=True)
+
+    def __str__(self):
+        return ", ".join(part for part in (self.name, self.admin1, self.country) if part)
+
+
+class GeocodeCache(models.Model):
+    """Place text the gazetteer missed -> coordinates from the online geocoder, fetched once.
+
+    A row without coordinates records that the geocoder found nothing; it is
+    retried only after `core.gazetteer.MISS_TTL`.
+    """
+    query = models.CharField(max_length=255, unique=True)  # core.gazetteer.normalize()d
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        if self.latitude is None:
+            return f"{self.query} -> not found"
+        return f"{self.query} -> {self.latitude:.4f}, {self.longitude:.4f}"
+
+
+class Job(models.Model):
+    """A unit of background work, claimed by `manage.py run_jobs` workers (see core.jobs)."""
+    QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+    STATUS_CHOICES = [(QUEUED, "Queued"), (RUNNING, "Running"), (DONE, "Done"), (FAILED, "Failed")]
+
+    kind = models.CharField(max_length=50)
+    kwargs = models.JSONField(default=dict)
+    # Owner, so clients can poll their own jobs
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.CASCADE,
+                             related_name="jobs")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "run_after"])]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+
+class OutboxMessage(models.Model):
+    """An email waiting for (or done with) delivery by `manage.py send_outbox` (see core.mailer)."""
+    QUEUED, SENDING, SENT, FAILED = "queued", "sending", "sent", "failed"
+    STATUS_CHOICES = [(QUEUED, "Queued"), (SENDING, "Sending"), (SENT, "Sent"), (FAILED, "Failed")]
+
+    recipient = models.EmailField()
+    subject = models.CharField(max_length=255)
+    template = models.CharField(max_length=200)
+    context = models.JSONField(default=dict)
+    # e.g. "digest:2026-10-18"; one message per recipient and campaign
+    campaign = models.CharField(max_length=50, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "run_after"])]
+        constraints = [
+            models.UniqueConstraint(fields=["campaign", "recipient"], condition=~models.Q(campaign=""),
+                                    name="outbox_once_per_campaign"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.recipient} ({self.status})"
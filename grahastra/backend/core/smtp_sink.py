@@ -0,0 +1,94 @@
+# src grahastra/backend/core/smtp_sink.py
+"""
+A local SMTP stand-in for development and tests.
+
+Speaks just enough SMTP (HELO/EHLO, MAIL, RCPT, DATA, RSET, NOOP, QUIT; no
+TLS, no auth) for Django's SMTP backend to deliver to it, and hands every
+received message to a callback. `manage.py smtp_sink` prints them or writes
+them to .eml files; tests can run `SMTPSink` in a thread and read `messages`.
+"""
+
+import socketserver
+import threading
+from email import message_from_bytes, policy
+from typing import Callable, List, Optional, Tuple
+
+Envelope = Tuple[str, List[str], bytes]  # (mail from, recipients, raw message)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def reply(self, line: str) -> None:
+        self.wfile.write(line.encode('ascii') + b"\r\n")
+
+    def handle(self):
+        self.reply("220 grahastra smtp sink")
+        sender, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command, _, arg = line.decode('utf-8', 'replace').strip().partition(' ')
+            command = command.upper()
+            if command == 'EHLO':
+                self.reply("250-grahastra")
+                self.reply("250 8BITMIME")
+            elif command == 'HELO':
+                self.reply("250 grahastra")
+            elif command == 'MAIL':
+                sender, recipients = arg.partition(':')[2].strip().strip('<>'), []
+                self.reply("250 OK")
+            elif command == 'RCPT':
+                recipients.append(arg.partition(':')[2].strip().strip('<>'))
+                self.reply("250 OK")
+            elif command == 'DATA':
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data in (b".\r\n", b".\n"):
+                        break
+                    lines.append(data[1:] if data.startswith(b"..") else data)
+                self.server.deliver((sender, recipients, b"".join(lines)))
+                sender, recipients = None, []
+                self.reply("250 OK queued")
+            elif command in ('RSET', 'NOOP'):
+                if command == 'RSET':
+                    sender, recipients = None, []
+                self.reply("250 OK")
+            elif command == 'QUIT':
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = 'localhost', port: int = 1025,
+                 on_message: Optional[Callable[[Envelope], None]] = None):
+        super().__init__((host, port), _Handler)
+        self.messages: List[Envelope] = []
+        self.on_message = on_message
+        self._lock = threading.Lock()
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def deliver(self, envelope: Envelope) -> None:
+        with self._lock:
+            self.messages.append(envelope)
+        if self.on_message is not None:
+            self.on_message(envelope)
+
+    def start(self) -> threading.Thread:
+        """Serve in a daemon thread (for tests); stop with shutdown()."""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+def subject_of(raw: bytes) -> str:
+    return str(message_from_bytes(raw, policy=policy.default)['Subject'] or '')
@@ -1,3 +1,651 @@
-from django.test import TestCase
+import datetime
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import swisseph as swe
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.astrology_utils import (
+    BATCH_BODIES, Chart, evaluate_rules, evaluate_rules_batch, rule_ids, DOSHA_MASK, YOGA_MASK, RULE_BITS,
+    MatchProfile, PORUTHAMS, bhakoot_dosha, match_report, score_matches, top_matches,
+    DASHA_ORDER, DASHA_YEAR_DAYS, NAK_SEG, DashaTimeline, calculate_vimshottari_dasha, get_current_dasha,
+    jd_to_utc_datetime, local_to_jd,
+    CHEB_RANGE, CHEB_SPECS, EPHE_FLAGS, PLANET_CODES, load_chebyshev_tables,
+    RASHIS, find_ingresses, sade_sati_timeline, utc_to_jd,
+    calculate_navamsa_chart, calculate_vargas, compute_varga_indices, get_planet_positions_with_speed,
+)
+from core import gazetteer, jobs, mailer, timing
+from core.models import GeocodeCache, Job, OutboxMessage
+from core.smtp_sink import SMTPSink, subject_of
+from grahastra.utility import GeocoderUnavailable
+
+# Sign index per body, each placed at 20° of its sign; with the Lagna at 15° Medam,
+# house == sign + 1. Only Raja Yoga fires (Mars rules both the 1st kendra and trikona).
+QUIET_SIGNS = {'Sun': 0, 'Moon': 4, 'Mars': 2, 'Mercury': 11, 'Jupiter': 6, 'Venus': 9,
+               'Saturn': 3, 'Rahu': 7, 'Ketu': 1}
+
+
+def chart(asc=15.0, **longitudes):
+    """Hand-built chart: QUIET_SIGNS, with any body's longitude overridden by keyword."""
+    lon = {b: s * 30 + 20.0 for b, s in QUIET_SIGNS.items()}
+    lon.update(longitudes)
+    return Chart([lon[b] for b in BATCH_BODIES], asc)
+
+
+class RuleTests(SimpleTestCase):
+    def matched(self, c):
+        return set(rule_ids(evaluate_rules(c.masks())[2]))
+
+    def assertFires(self, rule, c):
+        self.assertIn(rule, self.matched(c))
+
+    def assertQuiet(self, rule, c):
+        self.assertNotIn(rule, self.matched(c))
+
+    def test_quiet_chart(self):
+        self.assertEqual(self.matched(chart()), {'raja'})
+
+    def test_masks_cover_every_rule(self):
+        self.assertEqual(YOGA_MASK & DOSHA_MASK, 0)
+        self.assertEqual(YOGA_MASK | DOSHA_MASK, (1 << len(RULE_BITS)) - 1)
+        self.assertTrue(DOSHA_MASK >> RULE_BITS['manglik'] & 1)
+
+    def test_gajakesari(self):
+        self.assertFires('gajakesari', chart(Moon=110.0))                 # Moon 4th, Jupiter 7th
+        self.assertQuiet('gajakesari', chart(Moon=140.0))                 # Moon 5th
+
+    def test_budhaditya(self):
+        self.assertFires('budhaditya', chart(Mercury=25.0))
+        self.assertQuiet('budhaditya', chart(Sun=28.0, Mercury=31.0))     # 3° apart, different signs
+        self.assertQuiet('budhaditya', chart(Sun=2.0, Mercury=14.0))      # same sign, beyond the 10° orb
+
+    def test_chandra_mangala(self):
+        self.assertFires('chandra_mangala', chart(Mars=145.0))
+        self.assertQuiet('chandra_mangala', chart(Mars=155.0))            # next sign
+
+    def test_dhana(self):
+        yogas, _doshas, _ = evaluate_rules(chart(Venus=50.0).masks())
+        self.assertIn("💰 Dhana Yoga — Venus in house 2.", yogas)
+        self.assertQuiet('dhana', chart())
+
+    def test_vipareeta_raja(self):
+        # Mercury in the 12th (Meenam) with its dispositor Jupiter in the 6th
+        yogas, _doshas, _ = evaluate_rules(chart(Jupiter=170.0).masks())
+        self.assertIn("🌀 Vipareeta Raja Yoga — Mercury and Jupiter in dusthanas.", yogas)
+
+    def test_kemadruma(self):
+        self.assertFires('kemadruma', chart(Saturn=290.0))                # 4th and 6th from Lagna emptied
+        self.assertQuiet('kemadruma', chart())                            # Saturn in the 12th from Moon
+
+    def test_neecha_bhanga(self):
+        self.assertFires('neecha_bhanga', chart(Saturn=25.0, Venus=28.0))
+        self.assertQuiet('neecha_bhanga', chart(Saturn=25.0))
+
+    def test_raja(self):
+        # Moon (4th lord) with Jupiter (9th lord) in the 7th
+        yogas, _doshas, _ = evaluate_rules(chart(Moon=200.0).masks())
+        self.assertIn("👑 Raja Yoga — Moon (Kendra lord) with Jupiter (Trikona lord) in house 7.", yogas)
+        self.assertQuiet('raja', chart(asc=None))
+
+    def test_parivartana(self):
+        yogas, _doshas, _ = evaluate_rules(chart(Venus=260.0).masks())    # Jupiter in Thulam, Venus in Dhanu
+        self.assertIn("🔁 Parivartana Yoga — Jupiter ↔ Venus exchange signs Thulam ↔ Dhanu.", yogas)
+        self.assertIn("🔁 Parivartana Yoga — Venus ↔ Jupiter exchange signs Dhanu ↔ Thulam.", yogas)
+
+    def test_panch_mahapurusha(self):
+        yogas, _doshas, _ = evaluate_rules(chart(Jupiter=110.0).masks())  # exalted in Karkidakam, 4th
+        self.assertIn("🏛️ Hamsa Yoga — Jupiter strong in Kendra (4) in Karkidakam.", yogas)
+        self.assertQuiet('panch_mahapurusha', chart(Jupiter=125.0))       # Chingam
+
+    def test_arishta_bhanga(self):
+        self.assertFires('arishta_bhanga', chart(Venus=25.0))             # on the Lagna
+        self.assertFires('arishta_bhanga', chart(Mercury=145.0))          # with the Moon
+        self.assertQuiet('arishta_bhanga', chart())
+
+    def test_lakshmi(self):
+        # Lagna lord Mars in the 1st with Venus
+        yogas, _doshas, _ = evaluate_rules(chart(Mars=18.0, Venus=25.0).masks())
+        self.assertIn("💮 Lakshmi Yoga — Lagna lord Mars strong with Venus in house 1.", yogas)
+        self.assertQuiet('lakshmi', chart(Mars=18.0))
+        self.assertQuiet('lakshmi', chart(asc=None, Mars=18.0, Venus=25.0))
+
+    def test_saraswati(self):
+        self.assertFires('saraswati', chart(Jupiter=50.0, Venus=140.0, Mercury=260.0))
+        self.assertQuiet('saraswati', chart(Jupiter=50.0, Venus=140.0))
+
+    def test_dhanya(self):
+        # 2nd lord Venus in the 11th, 11th lord Saturn in the 2nd
+        self.assertFires('dhanya', chart(Venus=320.0, Saturn=50.0))
+        self.assertQuiet('dhanya', chart(Venus=320.0))
+
+    def test_manglik(self):
+        self.assertFires('manglik', chart(Mars=200.0))                    # 7th from Lagna
+        self.assertFires('manglik', chart(Mars=290.0, Moon=80.0))         # 10th from Lagna, 8th from Moon
+        self.assertQuiet('manglik', chart())                              # 3rd from Lagna, 11th from Moon
+
+    def test_kaal_sarp(self):
+        hemmed = dict(Rahu=10.0, Ketu=190.0, Mercury=140.0, Venus=170.0, Saturn=110.0, Jupiter=180.0)
+        self.assertFires('kaal_sarp', chart(**hemmed))
+        self.assertQuiet('kaal_sarp', chart(**{**hemmed, 'Jupiter': 200.0}))
+
+    def test_pitra(self):
+        self.assertFires('pitra', chart(Saturn=25.0))
+        self.assertFires('pitra', chart(Ketu=27.0))
+        self.assertQuiet('pitra', chart(Saturn=30.0))                     # 10° from the Sun, orb is 8°
+
+    def test_batch_agrees_with_scalar(self):
+        rng = np.random.default_rng(7)
+        n = 2000
+        lon = rng.uniform(0.0, 360.0, (n, len(BATCH_BODIES)))
+        lon[:, 8] = (lon[:, 7] + 180.0) % 360.0
+        # Clustered charts too, so conjunction and Kaal Sarp rules are exercised
+        lon[n // 2:, :7] = (lon[n // 2:, :1] + rng.uniform(-40.0, 40.0, (n // 2, 7))) % 360.0
+        asc = rng.uniform(0.0, 360.0, n)
+        asc[:50] = 0.0  # no Lagna
+
+        batch = evaluate_rules_batch(lon, asc)
+        scalar = [evaluate_rules(Chart(row, a).masks())[2] for row, a in zip(lon.tolist(), asc.tolist())]
+        self.assertEqual(batch.tolist(), scalar)
+        # Every rule is both hit and missed somewhere in the sample
+        for bit in RULE_BITS.values():
+            hits = (batch >> bit) & 1
+            self.assertTrue(0 < hits.sum() < n, bit)
+
+
+class VargaTests(SimpleTestCase):
+    def assertVargas(self, division, cases):
+        """`cases` maps a sidereal longitude to the expected varga sign name."""
+        got = compute_varga_indices(list(cases), [division])[0].tolist()
+        self.assertEqual([RASHIS[i] for i in got], list(cases.values()))
+
+    def test_chaturthamsa(self):
+        # 7°30' parts counted 1st, 4th, 7th, 10th from the sign
+        self.assertVargas('D4', {
+            3.0: 'Medam', 10.0: 'Karkidakam', 20.0: 'Thulam', 29.0: 'Makaram',
+            55.0: 'Kumbham',                                   # 25° Edavam
+            200.0: 'Medam',                                    # 20° Thulam
+        })
+
+    def test_dasamsa(self):
+        # 3° parts; odd signs count from themselves, even signs from the 9th
+        self.assertVargas('D10', {
+            1.0: 'Medam', 29.0: 'Makaram',                     # Medam (odd)
+            31.0: 'Makaram', 59.0: 'Thulam',                   # Edavam (even): from Makaram
+            104.0: 'Karkidakam',                               # 14° Karkidakam: 5th part from Meenam
+        })
+
+    def test_navamsa(self):
+        self.assertVargas('D9', {
+            1.0: 'Medam', 29.0: 'Dhanu',                       # Medam, odd and movable: from itself
+            31.0: 'Makaram', 45.0: 'Edavam',                   # Edavam, even and fixed: from the 9th
+            61.0: 'Thulam',                                    # Midhunam, odd and dual: from the 5th
+            91.0: 'Karkidakam', 95.0: 'Chingam',               # Karkidakam, even and movable
+        })
+        self.assertEqual(calculate_navamsa_chart({'Moon': 45.0}), {'Moon': 'Edavam'})
+
+    def test_dwadasamsa(self):
+        # 2°30' parts counted from the sign itself, odd or even
+        self.assertVargas('D12', {
+            29.0: 'Meenam',                                    # Medam (odd)
+            32.5: 'Midhunam',                                  # 2°30' Edavam (even)
+            167.0: 'Meenam',                                   # 17° Kanni (even)
+        })
+
+    def test_trimshamsa(self):
+        # Odd: Mars 5°, Saturn 5°, Jupiter 8°, Mercury 7°, Venus 5°
+        self.assertVargas('D30', {
+            124.9: 'Medam', 125.0: 'Kumbham', 137.9: 'Dhanu', 138.0: 'Midhunam', 146.0: 'Thulam',
+        })
+        # Even: Venus 5°, Mercury 7°, Jupiter 8°, Saturn 5°, Mars 5°
+        self.assertVargas('D30', {
+            92.0: 'Edavam', 101.5: 'Kanni', 102.0: 'Meenam', 112.0: 'Makaram', 117.0: 'Vrischikam',
+        })
+
+    def test_calculate_vargas(self):
+        vargas = calculate_vargas({'Sun': 29.0, 'Moon': 104.0}, ['D1', 'D10'])
+        self.assertEqual(vargas, {'D1': {'Sun': 0, 'Moon': 3}, 'D10': {'Sun': 9, 'Moon': 3}})
+
+
+class MatchingTests(SimpleTestCase):
+    def test_report_totals(self):
+        # Ashwathi/Medam bride, Atham/Kanni groom: Horse/Buffalo yoni enemies, same Adi nadi,
+        # and a 6/8 Moon-sign relation whose lords (Mars, Mercury) are not friends
+        bride = MatchProfile(nakshatra=0, rasi=0, navamsa=0, manglik=False)
+        groom = MatchProfile(nakshatra=12, rasi=5, navamsa=5, manglik=False)
+        report = match_report(bride, groom)
+        self.assertEqual(report['kootas'], {'varna': 0, 'vashya': 1, 'tara': 1.5, 'yoni': 0,
+                                            'graha_maitri': 0.5, 'gana': 6, 'bhakoot': 0, 'nadi': 0})
+        self.assertEqual(report['ashtakoota'], 9.0)
+        passed = [name for name, ok in report['poruthams'].items() if ok]
+        self.assertEqual(passed, ['dinam', 'ganam', 'mahendram', 'rajju', 'vedha'])
+        self.assertEqual(report['porutham_count'], 5)
+        self.assertTrue(report['compatible'])
+
+    def test_bhakoot_cancelled_by_navamsa_lords(self):
+        bride = MatchProfile(nakshatra=0, rasi=0, navamsa=0, manglik=False)
+        groom = MatchProfile(nakshatra=12, rasi=5, navamsa=7, manglik=False)  # both navamsas ruled by Mars
+        report = match_report(bride, groom)
+        self.assertEqual(report['kootas']['bhakoot'], 7)
+        self.assertEqual(report['ashtakoota'], 16.0)
+
+    def test_bhakoot_cancelled_by_rasi_lords(self):
+        # Medam and Vrischikam are 6/8 but share Mars as lord
+        self.assertTrue(bhakoot_dosha(0, 7))
+        report = match_report(MatchProfile(1, 0, 3, False), MatchProfile(16, 7, 4, False))
+        self.assertEqual(report['kootas']['bhakoot'], 7)
+
+    def test_manglik(self):
+        bride = MatchProfile(nakshatra=0, rasi=0, navamsa=0, manglik=True)
+        one = match_report(bride, MatchProfile(12, 5, 5, manglik=False))
+        self.assertTrue(one['manglik_dosha'])
+        self.assertFalse(one['compatible'])
+        both = match_report(bride, MatchProfile(12, 5, 5, manglik=True))
+        self.assertFalse(both['manglik_dosha'])
+        self.assertTrue(both['compatible'])
+
+    def test_rajju_rejects(self):
+        # Ashwathi and Makam share Pada rajju
+        report = match_report(MatchProfile(0, 0, 0, False), MatchProfile(9, 4, 0, False))
+        self.assertFalse(report['poruthams']['rajju'])
+        self.assertFalse(report['compatible'])
+
+    def test_vectorised_agrees_with_report(self):
+        rng = np.random.default_rng(12)
+        n = 3000
+        naks, rasis, navamsas = rng.integers(0, 27, n), rng.integers(0, 12, n), rng.integers(0, 12, n)
+        mangliks = rng.random(n) < 0.3
+        for person_is_bride in (True, False):
+            person = MatchProfile(int(rng.integers(27)), int(rng.integers(12)), int(rng.integers(12)),
+                                  bool(rng.random() < 0.3))
+            scores = score_matches(person, naks, rasis, navamsas, mangliks, person_is_bride)
+            for i in range(n):
+                other = MatchProfile(int(naks[i]), int(rasis[i]), int(navamsas[i]), bool(mangliks[i]))
+                report = match_report(person, other) if person_is_bride else match_report(other, person)
+                mask = sum(1 << b for b, name in enumerate(PORUTHAMS) if report['poruthams'][name])
+                self.assertEqual(int(scores['porutham_mask'][i]), mask)
+                self.assertEqual(int(scores['porutham_count'][i]), report['porutham_count'])
+                self.assertEqual(float(scores['ashtakoota'][i]), report['ashtakoota'])
+                self.assertEqual(bool(scores['manglik_ok'][i]), not report['manglik_dosha'])
+                self.assertEqual(bool(scores['compatible'][i]), report['compatible'])
+
+    def test_top_matches_order(self):
+        scores = {
+            'compatible': np.array([False, True, True, False, True]),
+            'ashtakoota': np.array([30.0, 20.0, 25.0, 35.0, 25.0]),
+            'porutham_count': np.array([5, 6, 4, 9, 7]),
+        }
+        # Compatible first, then Ashtakoota, then porutham count
+        self.assertEqual(top_matches(scores).tolist(), [4, 2, 1, 3, 0])
+        self.assertEqual(top_matches(scores, k=2).tolist(), [4, 2])
+        self.assertEqual(top_matches({k: v[:0] for k, v in scores.items()}).tolist(), [])
+        self.assertEqual(top_matches(scores, k=0).tolist(), [])
+        self.assertEqual(top_matches(scores, k=-3).tolist(), [])
+
+
+class DashaTests(SimpleTestCase):
+    # Born 1990-01-01 00:00 IST with the Moon halfway through Ashwathi: half of the
+    # 7-year Ketu mahadasha had already run at birth
+    BIRTH = datetime.datetime(1990, 1, 1)
+    Y = DASHA_YEAR_DAYS
+
+    def setUp(self):
+        self.birth_jd = local_to_jd(self.BIRTH)
+        self.timeline = DashaTimeline(self.birth_jd, NAK_SEG / 2)
+
+    def test_mahadasha_boundaries(self):
+        periods = self.timeline.children()
+        self.assertEqual([p.lord for p in periods], DASHA_ORDER)
+        self.assertAlmostEqual(periods[0].start_jd, self.birth_jd - 3.5 * self.Y, places=6)
+        self.assertAlmostEqual(periods[0].end_jd, self.birth_jd + 3.5 * self.Y, places=6)
+        self.assertAlmostEqual(periods[1].end_jd, self.birth_jd + 23.5 * self.Y, places=6)
+        self.assertAlmostEqual(self.timeline.end_jd, self.timeline.start_jd + 120 * self.Y, places=6)
+        for a, b in zip(periods, periods[1:]):
+            self.assertEqual(a.end_jd, b.start_jd)
+
+    def test_antardashas_start_from_parent_lord(self):
+        venus = self.timeline.children()[1]
+        subs = self.timeline.children(venus)
+        self.assertEqual([p.lord for p in subs], DASHA_ORDER[1:] + DASHA_ORDER[:1])
+        self.assertEqual(subs[0].start_jd, venus.start_jd)
+        self.assertEqual(subs[-1].end_jd, venus.end_jd)
+        self.assertAlmostEqual(subs[0].end_jd - subs[0].start_jd, 20 * 20 / 120 * self.Y, places=6)
+
+    def test_vimshottari_starts_at_birth(self):
+        dashas = calculate_vimshottari_dasha(self.birth_jd, NAK_SEG / 2)
+        self.assertEqual(len(dashas), 9)
+        self.assertEqual(dashas[0]['lord'], 'Ketu')
+        self.assertEqual(dashas[0]['start'], jd_to_utc_datetime(self.birth_jd))
+        self.assertEqual(dashas[1]['start'], dashas[0]['end'])
+
+    def test_at(self):
+        lords = lambda jd, depth=3: [p.lord for p in self.timeline.at(jd, depth)]
+        # 3.5 years into Ketu: Rahu antardasha (from 2.917 y), Mercury pratyantar
+        self.assertEqual(lords(self.birth_jd), ['Ketu', 'Rahu', 'Mercury'])
+        venus = self.timeline.children()[1]
+        self.assertEqual(lords(venus.start_jd), ['Venus', 'Venus', 'Venus'])
+        self.assertEqual(lords(venus.start_jd - 1e-6), ['Ketu', 'Mercury', 'Saturn'])
+        self.assertEqual(lords(self.timeline.start_jd, 5), ['Ketu'] * 5)
+        self.assertEqual(self.timeline.at(self.timeline.start_jd - 1), [])
+        self.assertEqual(self.timeline.at(self.timeline.end_jd), [])
+        self.assertEqual([p.level for p in self.timeline.at(self.birth_jd)], [0, 1, 2, 3, 4])
+
+    def test_overlapping(self):
+        ketu, venus, sun = self.timeline.children()[:3]
+        lords = lambda *args: [p.lord for p in self.timeline.overlapping(*args)]
+        self.assertEqual(lords(self.birth_jd, self.birth_jd + self.Y), ['Ketu'])
+        # Half-open: a range ending exactly where Venus starts does not include it
+        self.assertEqual(lords(self.birth_jd, venus.start_jd), ['Ketu'])
+        self.assertEqual(lords(self.birth_jd, sun.start_jd + 1), ['Ketu', 'Venus', 'Sun'])
+        self.assertEqual(lords(venus.start_jd, venus.end_jd, 1), DASHA_ORDER[1:] + DASHA_ORDER[:1])
+        self.assertEqual(lords(self.timeline.end_jd, self.timeline.end_jd + self.Y), [])
+        subs = self.timeline.overlapping(venus.end_jd - 1, venus.end_jd + 1, 1)
+        self.assertEqual([(p.path, p.lord) for p in subs], [((1, 8), 'Ketu'), ((2, 0), 'Sun')])
+
+    def test_get_current_dasha(self):
+        current = get_current_dasha(self.timeline, self.BIRTH)
+        self.assertEqual(list(current), ['mahadasha', 'antardasha', 'pratyantar'])
+        self.assertEqual([current[level]['lord'] for level in current], ['Ketu', 'Rahu', 'Mercury'])
+        ketu_rahu = self.timeline.at(self.birth_jd, 2)[1]
+        self.assertEqual(current['antardasha'], ketu_rahu.as_dict())
+        self.assertEqual(list(get_current_dasha(self.timeline, self.BIRTH, depth=1)), ['mahadasha'])
+        self.assertEqual(get_current_dasha(self.timeline, datetime.datetime(2200, 1, 1)), {})
+
+
+class ChebyshevTests(SimpleTestCase):
+    MAX_ERROR = 6e-4  # degrees, the documented bound for Jupiter/Saturn
+
+    def test_tables_match_swiss_ephemeris(self):
+        tables = load_chebyshev_tables()
+        self.assertEqual(set(tables), set(CHEB_SPECS))
+        rng = np.random.default_rng(4)
+        jds = rng.uniform(CHEB_RANGE[0], CHEB_RANGE[1], 500)
+        for name, table in tables.items():
+            self.assertTrue(table.covers(jds).all())
+            lon, _speed = table.evaluate(jds)
+            for jd, fitted in zip(jds.tolist(), lon.tolist()):
+                expected = swe.calc_ut(jd, PLANET_CODES[name], EPHE_FLAGS)[0][0]
+                self.assertLess(abs((fitted - expected + 180.0) % 360.0 - 180.0), self.MAX_ERROR, (name, jd))
+                self.assertLess(abs((table.at(jd)[0] - fitted + 180.0) % 360.0 - 180.0), 1e-9)
+
+    def test_range(self):
+        table = load_chebyshev_tables()['Saturn']
+        self.assertTrue(table.covers(CHEB_RANGE[0]))
+        self.assertFalse(table.covers(CHEB_RANGE[0] - 1))
+        self.assertFalse(table.covers(table.end))
+        self.assertGreaterEqual(table.end, CHEB_RANGE[1])
+
+    def test_positions_with_speed(self):
+        jd = utc_to_jd(datetime.datetime(2026, 10, 18, 6, 0))
+        tabled = get_planet_positions_with_speed(jd)
+        exact = get_planet_positions_with_speed(jd, use_tables=False)
+        self.assertEqual(set(tabled), set(exact))
+        for name, (lon, speed) in tabled.items():
+            self.assertIsInstance(lon, float)
+            self.assertLess(abs((lon - exact[name][0] + 180.0) % 360.0 - 180.0), self.MAX_ERROR, name)
+            self.assertLess(abs(speed - exact[name][1]), 2.5e-3, name)
+
+
+class IngressTests(SimpleTestCase):
+    START = utc_to_jd(datetime.datetime(2019, 1, 1))
+    END = utc_to_jd(datetime.datetime(2026, 1, 1))
+    # Saturn (Lahiri), including its 2022 retrograde back into Makaram
+    SATURN = [
+        (datetime.date(2020, 1, 24), 'Dhanu', 'Makaram', False),
+        (datetime.date(2022, 4, 29), 'Makaram', 'Kumbham', False),
+        (datetime.date(2022, 7, 12), 'Kumbham', 'Makaram', True),
+        (datetime.date(2023, 1, 17), 'Makaram', 'Kumbham', False),
+        (datetime.date(2025, 3, 29), 'Kumbham', 'Meenam', False),
+    ]
+
+    def test_saturn_ingresses(self):
+        found = find_ingresses('Saturn', self.START, self.END)
+        self.assertEqual([(jd_to_utc_datetime(i.jd).date(), RASHIS[i.previous], RASHIS[i.index], i.retrograde)
+                          for i in found], self.SATURN)
+        # The tables and the Swiss Ephemeris agree to within a few minutes
+        exact = find_ingresses('Saturn', self.START, self.END, use_tables=False)
+        self.assertEqual(len(exact), len(found))
+        for a, b in zip(found, exact):
+            self.assertLess(abs(a.jd - b.jd), 0.005)
+
+    def test_sun_ingresses(self):
+        start = utc_to_jd(datetime.datetime(2024, 1, 1))
+        found = find_ingresses('Sun', start, start + 365.0)
+        self.assertEqual(len(found), 12)
+        self.assertFalse(any(i.retrograde for i in found))
+        self.assertEqual([i.index for i in found], [(9 + k) % 12 for k in range(12)])  # from Makaram, mid-January
+
+    def test_sade_sati_merges_retrograde_back_and_forth(self):
+        # Natal Moon in Kumbham: Makaram, Kumbham and Meenam are the 12th, 1st and 2nd
+        timeline = sade_sati_timeline(315.0, self.START, self.END)
+        self.assertEqual(len(timeline['sade_sati']), 1)
+        cycle = timeline['sade_sati'][0]
+        self.assertEqual(cycle['start'].date(), datetime.date(2020, 1, 24))
+        self.assertEqual(cycle['end'], jd_to_utc_datetime(self.END))
+        phases = [(p['sign'], p['phase']) for p in timeline['saturn']]
+        self.assertEqual(phases, [
+            ('Dhanu', 'neutral'),
+            ('Makaram', 'sade_sati_rising'),
+            ('Kumbham', 'sade_sati_peak'),
+            ('Makaram', 'sade_sati_rising'),
+            ('Kumbham', 'sade_sati_peak'),
+            ('Meenam', 'sade_sati_setting'),
+        ])
+        self.assertEqual(timeline['kantaka_shani'], [])
+
+    def test_kantaka_shani(self):
+        # Natal Moon in Thulam: Saturn in Makaram is the 4th, Kumbham the 5th
+        timeline = sade_sati_timeline(195.0, self.START, self.END)
+        self.assertEqual(timeline['sade_sati'], [])
+        self.assertEqual([(p['sign'], p['phase']) for p in timeline['kantaka_shani']],
+                         [('Makaram', 'kantaka_shani_ardhashtama')] * 2)
+
+
+@mock.patch("grahastra.utility.get_coordinates_from_place")
+class GeocodeCacheTests(TestCase):
+    def setUp(self):
+        gazetteer.reset_index()  # empty Place table: every text goes to the online geocoder
+        self.addCleanup(gazetteer.reset_index)
+
+    def test_hit_is_fetched_once(self, online):
+        online.return_value = (10.5, 76.2)
+        self.assertEqual(gazetteer.geocode("Thrissur, Kerala"), (10.5, 76.2))
+        self.assertEqual(gazetteer.geocode("thrissur  kerala"), (10.5, 76.2))
+        self.assertEqual(online.call_count, 1)
+
+    def test_miss_is_cached_until_ttl(self, online):
+        online.return_value = (None, None)
+        self.assertEqual(gazetteer.geocode("Nowhere Village"), (None, None))
+        self.assertEqual(gazetteer.geocode("Nowhere Village"), (None, None))
+        self.assertEqual(online.call_count, 1)
+
+        GeocodeCache.objects.update(created_at=timezone.now() - gazetteer.MISS_TTL)
+        online.return_value = (11.0, 77.0)
+        self.assertEqual(gazetteer.geocode("Nowhere Village"), (11.0, 77.0))
+        self.assertEqual(online.call_count, 2)
+        self.assertEqual(GeocodeCache.objects.get().latitude, 11.0)
+
+    def test_unavailable_geocoder_is_not_cached(self, online):
+        online.side_effect = GeocoderUnavailable("timeout")
+        self.assertEqual(gazetteer.geocode("Palakkad"), (None, None))
+        self.assertFalse(GeocodeCache.objects.exists())
+
+
+class MailerTests(TestCase):
+    def setUp(self):
+        self.sink = SMTPSink(port=0)
+        self.sink.start()
+        self.addCleanup(self.sink.server_close)
+        self.addCleanup(self.sink.shutdown)
+        smtp = override_settings(EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+                                 EMAIL_HOST="localhost", EMAIL_PORT=self.sink.port, EMAIL_USE_TLS=False,
+                                 EMAIL_HOST_USER="stars@grahastra.test", EMAIL_HOST_PASSWORD="")
+        smtp.enable()
+        self.addCleanup(smtp.disable)
+        self.mailer = mailer.Mailer(workers=1, batch_size=10)
+        self.addCleanup(self.mailer.shutdown)
+
+    def queue(self, n, template="email/registration_success_email.html"):
+        return [mailer.queue_mail(f"user{i}@example.com", f"Hello {i}", template, {"name": f"User {i}", "year": 2026})
+                for i in range(n)]
+
+    def test_send_pending_delivers_to_sink(self):
+        self.queue(3)
+        self.assertEqual(self.mailer.send_pending(), (3, 0))
+        self.assertEqual(sorted(subject_of(raw) for _sender, _to, raw in self.sink.messages),
+                         ["Hello 0", "Hello 1", "Hello 2"])
+        self.assertEqual(self.sink.messages[0][0], "stars@grahastra.test")
+        self.assertEqual(OutboxMessage.objects.filter(status=OutboxMessage.SENT).count(), 3)
+        self.assertEqual(self.mailer.send_pending(), (0, 0))
+
+    def test_claim_hands_out_each_message_once(self):
+        self.queue(2)
+        later = self.queue(1)[0]
+        OutboxMessage.objects.filter(pk=later.pk).update(run_after=timezone.now() + datetime.timedelta(hours=1))
+        claimed = self.mailer.claim()
+        self.assertEqual(len(claimed), 2)
+        self.assertTrue(all(m.status == OutboxMessage.SENDING and m.attempts == 1 for m in claimed))
+        self.assertEqual(self.mailer.claim(), [])
+
+    def test_failure_backs_off_then_fails(self):
+        message = self.queue(1, template="email/missing.html")[0]
+        before = timezone.now()
+        self.assertEqual(self.mailer.send_pending(), (0, 1))
+        message.refresh_from_db()
+        self.assertEqual(message.status, OutboxMessage.QUEUED)
+        self.assertGreaterEqual(message.run_after, before + datetime.timedelta(seconds=mailer.DEFAULTS['RETRY_BASE']))
+        self.assertIn("TemplateDoesNotExist", message.last_error)
+
+        OutboxMessage.objects.filter(pk=message.pk).update(attempts=mailer.DEFAULTS['MAX_ATTEMPTS'] - 1,
+                                                          run_after=timezone.now())
+        self.mailer.send_pending()
+        message.refresh_from_db()
+        self.assertEqual(message.status, OutboxMessage.FAILED)
+        self.assertEqual(self.sink.messages, [])
+
+    def test_reconnects_after_dropped_connection(self):
+        self.queue(1)
+        self.assertEqual(self.mailer.send_pending(), (1, 0))
+        # The server drops the idle connection between rounds
+        for connection in self.mailer._connections:
+            connection.connection.close()
+        mailer.queue_mail("late@example.com", "Late", "email/registration_success_email.html", {})
+        self.assertEqual(self.mailer.send_pending(), (1, 0))
+        self.assertEqual(len(self.sink.messages), 2)
+
+    def test_requeue_stale(self):
+        message = self.queue(1)[0]
+        self.mailer.claim()
+        self.assertEqual(mailer.requeue_stale(), 0)
+        OutboxMessage.objects.filter(pk=message.pk).update(locked_at=timezone.now() - datetime.timedelta(hours=1))
+        self.assertEqual(mailer.requeue_stale(), 1)
+        message.refresh_from_db()
+        self.assertEqual(message.status, OutboxMessage.QUEUED)
+
+    def test_queue_digest_once_per_campaign(self):
+        User = get_user_model()
+        for i in range(3):
+            User.objects.create_user(email=f"reader{i}@example.com", password="x")
+        User.objects.create_user(email="inactive@example.com", password="x", is_active=False)
+        day = datetime.date(2026, 10, 18)
+        self.assertEqual(mailer.queue_digest(day), 3)
+        self.assertEqual(mailer.queue_digest(day), 0)
+        User.objects.create_user(email="new@example.com", password="x")
+        self.assertEqual(mailer.queue_digest(day), 1)
+        self.assertEqual(OutboxMessage.objects.filter(campaign="digest:2026-10-18").count(), 4)
+        self.assertEqual(mailer.queue_digest(day + datetime.timedelta(days=1)), 4)
+
+
+HANDLED = []
+
+
+def record_job(fail=False, **kwargs):
+    """Test job handler: records its kwargs, raises when asked to."""
+    HANDLED.append(kwargs)
+    if fail:
+        raise RuntimeError("handler failed")
+
+
+@override_settings(JOB_QUEUE={})
+@mock.patch.dict(jobs.HANDLERS, {"test": "core.tests.record_job"})
+class JobQueueTests(TestCase):
+    def setUp(self):
+        HANDLED.clear()
+
+    def test_unknown_kind(self):
+        with self.assertRaises(KeyError):
+            jobs.enqueue("nope")
+
+    def test_claim_due_jobs_once(self):
+        first = jobs.enqueue("test", n=1)
+        jobs.enqueue("test", n=2, delay=3600)
+        claimed = jobs.claim(limit=5)
+        self.assertEqual([j.pk for j in claimed], [first.pk])
+        self.assertEqual((claimed[0].status, claimed[0].attempts), (Job.RUNNING, 1))
+        self.assertEqual(jobs.claim(limit=5), [])
+        self.assertEqual(jobs.claim(limit=5, kinds=["profile_chart"]), [])
+
+    def test_run_pending(self):
+        job = jobs.enqueue("test", n=1)
+        self.assertEqual(jobs.run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(HANDLED, [{"n": 1}])
+
+    def test_retry_backoff_then_failed(self):
+        job = jobs.enqueue("test", max_attempts=3, fail=True)
+        for attempt, delay in ((1, 10), (2, 20)):
+            before = timezone.now()
+            jobs.run_pending()
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), (Job.QUEUED, attempt))
+            self.assertGreaterEqual(job.run_after, before + datetime.timedelta(seconds=delay))
+            self.assertLess(job.run_after, before + datetime.timedelta(seconds=delay + 5))
+            self.assertIn("handler failed", job.last_error)
+            Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        jobs.run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 3))
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(jobs.run_pending(), 0)
+
+    @override_settings(JOB_QUEUE={"RETRY_BASE": 10, "RETRY_MAX": 15})
+    def test_backoff_is_capped(self):
+        job = jobs.enqueue("test", fail=True)
+        Job.objects.filter(pk=job.pk).update(attempts=3)
+        before = timezone.now()
+        jobs.run_pending()
+        job.refresh_from_db()
+        self.assertLess(job.run_after, before + datetime.timedelta(seconds=20))
+
+    def test_requeue_stale(self):
+        live = jobs.enqueue("test")
+        stale = jobs.enqueue("test")
+        spent = jobs.enqueue("test", max_attempts=1)
+        jobs.claim(limit=3)
+        expired = timezone.now() - datetime.timedelta(seconds=jobs.DEFAULTS["LEASE"] + 1)
+        Job.objects.filter(pk__in=[stale.pk, spent.pk]).update(locked_at=expired)
+
+        self.assertEqual(jobs.requeue_stale(), 2)
+        statuses = dict(Job.objects.values_list("pk", "status"))
+        self.assertEqual(statuses, {live.pk: Job.RUNNING, stale.pk: Job.QUEUED, spent.pk: Job.FAILED})
+        self.assertEqual(jobs.requeue_stale(), 0)
+
+
+class StageTimingsViewTests(TestCase):
+    def setUp(self):
+        staff = get_user_model().objects.create_user(email="ops@example.com", password="x", is_staff=True)
+        self.client.force_login(staff)
+        self.addCleanup(timing.HISTOGRAMS.clear)
+
+    def test_enabled_follows_setting(self):
+        # Histograms left over from an earlier run do not make it look enabled
+        timing.observe({"chart": 12.0})
+        with self.settings(STAGE_TIMING=False):
+            response = self.client.get(reverse("stage_timings")).json()
+        self.assertFalse(response["enabled"])
+        self.assertIn("chart", response["stages"])
+        with self.settings(STAGE_TIMING=True):
+            self.assertTrue(self.client.get(reverse("stage_timings")).json()["enabled"])
@@ -0,0 +1,119 @@
+# src grahastra/backend/core/timing.py
+"""
+Per-request stage timers.
+
+`with stage("ephemeris"): ...` records how long a block took into the recorder
+of the current request (a ContextVar set by core.middleware.ServerTimingMiddleware).
+With no recorder active, which is always the case when STAGE_TIMING is off,
+`stage` returns a shared no-op context manager, so instrumented code pays one
+ContextVar lookup per stage.
+
+Finished requests are folded into per-process histograms (HISTOGRAMS), one per
+stage, with fixed millisecond buckets.
+"""
+
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+# Upper bounds in milliseconds; the last bucket is open-ended
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+_recorder: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar('stage_recorder', default=None)
+_NOOP = nullcontext()
+
+
+@contextmanager
+def _timed(recorder: List[Tuple[str, float]], name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.append((name, (time.perf_counter() - start) * 1000.0))
+
+
+def stage(name: str):
+    """Time a block as stage `name` if the current request is being timed."""
+    recorder = _recorder.get()
+    if recorder is None:
+        return _NOOP
+    return _timed(recorder, name)
+
+
+def active() -> bool:
+    return _recorder.get() is not None
+
+
+def record(name: str, ms: float) -> None:
+    """Add an already measured stage (e.g. one timed in a compute worker)."""
+    recorder = _recorder.get()
+    if recorder is not None:
+        recorder.append((name, ms))
+
+
+def start_recording():
+    """Begin timing the current context; returns the token for `stop_recording`."""
+    return _recorder.set([])
+
+
+def stop_recording(token) -> Dict[str, float]:
+    """Stage name -> total milliseconds (repeated stages are summed), in first-seen order."""
+    recorder = _recorder.get() or []
+    _recorder.reset(token)
+    totals: Dict[str, float] = {}
+    for name, ms in recorder:
+        totals[name] = totals.get(name, 0.0) + ms
+    return totals
+
+
+class Histogram:
+    __slots__ = ('counts', 'count', 'total_ms', 'max_ms')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        i = 0
+        while i < len(BUCKETS_MS) and ms > BUCKETS_MS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def as_dict(self) -> Dict[str, object]:
+        labels = [f"le_{b}ms" for b in BUCKETS_MS] + ['inf']
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'max_ms': round(self.max_ms, 3),
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+HISTOGRAMS: Dict[str, Histogram] = {}
+_lock = threading.Lock()
+
+
+def observe(stages: Dict[str, float], prefix: str = '') -> None:
+    with _lock:
+        for name, ms in stages.items():
+            key = f"{prefix}{name}"
+            hist = HISTOGRAMS.get(key)
+            if hist is None:
+                hist = HISTOGRAMS[key] = Histogram()
+            hist.observe(ms)
+
+
+def snapshot() -> Dict[str, Dict[str, object]]:
+    with _lock:
+        return {name: hist.as_dict() for name, hist in sorted(HISTOGRAMS.items())}
+
+
+def server_timing_header(stages: Dict[str, float]) -> str:
+    return ", ".join(f"{name};dur={ms:.2f}" for name, ms in stages.items())
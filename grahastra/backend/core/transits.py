@@ -0,0 +1,97 @@
+# src grahastra/backend/core/transits.py
+"""
+Shared transit snapshots.
+
+Transit longitudes do not depend on where the user is, so "now" and "today"
+are computed once per time bucket and shared: first through a per-process
+memo, then across workers through the Django cache. Buckets are per body
+(the Moon moves ~0.5' a minute, Saturn barely moves in an hour) and can be
+tuned with the `TRANSIT_SNAPSHOT_BUCKETS` setting (seconds per body).
+"""
+
+import datetime
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .astrology_utils import BATCH_BODIES, IST_OFFSET, body_state, local_to_jd, utc_to_jd
+
+DEFAULT_BUCKETS = {
+    'Moon': 60,
+    'Sun': 3600, 'Mercury': 3600, 'Venus': 3600, 'Mars': 3600,
+    'Jupiter': 3600, 'Saturn': 3600, 'Rahu': 3600, 'Ketu': 3600,
+}
+CACHE_PREFIX = "transits"
+
+# bucket seconds -> (bucket start epoch, {body: (longitude, speed)})
+_memo: Dict[int, Tuple[int, Dict[str, Tuple[float, float]]]] = {}
+
+
+@dataclass(frozen=True)
+class TransitSnapshot:
+    at: datetime.datetime                      # requested moment (UTC)
+    states: Dict[str, Tuple[float, float]]     # body -> (sidereal longitude, speed)
+
+    @property
+    def positions(self) -> Dict[str, float]:
+        return {p: round(lon, 2) for p, (lon, _spd) in self.states.items()}
+
+    def is_retrograde(self, planet: str) -> bool:
+        return self.states[planet][1] < 0.0
+
+
+def _buckets() -> Dict[int, list]:
+    per_body = {**DEFAULT_BUCKETS, **getattr(settings, "TRANSIT_SNAPSHOT_BUCKETS", {})}
+    groups: Dict[int, list] = {}
+    for body in BATCH_BODIES:
+        groups.setdefault(int(per_body[body]), []).append(body)
+    return groups
+
+
+def _compute(bodies, bucket_start: int) -> Dict[str, Tuple[float, float]]:
+    jd = utc_to_jd(datetime.datetime.fromtimestamp(bucket_start, datetime.timezone.utc))
+    return {body: body_state(body, jd) for body in bodies}
+
+
+def _bucket_states(seconds: int, bodies, epoch: float) -> Dict[str, Tuple[float, float]]:
+    bucket_start = int(epoch // seconds) * seconds
+    memo = _memo.get(seconds)
+    if memo is not None and memo[0] == bucket_start:
+        return memo[1]
+
+    key = f"{CACHE_PREFIX}:{seconds}:{bucket_start}"
+    states = cache.get(key)
+    if states is None:
+        states = _compute(bodies, bucket_start)
+        cache.set(key, states, timeout=seconds * 2)
+    # Only the current bucket per size is kept, so the memo never grows
+    _memo[seconds] = (bucket_start, states)
+    return states
+
+
+def get_transit_snapshot(at: datetime.datetime = None) -> TransitSnapshot:
+    """Transit positions for `at` (default: now), quantized to each body's bucket."""
+    at = at or datetime.datetime.now(datetime.timezone.utc)
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=datetime.timezone.utc)
+    epoch = at.timestamp()
+    states = {}
+    for seconds, bodies in _buckets().items():
+        states.update(_bucket_states(seconds, bodies, epoch))
+    return TransitSnapshot(at, {body: states[body] for body in BATCH_BODIES})
+
+
+def get_daily_transit_snapshot(day: datetime.date = None) -> TransitSnapshot:
+    """Positions at 00:00 IST of `day` (default: today in IST), shared for the whole day."""
+    if day is None:
+        day = (datetime.datetime.now(datetime.timezone.utc) + IST_OFFSET).date()
+    key = f"{CACHE_PREFIX}:day:{day.isoformat()}"
+    at = datetime.datetime.combine(day, datetime.time()) - IST_OFFSET
+    states = cache.get(key)
+    if states is None:
+        jd = local_to_jd(datetime.datetime.combine(day, datetime.time()))
+        states = {body: body_state(body, jd) for body in BATCH_BODIES}
+        cache.set(key, states, timeout=2 * 24 * 3600)
+    return TransitSnapshot(at.replace(tzinfo=datetime.timezone.utc), states)
@@ -1,8 +1,10 @@
 from django.urls import path
-from .views import Landing_Home
+from .views import JobStatusAPI, Landing_Home, stage_timings
 
 urlpatterns = [
     
-    path('',Landing_Home.as_view(),name='Landing_page')
+    path('',Landing_Home.as_view(),name='Landing_page'),
+    path('timings/', stage_timings, name='stage_timings'),
+    path('jobs/<int:pk>/', JobStatusAPI.as_view(), name='job_status'),
 
 ]
\ No newline at end of file
@@ -1,7 +1,42 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
 from django.shortcuts import render
 from django.views import View
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from . import timing
+from .models import Job
 
 
 class Landing_Home(View):
     def get(self, request, *args, **kwargs):
         return render(request, 'landing_home.html')
+
+
+@staff_member_required
+def stage_timings(request):
+    """This worker process's stage histograms (see core.timing); each worker keeps its own."""
+    return JsonResponse({"enabled": getattr(settings, "STAGE_TIMING", False), "stages": timing.snapshot()})
+
+
+class JobStatusAPI(APIView):
+    """Status of one of the caller's background jobs (see core.jobs)."""
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        job = Job.objects.filter(pk=pk, user=request.user).first()
+        if job is None:
+            return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            "id": job.pk,
+            "kind": job.kind,
+            "status": job.status,
+            "attempts": job.attempts,
+            "finished_at": job.finished_at,
+        }, status=status.HTTP_200_OK)
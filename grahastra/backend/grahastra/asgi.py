@@ -3,6 +3,10 @@ ASGI config for grahastra project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with uvicorn (``uvicorn grahastra.asgi:application`` or gunicorn with
+``-k uvicorn.workers.UvicornWorker``) so streamed chat answers
+(astrologerchatbot.streaming) wait on the LLM without holding a worker thread.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
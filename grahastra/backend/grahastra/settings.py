@@ -48,6 +48,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
+    'core.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -93,6 +94,43 @@ DATABASES = {
     }
 }
 
+# Cache: shared transit snapshots and other cross-worker data.
+# Point CACHE_BACKEND/CACHE_LOCATION at Redis or Memcached in production so
+# every worker process shares one copy.
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+
+# Seconds per snapshot bucket, per body (see core.transits)
+TRANSIT_SNAPSHOT_BUCKETS = {'Moon': 60}
+
+# Per-stage timers as a Server-Timing header plus histograms at /timings/
+# (core.timing); when off the middleware is not installed at all.
+STAGE_TIMING = config('STAGE_TIMING', default=False, cast=bool)
+
+# Background jobs (see core.jobs); run workers with `manage.py run_jobs`.
+# JOBS_RUN_INLINE runs each job right after its transaction commits, for development without a worker.
+JOB_QUEUE = {
+    'RUN_INLINE': config('JOBS_RUN_INLINE', default=False, cast=bool),
+}
+
+# Chat questions the local intent classifier is less sure about than this go to the LLM
+# (astrologerchatbot.intent); tune with `manage.py evaluate_intent`.
+INTENT_CONFIDENCE = config('INTENT_CONFIDENCE', default=0.75, cast=float)
+
+# Worker processes for CPU-heavy chart jobs (see core.compute); per web worker.
+# The default of 0 runs every job inline (tests, runserver); production should set
+# COMPUTE_WORKERS (e.g. 2) so chart work does not run on the request threads.
+COMPUTE_POOL = {
+    'WORKERS': config('COMPUTE_WORKERS', default=0, cast=int),
+    'MAX_PENDING': config('COMPUTE_MAX_PENDING', default=16, cast=int),
+    'TIMEOUT': config('COMPUTE_TIMEOUT', default=30, cast=float),
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -165,16 +203,26 @@ LOGOUT_REDIRECT_URL = 'login'
 # email settings
 
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
-EMAIL_HOST = 'smtp.gmail.com'
-EMAIL_PORT = 587
-EMAIL_USE_TLS = True
+EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
+EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
+EMAIL_TIMEOUT = 30
 EMAIL_HOST_USER = config('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD')
 
+# Outgoing mail is queued in the outbox and sent by `manage.py send_outbox` (see core.mailer).
+# For local development: `manage.py smtp_sink` with EMAIL_HOST=localhost EMAIL_PORT=1025 EMAIL_USE_TLS=False
+MAIL_OUTBOX = {
+    'WORKERS': config('MAIL_WORKERS', default=4, cast=int),
+    'BATCH_SIZE': config('MAIL_BATCH_SIZE', default=50, cast=int),
+}
+
 
 # geocoding for converting pob to cordinate
 
 OPENCAGE_API_KEY = config("OPENCAGE_API_KEY")
+# OpenCage is only asked about places the local gazetteer misses (see core.gazetteer)
+GEOCODER_TIMEOUT = config('GEOCODER_TIMEOUT', default=5.0, cast=float)
 
 # connecting frontend and backend 
 
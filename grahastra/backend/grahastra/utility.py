@@ -1,43 +1,29 @@
-from django.core.mail import EmailMultiAlternatives
-from django.conf import settings
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
 import requests
 from django.conf import settings
 
-def send_email(subject, recipient, template, context):
-    # Render HTML content from template
-    html_content = render_to_string(template, context)
-
-    # Create plain text fallback
-    text_content = strip_tags(html_content)
-
-    # Create email message
-    mail = EmailMultiAlternatives(
-        subject=subject,
-        body=text_content,  # plain text version
-        from_email=settings.EMAIL_HOST_USER,
-        to=[recipient]
-    )
 
-    mail.attach_alternative(html_content, "text/html")
-    mail.send()
+class GeocoderUnavailable(Exception):
+    """The online geocoder could not be asked (network, HTTP or response error)."""
 
 
 def get_coordinates_from_place(pob):
-    
+    """Online geocoding; callers should go through core.gazetteer.geocode, which caches.
+
+    Returns (None, None) when the geocoder answers but finds nothing, and raises
+    GeocoderUnavailable when it could not answer, so that is never cached as a miss.
+    """
     api_key = settings.OPENCAGE_API_KEY
-    url = f'https://api.opencagedata.com/geocode/v1/json?q={pob}&key={api_key}&limit=1'
+    url = 'https://api.opencagedata.com/geocode/v1/json'
+    params = {'q': pob, 'key': api_key, 'limit': 1}
 
     try:
-        response = requests.get(url)
+        response = requests.get(url, params=params, timeout=settings.GEOCODER_TIMEOUT)
         response.raise_for_status()
         data = response.json()
+    except (requests.RequestException, ValueError) as e:
+        raise GeocoderUnavailable(str(e)) from e
 
-        if data['results']:
-            geometry = data['results'][0]['geometry']
-            return geometry['lat'], geometry['lng']
-    except Exception as e:
-        print("Geocoding error:", e)
-
-    return None, None
\ No newline at end of file
+    if data.get('results'):
+        geometry = data['results'][0]['geometry']
+        return geometry['lat'], geometry['lng']
+    return None, None